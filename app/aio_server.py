@@ -0,0 +1,240 @@
+import asyncio
+import logging
+from typing import AsyncIterator
+from typing import Optional
+from typing import Union
+
+import grpc
+
+import input_pb2
+import input_pb2_grpc
+from button import Button
+from config_service import ConfigService
+from hotkey_parser import compile_hotkey
+from input_service import InputService
+from input_stream import AsyncInputStreamSession
+from input_stream import replay_batch_async
+from input_stream import validate_batch
+from key import ButtonActionType
+from key import HotkeyOptions
+from key import Key
+from key import KeyActionType
+from key import KeyOptions
+from latency_stats import RpcLatencyStats
+from motion_lane import MotionLane
+from server import InputMethodsService
+from text_to_hid import UnsupportedCharacterError
+from text_to_hid import encode_typing
+
+
+class AsyncInputMethodsService(input_pb2_grpc.InputMethodsServicer):
+    """`InputMethodsService` for a `grpc.aio` server on a single event loop.
+
+    Handlers that press and release keys wait with `asyncio.sleep` instead of
+    holding a thread. Handlers that never wait are delegated to the threaded
+    service, which runs them directly on the loop.
+    """
+
+    _logger: logging.Logger
+    config_svc: ConfigService
+    input_svc: InputService
+
+    def __init__(
+        self,
+        config_service: ConfigService,
+        input_service: InputService,
+        logger: logging.Logger,
+        motion_lane: Optional[MotionLane] = None,
+        rpc_latency: Optional[RpcLatencyStats] = None,
+    ):
+        self._logger = logger
+        self.config_svc = config_service
+        self.input_svc = input_service
+        self._sync = InputMethodsService(
+            config_service, input_service, logger, motion_lane, rpc_latency
+        )
+
+    async def PressKey(
+        self,
+        request: input_pb2.Key,
+        context: grpc.aio.ServicerContext,
+    ) -> input_pb2.Response:
+        key = Key(request.id)
+        request_type = KeyActionType(request.type)
+        options = (
+            KeyOptions.from_pb(request.options) if request.HasField('options') else None
+        )
+
+        await self.input_svc.press_key_async(key, request_type, options)
+
+        return input_pb2.Response(message='Ok')
+
+    async def PressHotkey(
+        self, request: input_pb2.Hotkey, context: grpc.aio.ServicerContext
+    ) -> input_pb2.Response:
+        request_type = KeyActionType(request.type)
+        options = (
+            HotkeyOptions.from_pb(request.options)
+            if request.HasField('options')
+            else None
+        )
+
+        hotkey = compile_hotkey(request.hotkey)
+
+        await self.input_svc.press_hotkey_async(hotkey, request_type, options)
+
+        return input_pb2.Response(message='Ok')
+
+    async def PressMouseKey(
+        self,
+        request: input_pb2.MouseKey,
+        context: grpc.aio.ServicerContext,
+    ) -> input_pb2.Response:
+        button = Button(request.id)
+        request_type = ButtonActionType(request.type)
+
+        await self.input_svc.press_mouse_key_async(button, request_type)
+
+        return input_pb2.Response(message='Ok')
+
+    async def MoveMouse(self, request, context) -> input_pb2.Response:
+        return self._sync.MoveMouse(request, context)
+
+    async def MoveMouseAbsolute(self, request, context) -> input_pb2.Response:
+        return self._sync.MoveMouseAbsolute(request, context)
+
+    async def Ping(self, request, context) -> input_pb2.Response:
+        return self._sync.Ping(request, context)
+
+    async def OpenMotionLane(self, request, context) -> input_pb2.MotionLaneSession:
+        if self._sync.motion_lane is None:
+            await context.abort(
+                grpc.StatusCode.FAILED_PRECONDITION, 'The UDP motion lane is disabled'
+            )
+        return self._sync.OpenMotionLane(request, context)
+
+    async def GetConfig(self, request, context) -> input_pb2.Config:
+        return self._sync.GetConfig(request, context)
+
+    async def SetConfig(self, request, context) -> input_pb2.Config:
+        return self._sync.SetConfig(request, context)
+
+    async def GetStats(self, request, context) -> input_pb2.Stats:
+        return self._sync.GetStats(request, context)
+
+    async def _dispatch_event(
+        self,
+        event: Union[input_pb2.InputEvent, input_pb2.TimedInputEvent],
+        context: grpc.aio.ServicerContext,
+    ):
+        kind = event.WhichOneof('event')
+        if kind == 'key':
+            await self.PressKey(event.key, context)
+        elif kind == 'hotkey':
+            await self.PressHotkey(event.hotkey, context)
+        elif kind == 'mouse_key':
+            await self.PressMouseKey(event.mouse_key, context)
+        elif kind == 'mouse_move':
+            await self.MoveMouse(event.mouse_move, context)
+        elif kind == 'mouse_move_absolute':
+            await self.MoveMouseAbsolute(event.mouse_move_absolute, context)
+        else:
+            raise ValueError('Input event has no event set')
+
+    async def InputStream(
+        self,
+        request_iterator: AsyncIterator[input_pb2.InputEvent],
+        context: grpc.aio.ServicerContext,
+    ) -> AsyncIterator[input_pb2.InputAck]:
+        session = AsyncInputStreamSession(
+            lambda event: self._dispatch_event(event, context), self._logger
+        )
+        reader = asyncio.create_task(session.consume(request_iterator))
+        try:
+            async for ack in session.acks():
+                yield ack
+        finally:
+            reader.cancel()
+
+    async def TypeText(
+        self,
+        request: input_pb2.TypeTextRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> AsyncIterator[input_pb2.TypeTextProgress]:
+        total = len(request.text)
+        try:
+            script = encode_typing(request.text, request.layout, request.rollover)
+        except UnsupportedCharacterError as e:
+            yield input_pb2.TypeTextProgress(
+                typed=0, total=total, first_unsupported=e.index
+            )
+            return
+
+        interval_ms = request.interval_ms or self.config_svc.key_press_interval
+        progress = asyncio.Queue()
+
+        def report(typed: int, done: bool) -> bool:
+            progress.put_nowait((typed, done))
+            return True
+
+        typist = asyncio.create_task(
+            self.input_svc.type_text_async(script, interval_ms / 1000, report)
+        )
+        try:
+            while True:
+                typed, done = await progress.get()
+                if done:
+                    break
+                yield input_pb2.TypeTextProgress(typed=typed, total=total)
+        finally:
+            # Stops typing if the client went away.
+            typist.cancel()
+
+        if typed < total:
+            await context.abort(
+                grpc.StatusCode.INTERNAL, f'Typing stopped after {typed} characters'
+            )
+
+    async def SendEvents(
+        self,
+        request: input_pb2.EventBatch,
+        context: grpc.aio.ServicerContext,
+    ) -> input_pb2.Response:
+        try:
+            validate_batch(request.events)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        await replay_batch_async(
+            request.events, lambda event: self._dispatch_event(event, context)
+        )
+
+        return input_pb2.Response(message='Ok')
+
+
+def create_server(
+    config_service: ConfigService,
+    input_service: InputService,
+    logger: logging.Logger,
+    motion_lane: Optional[MotionLane] = None,
+    rpc_latency: Optional[RpcLatencyStats] = None,
+) -> grpc.aio.Server:
+    """Creates the asyncio server.
+
+    Start it on the loop passed to `input_service.use_async_hid_writers`, so
+    handlers and HID writes share one thread.
+    """
+    server = grpc.aio.server(
+        interceptors=(rpc_latency.async_interceptor(),) if rpc_latency else None
+    )
+    input_pb2_grpc.add_InputMethodsServicer_to_server(
+        AsyncInputMethodsService(
+            config_service=config_service,
+            input_service=input_service,
+            logger=logger,
+            motion_lane=motion_lane,
+            rpc_latency=rpc_latency,
+        ),
+        server,
+    )
+    return server
@@ -0,0 +1,111 @@
+import logging
+import unittest
+from typing import Any
+from typing import cast
+
+import grpc
+
+import input_pb2
+import input_pb2_grpc
+from aio_server import create_server
+from key import Key
+from key import KeyActionType
+
+
+class InputService:
+    def __init__(self):
+        self.events = []
+
+    async def press_key_async(self, key, action_type, options):
+        self.events.append((key, action_type))
+
+    def move_mouse(self, x, y):
+        self.events.append((x, y))
+
+    async def type_text_async(self, script, interval_s, progress):
+        typed = 0
+        for report, typed_after in script:
+            self.events.append(report)
+            if typed_after != typed:
+                typed = typed_after
+                progress(typed, False)
+        progress(typed, True)
+
+
+class AsyncInputMethodsServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.input_service = InputService()
+        self.server = create_server(
+            config_service=cast(Any, None),
+            input_service=cast(Any, self.input_service),
+            logger=logging.getLogger(__name__),
+        )
+        port = self.server.add_insecure_port('127.0.0.1:0')
+        await self.server.start()
+        self.channel = grpc.aio.insecure_channel(f'127.0.0.1:{port}')
+        self.stub = input_pb2_grpc.InputMethodsStub(self.channel)
+
+    async def asyncTearDown(self):
+        await self.channel.close()
+        await self.server.stop(None)
+
+    async def test_press_key_is_awaited(self):
+        await self.stub.PressKey(
+            input_pb2.Key(id=Key.KEY_A.value, type=input_pb2.DOWN), timeout=5
+        )
+
+        self.assertEqual(self.input_service.events, [(Key.KEY_A, KeyActionType.DOWN)])
+
+    async def test_input_stream_dispatches_and_acks(self):
+        events = [
+            input_pb2.InputEvent(
+                seq=seq, mouse_move=input_pb2.MouseMove(x=seq, y=0)
+            )
+            for seq in range(1, 4)
+        ]
+
+        acks = [ack async for ack in self.stub.InputStream(iter(events), timeout=5)]
+
+        self.assertEqual(self.input_service.events, [(1, 0), (2, 0), (3, 0)])
+        self.assertEqual(acks[-1].seq, 3)
+
+    async def test_send_events_replays_the_batch(self):
+        batch = input_pb2.EventBatch(
+            events=[
+                input_pb2.TimedInputEvent(
+                    offset_us=offset_us, mouse_move=input_pb2.MouseMove(x=1, y=1)
+                )
+                for offset_us in (0, 10_000)
+            ]
+        )
+
+        await self.stub.SendEvents(batch, timeout=5)
+
+        self.assertEqual(self.input_service.events, [(1, 1), (1, 1)])
+
+    async def test_type_text_streams_progress(self):
+        progress = [
+            (p.typed, p.total)
+            async for p in self.stub.TypeText(
+                input_pb2.TypeTextRequest(text='Hi', interval_ms=1), timeout=5
+            )
+        ]
+
+        self.assertEqual(progress, [(1, 2), (2, 2)])
+        self.assertEqual(len(self.input_service.events), 4)
+
+    async def test_type_text_reports_the_first_unsupported_character(self):
+        progress = [
+            p
+            async for p in self.stub.TypeText(
+                input_pb2.TypeTextRequest(text='a\x07b\x07'), timeout=5
+            )
+        ]
+
+        self.assertEqual(len(progress), 1)
+        self.assertEqual(progress[0].first_unsupported, 1)
+        self.assertEqual(self.input_service.events, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
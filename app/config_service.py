@@ -60,6 +60,15 @@ class ConfigService:
     _keyboard_path = '/dev/null'
     _mouse_path = '/dev/null'
     _media_path = '/dev/null'
+    _tablet_path = '/dev/null'
+    _hid_write_deadline_ms = 20
+    _mouse_late_report_policy = 'write'
+    _mouse_report_profile = 'rel8'
+    _server_mode = 'threaded'
+    _timer_spin_us = 1000
+    _motion_lane_port = 0
+    _engineio_port = 0
+    _metrics_port = 0
 
     _key_repeat_delay = 300  # 300ms (CONSTANT)
     _key_repeat_interval = 1000 // 30  # 15hz (CONSTANT)
@@ -113,6 +122,42 @@ class ConfigService:
     def media_path(self):
         return self._media_path
 
+    @property
+    def tablet_path(self):
+        return self._tablet_path
+
+    @property
+    def hid_write_deadline_ms(self):
+        return self._hid_write_deadline_ms
+
+    @property
+    def mouse_late_report_policy(self):
+        return self._mouse_late_report_policy
+
+    @property
+    def mouse_report_profile(self):
+        return self._mouse_report_profile
+
+    @property
+    def server_mode(self):
+        return self._server_mode
+
+    @property
+    def timer_spin_us(self):
+        return self._timer_spin_us
+
+    @property
+    def motion_lane_port(self):
+        return self._motion_lane_port
+
+    @property
+    def engineio_port(self):
+        return self._engineio_port
+
+    @property
+    def metrics_port(self):
+        return self._metrics_port
+
     def _load(self):
         self._cursor_speed = self._prefs.get('cursor_speed', self._cursor_speed)
         self._cursor_acceleration = self._prefs.get(
@@ -127,6 +172,23 @@ class ConfigService:
         self._keyboard_path = self._prefs.get('keyboard_path', self._keyboard_path)
         self._mouse_path = self._prefs.get('mouse_path', self._mouse_path)
         self._media_path = self._prefs.get('media_path', self._media_path)
+        self._tablet_path = self._prefs.get('tablet_path', self._tablet_path)
+        self._hid_write_deadline_ms = self._prefs.get(
+            'hid_write_deadline_ms', self._hid_write_deadline_ms
+        )
+        self._mouse_late_report_policy = self._prefs.get(
+            'mouse_late_report_policy', self._mouse_late_report_policy
+        )
+        self._mouse_report_profile = self._prefs.get(
+            'mouse_report_profile', self._mouse_report_profile
+        )
+        self._server_mode = self._prefs.get('server_mode', self._server_mode)
+        self._timer_spin_us = self._prefs.get('timer_spin_us', self._timer_spin_us)
+        self._motion_lane_port = self._prefs.get(
+            'motion_lane_port', self._motion_lane_port
+        )
+        self._engineio_port = self._prefs.get('engineio_port', self._engineio_port)
+        self._metrics_port = self._prefs.get('metrics_port', self._metrics_port)
 
         self._initialized = True
 
@@ -142,6 +204,15 @@ class ConfigService:
         self._prefs.set('keyboard_path', self._keyboard_path)
         self._prefs.set('mouse_path', self._mouse_path)
         self._prefs.set('media_path', self._media_path)
+        self._prefs.set('tablet_path', self._tablet_path)
+        self._prefs.set('hid_write_deadline_ms', self._hid_write_deadline_ms)
+        self._prefs.set('mouse_late_report_policy', self._mouse_late_report_policy)
+        self._prefs.set('mouse_report_profile', self._mouse_report_profile)
+        self._prefs.set('server_mode', self._server_mode)
+        self._prefs.set('timer_spin_us', self._timer_spin_us)
+        self._prefs.set('motion_lane_port', self._motion_lane_port)
+        self._prefs.set('engineio_port', self._engineio_port)
+        self._prefs.set('metrics_port', self._metrics_port)
 
         self._prefs.save()
         
@@ -159,6 +230,15 @@ class ConfigService:
         self._logger.info('Keyboard path: %s', self._keyboard_path)
         self._logger.info('Mouse path: %s', self._mouse_path)
         self._logger.info('Media path: %s', self._media_path)
+        self._logger.info('Tablet path: %s', self._tablet_path)
+        self._logger.info('HID write deadline: %sms', self._hid_write_deadline_ms)
+        self._logger.info('Mouse late report policy: %s', self._mouse_late_report_policy)
+        self._logger.info('Mouse report profile: %s', self._mouse_report_profile)
+        self._logger.info('Server mode: %s', self._server_mode)
+        self._logger.info('Timer spin budget: %sus', self._timer_spin_us)
+        self._logger.info('Motion lane port: %s', self._motion_lane_port or 'disabled')
+        self._logger.info('Engine.IO port: %s', self._engineio_port or 'disabled')
+        self._logger.info('Metrics port: %s', self._metrics_port or 'disabled')
 
     def set_cursor_speed(self, speed: float):
         if not self._initialized:
@@ -239,3 +319,91 @@ class ConfigService:
         self._media_path = path
         
         self._save()
+
+    def set_tablet_path(self, path: str):
+        if not self._initialized:
+            raise NotInitializedError('Preferences not initialized!')
+
+        self._tablet_path = path
+        
+        self._save()
+
+    def set_hid_write_deadline_ms(self, deadline: int):
+        if not self._initialized:
+            raise NotInitializedError('Preferences not initialized!')
+        if deadline < 1 or deadline > 1000:
+            raise ValueError('Deadline must be between 1 and 1000')
+
+        self._hid_write_deadline_ms = deadline
+        
+        self._save()
+
+    def set_mouse_late_report_policy(self, policy: str):
+        if not self._initialized:
+            raise NotInitializedError('Preferences not initialized!')
+        if policy not in ('drop', 'write'):
+            raise ValueError("Late report policy must be 'drop' or 'write'")
+
+        self._mouse_late_report_policy = policy
+        
+        self._save()
+
+    def set_mouse_report_profile(self, profile: str):
+        if not self._initialized:
+            raise NotInitializedError('Preferences not initialized!')
+        if profile not in ('rel8', 'rel16'):
+            raise ValueError("Mouse report profile must be 'rel8' or 'rel16'")
+
+        self._mouse_report_profile = profile
+        
+        self._save()
+
+    def set_server_mode(self, mode: str):
+        if not self._initialized:
+            raise NotInitializedError('Preferences not initialized!')
+        if mode not in ('threaded', 'aio'):
+            raise ValueError("Server mode must be 'threaded' or 'aio'")
+
+        self._server_mode = mode
+        
+        self._save()
+
+    def set_timer_spin_us(self, spin_us: int):
+        if not self._initialized:
+            raise NotInitializedError('Preferences not initialized!')
+        if spin_us < 0 or spin_us > 5000:
+            raise ValueError('Timer spin budget must be between 0 and 5000')
+
+        self._timer_spin_us = spin_us
+        
+        self._save()
+
+    def set_motion_lane_port(self, port: int):
+        if not self._initialized:
+            raise NotInitializedError('Preferences not initialized!')
+        if port < 0 or port > 65535:
+            raise ValueError('Port must be between 0 (disabled) and 65535')
+
+        self._motion_lane_port = port
+        
+        self._save()
+
+    def set_engineio_port(self, port: int):
+        if not self._initialized:
+            raise NotInitializedError('Preferences not initialized!')
+        if port < 0 or port > 65535:
+            raise ValueError('Port must be between 0 (disabled) and 65535')
+
+        self._engineio_port = port
+        
+        self._save()
+
+    def set_metrics_port(self, port: int):
+        if not self._initialized:
+            raise NotInitializedError('Preferences not initialized!')
+        if port < 0 or port > 65535:
+            raise ValueError('Port must be between 0 (disabled) and 65535')
+
+        self._metrics_port = port
+        
+        self._save()
@@ -0,0 +1,157 @@
+import logging
+import socket
+import threading
+from socketserver import ThreadingMixIn
+from typing import Optional
+from wsgiref.simple_server import WSGIRequestHandler
+from wsgiref.simple_server import WSGIServer
+from wsgiref.simple_server import make_server
+
+import engineio
+
+import input_pb2
+from input_stream import ACK_EVERY
+from input_stream import ACK_INTERVAL_S
+from input_stream import InputStreamSession
+from server import InputMethodsService
+
+
+class EngineIoFrontend:
+    """Engine.IO endpoint for browser remotes, next to the gRPC server.
+
+    A connection works like an `InputStream` call: every binary message from
+    the client is one serialized `InputEvent`, and the server answers with
+    serialized `InputAck` messages. Events are dispatched by the same
+    `InputMethodsService` as gRPC calls, in the order they arrived on the
+    connection.
+    """
+
+    _logger: logging.Logger
+    _service: InputMethodsService
+    _sessions: dict[str, InputStreamSession]
+
+    def __init__(
+        self,
+        service: InputMethodsService,
+        logger: logging.Logger,
+        ack_every: int = ACK_EVERY,
+        ack_interval: float = ACK_INTERVAL_S,
+    ):
+        self._service = service
+        self._logger = logger
+        self._ack_every = ack_every
+        self._ack_interval = ack_interval
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._httpd: Optional[WSGIServer] = None
+
+        # Handlers run on the connection's own thread rather than one thread
+        # per message, so events keep their order.
+        self._eio = engineio.Server(
+            async_mode='threading',
+            async_handlers=False,
+            cors_allowed_origins='*',
+        )
+        self._eio.on('connect', self._on_connect)
+        self._eio.on('message', self._on_message)
+        self._eio.on('disconnect', self._on_disconnect)
+        self.port = 0
+
+    def _on_connect(self, sid: str, environ: dict):
+        session = InputStreamSession(
+            lambda event: self._service.dispatch_event(event, None),
+            self._logger,
+            self._ack_every,
+            self._ack_interval,
+        )
+        with self._lock:
+            self._sessions[sid] = session
+        threading.Thread(
+            target=self._send_acks,
+            args=(sid, session),
+            name=f'engineio-acks:{sid}',
+            daemon=True,
+        ).start()
+        self._logger.info('Engine.IO client %s connected', sid)
+
+    def _send_acks(self, sid: str, session: InputStreamSession):
+        for ack in session.acks():
+            self._eio.send(sid, ack.SerializeToString())
+
+    def _on_message(self, sid: str, data):
+        if not isinstance(data, bytes):
+            self._logger.warning('Ignoring text message from Engine.IO client %s', sid)
+            return
+
+        with self._lock:
+            session = self._sessions.get(sid)
+        if session is None:
+            return
+        session.process(input_pb2.InputEvent.FromString(data))
+
+    def _on_disconnect(self, sid: str, *_):
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+        if session is not None:
+            session.close()
+        self._logger.info('Engine.IO client %s disconnected', sid)
+
+    def wsgi_app(self) -> engineio.WSGIApp:
+        return engineio.WSGIApp(self._eio)
+
+    def start(self, host: str, port: int):
+        """Serves the endpoint on `host`:`port` from a thread of its own."""
+        self._httpd = make_server(
+            host,
+            port,
+            _hijack_aware(self.wsgi_app()),
+            server_class=_ThreadingWSGIServer6 if ':' in host else _ThreadingWSGIServer,
+            handler_class=_RequestHandler,
+        )
+        self.port = self._httpd.server_port
+        threading.Thread(
+            target=self._httpd.serve_forever, name='engineio', daemon=True
+        ).start()
+        self._logger.info('Engine.IO endpoint listening on port %d', self.port)
+
+    def close(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            session.close()
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _ThreadingWSGIServer6(_ThreadingWSGIServer):
+    address_family = socket.AF_INET6
+
+
+class _RequestHandler(WSGIRequestHandler):
+    def get_environ(self):
+        environ = super().get_environ()
+        # simple-websocket takes over the connection through this key when a
+        # client upgrades to WebSocket.
+        environ['werkzeug.socket'] = self.connection
+        return environ
+
+    def log_request(self, *args):
+        # Long-polling clients would log every poll.
+        pass
+
+
+def _hijack_aware(app):
+    def wrapper(environ, start_response):
+        try:
+            return app(environ, start_response)
+        except ConnectionError as e:
+            # Engine.IO ends a WebSocket connection it took over this way;
+            # wsgiref only stays quiet about the ConnectionAbortedError kind.
+            raise ConnectionAbortedError() from e
+
+    return wrapper
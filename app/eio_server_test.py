@@ -0,0 +1,75 @@
+import logging
+import unittest
+from typing import Any
+from typing import cast
+
+import simple_websocket
+
+import input_pb2
+from eio_server import EngineIoFrontend
+from server import InputMethodsService
+
+
+class InputService:
+    def __init__(self):
+        self.events = []
+
+    def move_mouse(self, x, y):
+        self.events.append((x, y))
+
+
+class EngineIoFrontendTest(unittest.TestCase):
+    def setUp(self):
+        self.input_service = InputService()
+        service = InputMethodsService(
+            config_service=cast(Any, None),
+            input_service=cast(Any, self.input_service),
+            logger=logging.getLogger(__name__),
+        )
+        self.frontend = EngineIoFrontend(service, logging.getLogger(__name__))
+        self.frontend.start('127.0.0.1', 0)
+        self.addCleanup(self.frontend.close)
+
+    def _connect(self):
+        ws = simple_websocket.Client.connect(
+            f'ws://127.0.0.1:{self.frontend.port}/engine.io/?EIO=4&transport=websocket'
+        )
+        self.addCleanup(ws.close)
+        # Engine.IO open packet.
+        self.assertTrue(ws.receive(timeout=5).startswith('0'))
+        return ws
+
+    def _send_move(self, ws, seq):
+        ws.send(
+            input_pb2.InputEvent(
+                seq=seq, mouse_move=input_pb2.MouseMove(x=seq, y=0)
+            ).SerializeToString()
+        )
+
+    def _receive_ack(self, ws):
+        data = ws.receive(timeout=5)
+        self.assertIsNotNone(data, 'No ack received')
+        return input_pb2.InputAck.FromString(data)
+
+    def test_events_are_dispatched_in_order_and_acked(self):
+        ws = self._connect()
+
+        for seq in range(1, 4):
+            self._send_move(ws, seq)
+        ack = self._receive_ack(ws)
+        while ack.seq < 3:
+            ack = self._receive_ack(ws)
+
+        self.assertEqual(ack.seq, 3)
+        self.assertEqual(self.input_service.events, [(1, 0), (2, 0), (3, 0)])
+
+    def test_single_event_is_acked_while_connected(self):
+        ws = self._connect()
+
+        self._send_move(ws, 1)
+
+        self.assertEqual(self._receive_ack(ws).seq, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import struct
+from typing import Optional
+
+# modifiers, reserved, 6 key slots
+_KEYBOARD_REPORT = struct.Struct('<BB6B')
+# 16-bit consumer page usage
+_CONSUMER_REPORT = struct.Struct('<H')
+
+KEYBOARD_REPORT_RELEASED = bytes(_KEYBOARD_REPORT.size)
+
+
+def pack_keyboard_report(modifiers: int, keys: tuple[int, ...]) -> bytes:
+    """Packs a boot keyboard report. `keys` must hold exactly 6 slots."""
+    return _KEYBOARD_REPORT.pack(modifiers, 0, *keys)
+
+
+def pack_consumer_report(usage: int) -> bytes:
+    return _CONSUMER_REPORT.pack(usage)
+
+
+class ReportHex:
+    """Formats a report as hex only if the log record is actually emitted."""
+
+    __slots__ = ('report',)
+
+    def __init__(self, report: bytes):
+        self.report = report
+
+    def __str__(self) -> str:
+        return ' '.join(f'{x:#04x}' for x in self.report)
+
+
+class MouseReportFormat:
+    """Layout of the relative mouse report configured on the gadget.
+
+    Must match the report descriptor written by `otg/init-usb-gadget.sh` for the
+    same `mouse_report_profile`.
+    """
+
+    name: str
+    delta_max: int
+    size: int
+
+    def __init__(self, name: str, axis_format: str, delta_max: int):
+        self.name = name
+        self.delta_max = delta_max
+        # buttons, x, y, vertical wheel, horizontal wheel (AC Pan)
+        self._struct = struct.Struct(f'<B{axis_format}{axis_format}bb')
+        self.size = self._struct.size
+
+    def clamp(self, delta: int) -> int:
+        return max(-self.delta_max, min(self.delta_max, delta))
+
+    def pack(
+        self,
+        buttons: int,
+        x: int,
+        y: int,
+        vertical_wheel: int = 0,
+        horizontal_wheel: int = 0,
+    ) -> bytes:
+        """Packs a report. Deltas must already be within the axis range."""
+        return self._struct.pack(buttons, x, y, vertical_wheel, horizontal_wheel)
+
+    def unpack(self, report: bytes) -> tuple[int, int, int, int, int]:
+        return self._struct.unpack(report)
+
+    def merge(self, queued: bytes, report: bytes) -> Optional[bytes]:
+        """Sums two relative reports, or returns None if that is not possible.
+
+        Reports can only be merged if they have the same button state and the
+        summed deltas still fit in a single report.
+        """
+        buttons, x1, y1, v1, h1 = self._struct.unpack(queued)
+        other_buttons, x2, y2, v2, h2 = self._struct.unpack(report)
+        if buttons != other_buttons:
+            return None
+
+        x, y, v, h = x1 + x2, y1 + y2, v1 + v2, h1 + h2
+        if max(abs(x), abs(y)) > self.delta_max or max(abs(v), abs(h)) > 127:
+            return None
+
+        return self._struct.pack(buttons, x, y, v, h)
+
+
+# 8-bit X/Y: the boot-mouse compatible default.
+MOUSE_REPORT_REL8 = MouseReportFormat('rel8', 'b', 127)
+# 16-bit X/Y: one report covers any realistic motion on high-DPI targets.
+MOUSE_REPORT_REL16 = MouseReportFormat('rel16', 'h', 32767)
+
+MOUSE_REPORT_FORMATS = {
+    MOUSE_REPORT_REL8.name: MOUSE_REPORT_REL8,
+    MOUSE_REPORT_REL16.name: MOUSE_REPORT_REL16,
+}
+
+
+class TabletReportFormat:
+    """Layout of the absolute pointer report on the tablet HID function.
+
+    Must match the descriptor of `hid.tablet` in `otg/init-usb-gadget.sh`.
+    """
+
+    axis_max: int = 32767
+
+    def __init__(self):
+        # buttons, x, y
+        self._struct = struct.Struct('<BHH')
+        self.size = self._struct.size
+
+    def scale(self, position: float) -> int:
+        """Maps a normalized 0..1 position onto the logical axis range."""
+        return round(max(0.0, min(1.0, position)) * self.axis_max)
+
+    def pack(self, buttons: int, x: int, y: int) -> bytes:
+        return self._struct.pack(buttons, x, y)
+
+    def unpack(self, report: bytes) -> tuple[int, int, int]:
+        return self._struct.unpack(report)
+
+
+TABLET_REPORT = TabletReportFormat()
+
+
+def mouse_report_format(profile: str) -> MouseReportFormat:
+    try:
+        return MOUSE_REPORT_FORMATS[profile]
+    except KeyError as e:
+        raise ValueError(f'Unknown mouse report profile: {profile}') from e
@@ -0,0 +1,203 @@
+import errno
+import logging
+import os
+import select
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# Errors the gadget driver reports when the host goes away (cable unplugged, host
+# suspended or reset). The old descriptor is dead at that point and the endpoint
+# has to be reopened before the next write can succeed.
+_RECONNECT_ERRNOS = frozenset((errno.ENODEV, errno.ESHUTDOWN, errno.EPIPE))
+
+# Same semantics as the `open(path, 'ab+')` calls this replaces, plus O_NONBLOCK
+# so a host that stops polling can never wedge the writer.
+_OPEN_FLAGS = os.O_RDWR | os.O_CREAT | os.O_APPEND | os.O_NONBLOCK
+
+
+@dataclass
+class HidEndpointStats:
+    opens: int = 0
+    writes: int = 0
+    failures: int = 0
+    # Number of writes that had to wait for another thread to finish writing to
+    # the same endpoint, and the total time they spent waiting.
+    contended: int = 0
+    wait_ns: int = 0
+    # Writes without a deadline that found the host had not read the previous
+    # report yet. That is back-pressure the caller waits out, not a failure.
+    busy: int = 0
+
+
+class _Endpoint:
+    __slots__ = ('fd', 'lock', 'poller', 'stats')
+
+    def __init__(self):
+        self.fd: Optional[int] = None
+        self.lock = threading.Lock()
+        self.poller: Optional[select.poll] = None
+        self.stats = HidEndpointStats()
+
+
+class HidHandleRegistry:
+    """Keeps one non-blocking file descriptor open per HID endpoint.
+
+    Opening `/dev/hidgN` for every report costs more than the report itself, so
+    each endpoint is opened on first use and kept open. If the gadget driver
+    reports that the host disconnected, the endpoint is reopened and the write
+    retried once.
+
+    Writes to the same endpoint are serialized, writes to different endpoints
+    are not: a keyboard report waiting on the host never delays the mouse.
+    """
+
+    _logger: logging.Logger
+    _endpoints: dict[str, _Endpoint]
+
+    def __init__(self, logger: logging.Logger):
+        self._logger = logger
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, hid_path: str) -> _Endpoint:
+        endpoint = self._endpoints.get(hid_path)
+        if endpoint is None:
+            with self._lock:
+                endpoint = self._endpoints.setdefault(hid_path, _Endpoint())
+        return endpoint
+
+    @staticmethod
+    def _acquire(endpoint: _Endpoint):
+        if endpoint.lock.acquire(blocking=False):
+            return
+
+        start = time.monotonic_ns()
+        endpoint.lock.acquire()
+        endpoint.stats.contended += 1
+        endpoint.stats.wait_ns += time.monotonic_ns() - start
+
+    @staticmethod
+    def _open(hid_path: str, endpoint: _Endpoint) -> int:
+        if endpoint.fd is None:
+            endpoint.fd = os.open(hid_path, _OPEN_FLAGS)
+            endpoint.poller = select.poll()
+            endpoint.poller.register(endpoint.fd, select.POLLOUT)
+            endpoint.stats.opens += 1
+        return endpoint.fd
+
+    @staticmethod
+    def _write_before(endpoint: _Endpoint, fd: int, report: bytes, deadline_ns: int):
+        # The gadget driver only holds one report at a time; EAGAIN means the
+        # host has not read the previous one yet. Wait for it, but not forever.
+        while True:
+            try:
+                os.write(fd, report)
+                return
+            except BlockingIOError:
+                timeout_ns = deadline_ns - time.monotonic_ns()
+                if timeout_ns <= 0:
+                    raise TimeoutError(errno.ETIMEDOUT, 'HID write deadline expired')
+                endpoint.poller.poll(-(-timeout_ns // 1_000_000))
+
+    @staticmethod
+    def _discard(endpoint: _Endpoint):
+        endpoint.poller = None
+        fd, endpoint.fd = endpoint.fd, None
+        if fd is None:
+            return
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+    def fileno(self, hid_path: str) -> int:
+        """Returns the open descriptor for `hid_path`, opening it if needed."""
+        endpoint = self._endpoint(hid_path)
+        with endpoint.lock:
+            return self._open(hid_path, endpoint)
+
+    def _write(
+        self,
+        hid_path: str,
+        endpoint: _Endpoint,
+        report: bytes,
+        deadline_ns: Optional[int],
+    ):
+        fd = self._open(hid_path, endpoint)
+        if deadline_ns is None:
+            os.write(fd, report)
+        else:
+            self._write_before(endpoint, fd, report, deadline_ns)
+
+    def write(
+        self, hid_path: str, report: bytes, deadline_ns: Optional[int] = None
+    ) -> None:
+        """Writes a single report to the endpoint at `hid_path`.
+
+        Args:
+            hid_path: Path of the HID endpoint, e.g. `/dev/hidg0`.
+            report: The raw report.
+            deadline_ns: `time.monotonic_ns()` value until which to wait for the
+                host to accept the report. Without a deadline the write fails
+                right away if the host has not read the previous report.
+
+        Raises:
+            BlockingIOError: If the host has not read the previous report yet.
+            TimeoutError: If the host did not read it before `deadline_ns`.
+            OSError: If the endpoint cannot be opened or written to.
+        """
+        endpoint = self._endpoint(hid_path)
+        stats = endpoint.stats
+
+        self._acquire(endpoint)
+        try:
+            try:
+                self._write(hid_path, endpoint, report, deadline_ns)
+            except BlockingIOError:
+                stats.busy += 1
+                raise
+            except TimeoutError:
+                stats.failures += 1
+                raise
+            except OSError as e:
+                if e.errno not in _RECONNECT_ERRNOS:
+                    stats.failures += 1
+                    raise
+
+                self._logger.warning(
+                    'HID interface %s went away (%s), reopening', hid_path, e.strerror
+                )
+                self._discard(endpoint)
+                try:
+                    self._write(hid_path, endpoint, report, deadline_ns)
+                except OSError:
+                    stats.failures += 1
+                    raise
+
+            stats.writes += 1
+        finally:
+            endpoint.lock.release()
+
+    def stats(self) -> dict[str, HidEndpointStats]:
+        """Returns a snapshot of the per-endpoint counters."""
+        return {
+            hid_path: HidEndpointStats(
+                e.stats.opens,
+                e.stats.writes,
+                e.stats.failures,
+                e.stats.contended,
+                e.stats.wait_ns,
+                e.stats.busy,
+            )
+            for hid_path, e in list(self._endpoints.items())
+        }
+
+    def close(self):
+        with self._lock:
+            endpoints = list(self._endpoints.values())
+
+        for endpoint in endpoints:
+            with endpoint.lock:
+                self._discard(endpoint)
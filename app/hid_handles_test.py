@@ -0,0 +1,126 @@
+import errno
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from hid_handles import HidHandleRegistry
+
+
+class HidHandleRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.hid_path = os.path.join(self._dir.name, 'hidg1')
+        self.registry = HidHandleRegistry(logging.getLogger(__name__))
+
+    def tearDown(self):
+        self.registry.close()
+        self._dir.cleanup()
+
+    def test_endpoint_is_opened_once_for_many_writes(self):
+        for _ in range(10):
+            self.registry.write(self.hid_path, b'\x00\x01\x02\x00\x00')
+
+        stats = self.registry.stats()[self.hid_path]
+        self.assertEqual(stats.opens, 1)
+        self.assertEqual(stats.writes, 10)
+        with open(self.hid_path, 'rb') as f:
+            self.assertEqual(f.read(), b'\x00\x01\x02\x00\x00' * 10)
+
+    def test_reopens_endpoint_after_host_disconnect(self):
+        self.registry.write(self.hid_path, b'\x01')
+        real_write = os.write
+        calls = []
+
+        def write(fd, data):
+            calls.append(fd)
+            if len(calls) == 1:
+                raise OSError(errno.ESHUTDOWN, os.strerror(errno.ESHUTDOWN))
+            return real_write(fd, data)
+
+        with patch('hid_handles.os.write', side_effect=write):
+            self.registry.write(self.hid_path, b'\x02')
+
+        stats = self.registry.stats()[self.hid_path]
+        self.assertEqual(stats.opens, 2)
+        self.assertEqual(stats.writes, 2)
+        self.assertEqual(stats.failures, 0)
+        with open(self.hid_path, 'rb') as f:
+            self.assertEqual(f.read(), b'\x01\x02')
+
+    def test_blocked_write_is_counted_as_busy_and_raised(self):
+        with patch('hid_handles.os.write', side_effect=BlockingIOError):
+            with self.assertRaises(BlockingIOError):
+                self.registry.write(self.hid_path, b'\x01')
+
+        stats = self.registry.stats()[self.hid_path]
+        self.assertEqual(stats.writes, 0)
+        self.assertEqual(stats.busy, 1)
+        self.assertEqual(stats.failures, 0)
+
+    def test_waiting_for_a_busy_endpoint_is_counted(self):
+        endpoint_lock = self.registry._endpoint(self.hid_path).lock
+        endpoint_lock.acquire()
+        writer = threading.Thread(
+            target=self.registry.write, args=(self.hid_path, b'\x01')
+        )
+        writer.start()
+        writer.join(timeout=0.02)
+        self.assertTrue(writer.is_alive())
+        endpoint_lock.release()
+        writer.join()
+
+        stats = self.registry.stats()[self.hid_path]
+        self.assertEqual(stats.contended, 1)
+        self.assertGreater(stats.wait_ns, 0)
+
+    def test_busy_endpoint_does_not_block_other_endpoints(self):
+        other_path = os.path.join(self._dir.name, 'hidg0')
+        endpoint_lock = self.registry._endpoint(self.hid_path).lock
+        with endpoint_lock:
+            self.registry.write(other_path, b'\x01')
+
+        self.assertEqual(self.registry.stats()[other_path].writes, 1)
+        self.assertEqual(self.registry.stats()[other_path].contended, 0)
+
+    def _fill(self, fifo_path):
+        # A FIFO stands in for a gadget endpoint whose host stopped polling.
+        os.mkfifo(fifo_path)
+        reader = os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+        self.addCleanup(os.close, reader)
+        fd = self.registry.fileno(fifo_path)
+        try:
+            while True:
+                os.write(fd, b'\x00' * 4096)
+        except BlockingIOError:
+            pass
+        return reader
+
+    def test_write_with_deadline_times_out_if_host_does_not_read(self):
+        fifo_path = os.path.join(self._dir.name, 'hidg2')
+        self._fill(fifo_path)
+
+        with self.assertRaises(TimeoutError):
+            self.registry.write(
+                fifo_path, b'\x01', deadline_ns=time.monotonic_ns() + 10_000_000
+            )
+
+    def test_write_with_deadline_waits_for_host_to_read(self):
+        fifo_path = os.path.join(self._dir.name, 'hidg2')
+        reader = self._fill(fifo_path)
+        drain = threading.Timer(0.01, os.read, args=(reader, 1 << 20))
+        drain.start()
+        self.addCleanup(drain.cancel)
+
+        self.registry.write(
+            fifo_path, b'\x01', deadline_ns=time.monotonic_ns() + 1_000_000_000
+        )
+
+        self.assertEqual(self.registry.stats()[fifo_path].writes, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
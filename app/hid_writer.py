@@ -0,0 +1,698 @@
+import asyncio
+import collections
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+from hid_handles import HidHandleRegistry
+from latency_stats import LatencyHistogram
+
+# Merges a report that is already queued with a newer one. Returns None when
+# the two cannot be combined into a single report.
+MergeFunction = Callable[[bytes, bytes], Optional[bytes]]
+
+# Builds a report at write time. See `HidWriter.submit_deferred`.
+ReportBuilder = Callable[[], Optional[bytes]]
+
+
+class OverflowPolicy(Enum):
+    """What `HidWriter.submit` does when the endpoint queue is full."""
+
+    # Wait for the writer thread to make room.
+    BLOCK = 0
+    # Discard the oldest queued report.
+    DROP_OLDEST = 1
+    # Fold the new report into the newest queued one, blocking if they cannot
+    # be merged.
+    MERGE = 2
+
+
+class LateReportPolicy(Enum):
+    """What `HidWriter` does with a report the host did not take in time."""
+
+    # Discard it. Only suitable for reports a newer one makes obsolete anyway.
+    DROP = 0
+    # Keep waiting for the host, up to `STALLED_ENDPOINT_TIMEOUT_MS`.
+    WRITE = 1
+
+
+def _stricter(a: LateReportPolicy, b: LateReportPolicy) -> LateReportPolicy:
+    # A merged report carries the input of both, so it may only be dropped if
+    # both could have been.
+    return LateReportPolicy.WRITE if LateReportPolicy.WRITE in (a, b) else a
+
+
+DEFAULT_DEADLINE_MS = 20
+
+# How long a late report is held under LateReportPolicy.WRITE before the host is
+# considered gone and the report discarded, so a missing host cannot stall the
+# queue forever.
+STALLED_ENDPOINT_TIMEOUT_MS = 1000
+_STALLED_ENDPOINT_NS = STALLED_ENDPOINT_TIMEOUT_MS * 1_000_000
+
+
+@dataclass
+class HidWriterStats:
+    depth: int = 0
+    max_depth: int = 0
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0
+    merged: int = 0
+    # Reports that missed their deadline, and how many of those were discarded.
+    late: int = 0
+    late_dropped: int = 0
+    # Time between a report being submitted and its write completing.
+    latency_ns_total: int = 0
+    latency_ns_max: int = 0
+
+
+class HidWriter:
+    """Writes reports to a single HID endpoint from a dedicated thread.
+
+    Callers only append to a bounded queue; the writer thread drains it in
+    order. This keeps a slow host poll from holding up the caller.
+
+    Each report has a deadline of `deadline_ms` from the moment it was queued
+    (or built, for deferred reports). The writer waits on the endpoint with
+    poll() until then; `late_policy` decides what happens afterwards, unless
+    the report was submitted with a policy of its own.
+    """
+
+    hid_path: str
+    policy: OverflowPolicy
+    late_policy: LateReportPolicy
+    _logger: logging.Logger
+    _handles: HidHandleRegistry
+    _merge: Optional[MergeFunction]
+    _queue: collections.deque[
+        tuple[int, Union[bytes, ReportBuilder], LateReportPolicy]
+    ]
+
+    def __init__(
+        self,
+        hid_path: str,
+        handles: HidHandleRegistry,
+        logger: logging.Logger,
+        maxlen: int = 64,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        merge: Optional[MergeFunction] = None,
+        deadline_ms: int = DEFAULT_DEADLINE_MS,
+        late_policy: LateReportPolicy = LateReportPolicy.WRITE,
+    ):
+        if policy == OverflowPolicy.MERGE and merge is None:
+            raise ValueError('MERGE overflow policy requires a merge function')
+
+        self.hid_path = hid_path
+        self.policy = policy
+        self.late_policy = late_policy
+        self._deadline_ns = deadline_ms * 1_000_000
+        self._handles = handles
+        self._logger = logger
+        self._maxlen = maxlen
+        self._merge = merge
+        self._queue = collections.deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._in_flight = False
+        self._closed = False
+        self._stats = HidWriterStats()
+        # Of written reports: time from being queued until the write started,
+        # and how long the write took, including waiting for the host.
+        self.queue_wait = LatencyHistogram()
+        self.write_time = LatencyHistogram()
+        self._thread = threading.Thread(
+            target=self._run, name=f'hid-writer:{hid_path}', daemon=True
+        )
+        self._thread.start()
+
+    def _make_room(
+        self, report: Union[bytes, ReportBuilder], late_policy: LateReportPolicy
+    ) -> bool:
+        """Applies the overflow policy. Returns False if `report` was merged."""
+        stats = self._stats
+
+        if self.policy == OverflowPolicy.DROP_OLDEST:
+            self._queue.popleft()
+            stats.dropped += 1
+            return True
+
+        if self.policy == OverflowPolicy.MERGE and isinstance(report, bytes):
+            enqueued_ns, queued, queued_policy = self._queue[-1]
+            merged = self._merge(queued, report) if isinstance(queued, bytes) else None
+            if merged is not None:
+                self._queue[-1] = (
+                    enqueued_ns, merged, _stricter(queued_policy, late_policy)
+                )
+                stats.merged += 1
+                return False
+
+        while len(self._queue) >= self._maxlen and not self._closed:
+            self._cond.wait()
+        return True
+
+    def submit(
+        self,
+        report: Union[bytes, ReportBuilder],
+        late_policy: Optional[LateReportPolicy] = None,
+    ):
+        """Queues `report` for writing.
+
+        Args:
+            report: The report, or a builder (see `submit_deferred`).
+            late_policy: Overrides the writer's `late_policy` for this report.
+        """
+        if late_policy is None:
+            late_policy = self.late_policy
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f'HID writer for {self.hid_path} is closed')
+
+            if len(self._queue) >= self._maxlen and not self._make_room(
+                report, late_policy
+            ):
+                return
+
+            self._queue.append((time.monotonic_ns(), report, late_policy))
+            stats = self._stats
+            stats.enqueued += 1
+            if len(self._queue) > stats.max_depth:
+                stats.max_depth = len(self._queue)
+            self._cond.notify_all()
+
+    def submit_deferred(
+        self, build: ReportBuilder, late_policy: Optional[LateReportPolicy] = None
+    ):
+        """Queues a report that is only built when it is its turn to be written.
+
+        `build` is called from the writer thread. Whenever it returns a report,
+        the report is written and `build` goes back to the end of the queue; it
+        is dropped once it returns None. This lets a producer keep folding new
+        input into the report it has pending until the endpoint is free.
+        """
+        self.submit(build, late_policy)
+
+    def _write(
+        self, report: bytes, deadline_ns: int, late_policy: LateReportPolicy
+    ) -> bool:
+        """Writes `report` according to `late_policy`.
+
+        Returns:
+            True if the report was written.
+        """
+        stats = self._stats
+        drop_late = late_policy == LateReportPolicy.DROP
+
+        if drop_late:
+            if time.monotonic_ns() >= deadline_ns:
+                # Went stale in the queue, not worth a syscall.
+                stats.late += 1
+                stats.late_dropped += 1
+                return False
+            wait_until_ns = deadline_ns
+        else:
+            wait_until_ns = max(deadline_ns, time.monotonic_ns()) + _STALLED_ENDPOINT_NS
+
+        try:
+            self._handles.write(self.hid_path, report, wait_until_ns)
+        except TimeoutError:
+            stats.late += 1
+            stats.late_dropped += 1
+            if not drop_late:
+                self._logger.error(
+                    'Failed to write to HID interface: %s. Is USB cable connected?',
+                    self.hid_path,
+                )
+            return False
+        except Exception:  # pylint: disable=broad-except
+            # Keep the writer alive; the next report may well succeed.
+            self._logger.exception('Failed to write to HID interface: %s', self.hid_path)
+            return False
+
+        if time.monotonic_ns() > deadline_ns:
+            stats.late += 1
+        return True
+
+    def _build(self, build: ReportBuilder) -> Optional[bytes]:
+        try:
+            return build()
+        except Exception:  # pylint: disable=broad-except
+            self._logger.exception('Failed to build report for %s', self.hid_path)
+            return None
+
+    def _run(self):
+        cond = self._cond
+        stats = self._stats
+
+        while True:
+            with cond:
+                while not self._queue and not self._closed:
+                    cond.wait()
+                if not self._queue:
+                    return
+                enqueued_ns, item, late_policy = self._queue.popleft()
+                self._in_flight = True
+                cond.notify_all()
+
+            if isinstance(item, bytes):
+                report = item
+                deadline_ns = enqueued_ns + self._deadline_ns
+            else:
+                report = self._build(item)
+                deadline_ns = time.monotonic_ns() + self._deadline_ns
+                if report is None:
+                    with cond:
+                        self._in_flight = False
+                        cond.notify_all()
+                    continue
+
+            write_start_ns = time.monotonic_ns()
+            written = self._write(report, deadline_ns, late_policy)
+            written_ns = time.monotonic_ns()
+            latency_ns = written_ns - enqueued_ns
+            if written:
+                self.queue_wait.record_ns(write_start_ns - enqueued_ns)
+                self.write_time.record_ns(written_ns - write_start_ns)
+
+            with cond:
+                self._in_flight = False
+                if not isinstance(item, bytes):
+                    # Not subject to the overflow policy: the builder already
+                    # held its slot and the writer must never wait on itself.
+                    self._queue.append((time.monotonic_ns(), item, late_policy))
+                if written:
+                    stats.written += 1
+                    stats.latency_ns_total += latency_ns
+                    if latency_ns > stats.latency_ns_max:
+                        stats.latency_ns_max = latency_ns
+                cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every queued report has been written.
+
+        Returns:
+            False if `timeout` expired first.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._queue and not self._in_flight, timeout
+            )
+
+    def stats(self) -> HidWriterStats:
+        with self._cond:
+            s = self._stats
+            return HidWriterStats(
+                depth=len(self._queue),
+                max_depth=s.max_depth,
+                enqueued=s.enqueued,
+                written=s.written,
+                dropped=s.dropped,
+                merged=s.merged,
+                late=s.late,
+                late_dropped=s.late_dropped,
+                latency_ns_total=s.latency_ns_total,
+                latency_ns_max=s.latency_ns_max,
+            )
+
+    def close(self, timeout: Optional[float] = None):
+        """Writes out what is still queued and stops the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+
+def _writer_latency(
+    writers: dict[str, Union['HidWriter', 'AsyncHidWriter']], reset: bool
+) -> dict[str, dict[str, LatencyHistogram]]:
+    writers = dict(writers)
+    return {
+        'queue_wait': {
+            hid_path: writer.queue_wait.snapshot(reset)
+            for hid_path, writer in writers.items()
+        },
+        'write': {
+            hid_path: writer.write_time.snapshot(reset)
+            for hid_path, writer in writers.items()
+        },
+    }
+
+
+class HidWriterPool:
+    """Lazily creates one `HidWriter` per HID endpoint."""
+
+    _logger: logging.Logger
+    _handles: HidHandleRegistry
+    _writers: dict[str, HidWriter]
+
+    def __init__(self, handles: HidHandleRegistry, logger: logging.Logger):
+        self._handles = handles
+        self._logger = logger
+        self._writers = {}
+        self._lock = threading.Lock()
+
+    def writer(self, hid_path: str, **options) -> HidWriter:
+        """Returns the writer for `hid_path`.
+
+        `options` are passed on to `HidWriter` and only take effect when the
+        writer is first created.
+        """
+        writer = self._writers.get(hid_path)
+        if writer is None:
+            with self._lock:
+                writer = self._writers.get(hid_path)
+                if writer is None:
+                    writer = HidWriter(hid_path, self._handles, self._logger, **options)
+                    self._writers[hid_path] = writer
+        return writer
+
+    def submit(self, hid_path: str, report: bytes):
+        self.writer(hid_path).submit(report)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for writer in list(self._writers.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not writer.flush(remaining):
+                return False
+        return True
+
+    def stats(self) -> dict[str, HidWriterStats]:
+        return {
+            hid_path: writer.stats() for hid_path, writer in list(self._writers.items())
+        }
+
+    def latency(self, reset: bool = False) -> dict[str, dict[str, LatencyHistogram]]:
+        """Histograms by metric ('queue_wait' or 'write'), then by endpoint."""
+        return _writer_latency(self._writers, reset)
+
+    def close(self, timeout: Optional[float] = None):
+        with self._lock:
+            writers = list(self._writers.values())
+            self._writers.clear()
+
+        for writer in writers:
+            writer.close(timeout)
+
+
+class AsyncHidWriter:
+    """`HidWriter` counterpart driven by an asyncio event loop.
+
+    Reports are written straight from the loop. When the host has not read
+    the previous report yet, the writer waits for the endpoint with
+    `loop.add_writer` on its non-blocking descriptor instead of holding a
+    thread in poll().
+
+    Must only be used from the loop's thread. `submit` never blocks, so under
+    OverflowPolicy.BLOCK the queue may grow past `maxlen`.
+    """
+
+    hid_path: str
+    policy: OverflowPolicy
+    late_policy: LateReportPolicy
+    _logger: logging.Logger
+    _handles: HidHandleRegistry
+    _merge: Optional[MergeFunction]
+    _queue: collections.deque[
+        tuple[int, Union[bytes, ReportBuilder], LateReportPolicy]
+    ]
+
+    def __init__(
+        self,
+        hid_path: str,
+        handles: HidHandleRegistry,
+        logger: logging.Logger,
+        loop: asyncio.AbstractEventLoop,
+        maxlen: int = 64,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        merge: Optional[MergeFunction] = None,
+        deadline_ms: int = DEFAULT_DEADLINE_MS,
+        late_policy: LateReportPolicy = LateReportPolicy.WRITE,
+    ):
+        if policy == OverflowPolicy.MERGE and merge is None:
+            raise ValueError('MERGE overflow policy requires a merge function')
+
+        self.hid_path = hid_path
+        self.policy = policy
+        self.late_policy = late_policy
+        self._deadline_ns = deadline_ms * 1_000_000
+        self._handles = handles
+        self._logger = logger
+        self._loop = loop
+        self._maxlen = maxlen
+        self._merge = merge
+        self._queue = collections.deque()
+        self._waiting_fd: Optional[int] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._stats = HidWriterStats()
+        # See HidWriter. Time spent waiting for the endpoint to become
+        # writable counts as queue wait here.
+        self.queue_wait = LatencyHistogram()
+        self.write_time = LatencyHistogram()
+
+    def _make_room(
+        self, report: Union[bytes, ReportBuilder], late_policy: LateReportPolicy
+    ) -> bool:
+        """Applies the overflow policy. Returns False if `report` was merged."""
+        stats = self._stats
+
+        if self.policy == OverflowPolicy.DROP_OLDEST and self._waiting_fd is None:
+            self._queue.popleft()
+            stats.dropped += 1
+        elif self.policy == OverflowPolicy.DROP_OLDEST and len(self._queue) > 1:
+            # The head is the report the writer is waiting to write.
+            del self._queue[1]
+            stats.dropped += 1
+        elif self.policy == OverflowPolicy.MERGE and isinstance(report, bytes):
+            enqueued_ns, queued, queued_policy = self._queue[-1]
+            merged = self._merge(queued, report) if isinstance(queued, bytes) else None
+            if merged is not None:
+                self._queue[-1] = (
+                    enqueued_ns, merged, _stricter(queued_policy, late_policy)
+                )
+                stats.merged += 1
+                return False
+        return True
+
+    def submit(
+        self,
+        report: Union[bytes, ReportBuilder],
+        late_policy: Optional[LateReportPolicy] = None,
+    ):
+        """Queues `report` and writes as much of the queue as the host takes."""
+        if late_policy is None:
+            late_policy = self.late_policy
+        if len(self._queue) >= self._maxlen and not self._make_room(
+            report, late_policy
+        ):
+            return
+
+        self._queue.append((time.monotonic_ns(), report, late_policy))
+        stats = self._stats
+        stats.enqueued += 1
+        if len(self._queue) > stats.max_depth:
+            stats.max_depth = len(self._queue)
+
+        if self._waiting_fd is None:
+            self._drain()
+
+    def submit_deferred(
+        self, build: ReportBuilder, late_policy: Optional[LateReportPolicy] = None
+    ):
+        """See `HidWriter.submit_deferred`; `build` is called on the loop."""
+        self.submit(build, late_policy)
+
+    def _build(self, build: ReportBuilder) -> Optional[bytes]:
+        try:
+            return build()
+        except Exception:  # pylint: disable=broad-except
+            self._logger.exception('Failed to build report for %s', self.hid_path)
+            return None
+
+    def _drain(self):
+        queue = self._queue
+        stats = self._stats
+        self._idle.clear()
+
+        while queue:
+            enqueued_ns, item, late_policy = queue[0]
+            now_ns = time.monotonic_ns()
+            if isinstance(item, bytes):
+                report = item
+                deadline_ns = enqueued_ns + self._deadline_ns
+            else:
+                report = self._build(item)
+                if report is None:
+                    queue.popleft()
+                    continue
+                # The builder's input is now in `report`; it has to stay
+                # queued even if the host is not ready for it.
+                queue[0] = (now_ns, report, late_policy)
+                queue.append((now_ns, item, late_policy))
+                enqueued_ns, deadline_ns = now_ns, now_ns + self._deadline_ns
+
+            if late_policy == LateReportPolicy.DROP and now_ns >= deadline_ns:
+                queue.popleft()
+                stats.late += 1
+                stats.late_dropped += 1
+                continue
+
+            write_start_ns = time.monotonic_ns()
+            try:
+                self._handles.write(self.hid_path, report)
+            except BlockingIOError:
+                self._wait(deadline_ns, late_policy)
+                return
+            except Exception:  # pylint: disable=broad-except
+                queue.popleft()
+                self._logger.exception(
+                    'Failed to write to HID interface: %s', self.hid_path
+                )
+                continue
+
+            queue.popleft()
+            written_ns = time.monotonic_ns()
+            self.queue_wait.record_ns(write_start_ns - enqueued_ns)
+            self.write_time.record_ns(written_ns - write_start_ns)
+            if written_ns > deadline_ns:
+                stats.late += 1
+            latency_ns = written_ns - enqueued_ns
+            stats.written += 1
+            stats.latency_ns_total += latency_ns
+            if latency_ns > stats.latency_ns_max:
+                stats.latency_ns_max = latency_ns
+
+        self._idle.set()
+
+    def _wait(self, deadline_ns: int, late_policy: LateReportPolicy):
+        now_ns = time.monotonic_ns()
+        if late_policy == LateReportPolicy.DROP:
+            wait_until_ns = deadline_ns
+        else:
+            wait_until_ns = max(deadline_ns, now_ns) + _STALLED_ENDPOINT_NS
+
+        fd = self._handles.fileno(self.hid_path)
+        self._loop.add_writer(fd, self._on_writable)
+        self._waiting_fd = fd
+        self._timer = self._loop.call_later(
+            max(0, wait_until_ns - now_ns) / 1e9, self._on_timeout
+        )
+
+    def _stop_waiting(self):
+        if self._waiting_fd is not None:
+            self._loop.remove_writer(self._waiting_fd)
+            self._waiting_fd = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_writable(self):
+        self._stop_waiting()
+        self._drain()
+
+    def _on_timeout(self):
+        self._stop_waiting()
+        _, _, late_policy = self._queue.popleft()
+        self._stats.late += 1
+        self._stats.late_dropped += 1
+        if late_policy == LateReportPolicy.WRITE:
+            self._logger.error(
+                'Failed to write to HID interface: %s. Is USB cable connected?',
+                self.hid_path,
+            )
+        self._drain()
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every queued report has been written.
+
+        Returns:
+            False if `timeout` expired first.
+        """
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def stats(self) -> HidWriterStats:
+        s = self._stats
+        return HidWriterStats(
+            depth=len(self._queue),
+            max_depth=s.max_depth,
+            enqueued=s.enqueued,
+            written=s.written,
+            dropped=s.dropped,
+            merged=s.merged,
+            late=s.late,
+            late_dropped=s.late_dropped,
+            latency_ns_total=s.latency_ns_total,
+            latency_ns_max=s.latency_ns_max,
+        )
+
+    def close(self):
+        """Stops waiting on the endpoint. Reports still queued are discarded."""
+        self._stop_waiting()
+        self._queue.clear()
+        self._idle.set()
+
+
+class AsyncHidWriterPool:
+    """Lazily creates one `AsyncHidWriter` per HID endpoint."""
+
+    _logger: logging.Logger
+    _handles: HidHandleRegistry
+    _writers: dict[str, AsyncHidWriter]
+
+    def __init__(
+        self,
+        handles: HidHandleRegistry,
+        logger: logging.Logger,
+        loop: asyncio.AbstractEventLoop,
+    ):
+        self._handles = handles
+        self._logger = logger
+        self._loop = loop
+        self._writers = {}
+
+    def writer(self, hid_path: str, **options) -> AsyncHidWriter:
+        """Returns the writer for `hid_path`. See `HidWriterPool.writer`."""
+        writer = self._writers.get(hid_path)
+        if writer is None:
+            writer = AsyncHidWriter(
+                hid_path, self._handles, self._logger, self._loop, **options
+            )
+            self._writers[hid_path] = writer
+        return writer
+
+    def submit(self, hid_path: str, report: bytes):
+        self.writer(hid_path).submit(report)
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for writer in list(self._writers.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not await writer.flush(remaining):
+                return False
+        return True
+
+    def stats(self) -> dict[str, HidWriterStats]:
+        return {
+            hid_path: writer.stats() for hid_path, writer in list(self._writers.items())
+        }
+
+    def latency(self, reset: bool = False) -> dict[str, dict[str, LatencyHistogram]]:
+        """Histograms by metric ('queue_wait' or 'write'), then by endpoint."""
+        return _writer_latency(self._writers, reset)
+
+    def close(self):
+        writers = list(self._writers.values())
+        self._writers.clear()
+
+        for writer in writers:
+            writer.close()
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from hid_handles import HidHandleRegistry
+from hid_writer import AsyncHidWriter
+from hid_writer import HidWriter
+from hid_writer import LateReportPolicy
+from hid_writer import OverflowPolicy
+
+
+class Handles:
+    """Records writes and can hold the writer thread inside a write."""
+
+    def __init__(self):
+        self.writes = []
+        self.release = threading.Event()
+        self.release.set()
+        self.writing = threading.Event()
+
+    def write(self, hid_path, report, deadline_ns=None):
+        self.writing.set()
+        self.release.wait()
+        self.writes.append(report)
+
+
+def _sum_merge(queued, report):
+    return bytes([queued[0] + report[0]])
+
+
+class HidWriterTest(unittest.TestCase):
+    def _writer(self, handles, **kwargs):
+        writer = HidWriter('/dev/hidg1', handles, logging.getLogger(__name__), **kwargs)
+        self.addCleanup(writer.close)
+        return writer
+
+    def _stall(self, writer, handles):
+        # Park the writer thread inside a write so submissions pile up.
+        handles.release.clear()
+        writer.submit(b'\x00')
+        handles.writing.wait(timeout=1)
+
+    def test_reports_are_written_in_order(self):
+        handles = Handles()
+        writer = self._writer(handles)
+
+        for i in range(1, 20):
+            writer.submit(bytes([i]))
+        writer.flush()
+
+        self.assertEqual(handles.writes, [bytes([i]) for i in range(1, 20)])
+        stats = writer.stats()
+        self.assertEqual(stats.depth, 0)
+        self.assertEqual(stats.written, 19)
+        self.assertGreater(stats.latency_ns_total, 0)
+        self.assertEqual(writer.queue_wait.count, 19)
+        self.assertEqual(writer.write_time.count, 19)
+
+    def test_drop_oldest_discards_queued_reports(self):
+        handles = Handles()
+        writer = self._writer(handles, maxlen=2, policy=OverflowPolicy.DROP_OLDEST)
+        self._stall(writer, handles)
+
+        for i in range(1, 5):
+            writer.submit(bytes([i]))
+        self.assertEqual(writer.stats().depth, 2)
+        handles.release.set()
+        writer.flush()
+
+        self.assertEqual(handles.writes, [b'\x00', b'\x03', b'\x04'])
+        self.assertEqual(writer.stats().dropped, 2)
+
+    def test_merge_folds_into_newest_queued_report(self):
+        handles = Handles()
+        writer = self._writer(
+            handles, maxlen=2, policy=OverflowPolicy.MERGE, merge=_sum_merge
+        )
+        self._stall(writer, handles)
+
+        for i in range(1, 5):
+            writer.submit(bytes([i]))
+        handles.release.set()
+        writer.flush()
+
+        self.assertEqual(handles.writes, [b'\x00', b'\x01', b'\x09'])
+        self.assertEqual(writer.stats().merged, 2)
+
+    def test_block_waits_for_room(self):
+        handles = Handles()
+        writer = self._writer(handles, maxlen=1)
+        self._stall(writer, handles)
+        writer.submit(b'\x01')
+
+        submitter = threading.Thread(target=writer.submit, args=(b'\x02',))
+        submitter.start()
+        submitter.join(timeout=0.02)
+        self.assertTrue(submitter.is_alive())
+
+        handles.release.set()
+        submitter.join()
+        writer.flush()
+
+        self.assertEqual(handles.writes, [b'\x00', b'\x01', b'\x02'])
+        self.assertEqual(writer.stats().max_depth, 1)
+
+    def test_drop_policy_discards_reports_that_went_stale_in_the_queue(self):
+        handles = Handles()
+        writer = self._writer(
+            handles, deadline_ms=1, late_policy=LateReportPolicy.DROP
+        )
+        self._stall(writer, handles)
+        writer.submit(b'\x01')
+        time.sleep(0.005)
+        handles.release.set()
+        writer.flush()
+
+        self.assertEqual(handles.writes, [b'\x00'])
+        self.assertEqual(writer.stats().late_dropped, 1)
+
+    def test_write_policy_still_writes_late_reports(self):
+        handles = Handles()
+        writer = self._writer(handles, deadline_ms=1)
+        self._stall(writer, handles)
+        writer.submit(b'\x01')
+        time.sleep(0.005)
+        handles.release.set()
+        writer.flush()
+
+        self.assertEqual(handles.writes, [b'\x00', b'\x01'])
+        self.assertEqual(writer.stats().late_dropped, 0)
+        self.assertGreaterEqual(writer.stats().late, 1)
+
+
+class AsyncHidWriterTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.hid_path = os.path.join(tmp.name, 'hidg1')
+        self.handles = HidHandleRegistry(logging.getLogger(__name__))
+        self.addCleanup(self.handles.close)
+
+    def _writer(self, **kwargs):
+        writer = AsyncHidWriter(
+            self.hid_path,
+            self.handles,
+            logging.getLogger(__name__),
+            asyncio.get_running_loop(),
+            **kwargs,
+        )
+        self.addCleanup(writer.close)
+        return writer
+
+    def _fill(self):
+        # A FIFO stands in for a gadget endpoint whose host stopped polling.
+        os.mkfifo(self.hid_path)
+        reader = os.open(self.hid_path, os.O_RDONLY | os.O_NONBLOCK)
+        self.addCleanup(os.close, reader)
+        fd = self.handles.fileno(self.hid_path)
+        try:
+            while True:
+                os.write(fd, b'\x00' * 4096)
+        except BlockingIOError:
+            pass
+        return reader
+
+    async def test_reports_are_written_from_the_loop(self):
+        writer = self._writer()
+
+        for i in range(1, 4):
+            writer.submit(bytes([i]))
+
+        self.assertTrue(await writer.flush(1))
+        with open(self.hid_path, 'rb') as f:
+            self.assertEqual(f.read(), b'\x01\x02\x03')
+        self.assertEqual(writer.stats().written, 3)
+
+    async def test_waits_for_endpoint_to_become_writable(self):
+        reader = self._fill()
+        writer = self._writer(deadline_ms=1000)
+
+        writer.submit(b'\x01')
+        self.assertEqual(writer.stats().depth, 1)
+        asyncio.get_running_loop().call_later(0.01, os.read, reader, 1 << 20)
+
+        self.assertTrue(await writer.flush(1))
+        self.assertEqual(writer.stats().written, 1)
+
+    async def test_drop_policy_discards_report_after_deadline(self):
+        self._fill()
+        writer = self._writer(deadline_ms=5, late_policy=LateReportPolicy.DROP)
+
+        writer.submit(b'\x01')
+
+        self.assertTrue(await writer.flush(1))
+        stats = writer.stats()
+        self.assertEqual(stats.written, 0)
+        self.assertEqual(stats.late_dropped, 1)
+
+    async def test_deferred_report_is_kept_while_endpoint_is_busy(self):
+        reader = self._fill()
+        writer = self._writer(deadline_ms=1000)
+        pending = [b'\x01', b'\x02']
+
+        writer.submit_deferred(lambda: pending.pop(0) if pending else None)
+        await asyncio.sleep(0.01)
+        self.assertEqual(pending, [b'\x02'])
+        os.read(reader, 1 << 20)
+
+        self.assertTrue(await writer.flush(1))
+        self.assertEqual(os.read(reader, 16), b'\x01\x02')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,23 @@
+import functools
 from dataclasses import dataclass
+from enum import Enum
 from typing import List
+from typing import NamedTuple
 from typing import Optional
 
+from hid.reports import KEYBOARD_REPORT_RELEASED
+from hid.reports import pack_consumer_report
+from hid.reports import pack_keyboard_report
+from key import Key
 from key import KeyActionType
 from key_str_utils import key_action_type_from_name
 from key_str_utils import str_to_key
+from key_utils import is_media_key
+from key_utils import is_modifier_key
+from key_utils import key_to_keycode
+
+# Distinct hotkey strings whose compiled programs are kept.
+HOTKEY_CACHE_SIZE = 256
 
 
 @dataclass
@@ -91,3 +104,119 @@ def parse_hotkey(hotkey_str: str) -> List[HotkeyStep]:
             i += 1
 
     return steps
+
+
+class KeyEndpoint(Enum):
+    """Which part of the keyboard service a key is sent through."""
+
+    KEYBOARD = 0
+    MODIFIER = 1
+    MEDIA = 2
+
+
+class CompiledStep(NamedTuple):
+    """A hotkey step resolved down to what is sent to the HID service."""
+
+    key_name: str
+    key_code: int  # HID usage
+    endpoint: KeyEndpoint
+    action_type: KeyActionType  # DOWN or UP
+    delay_ns: int  # Time to wait before this step
+
+
+HotkeyProgram = tuple[CompiledStep, ...]
+
+
+class TimelineEvent(NamedTuple):
+    """A report to write `offset_ns` after the hotkey started."""
+
+    offset_ns: int
+    endpoint: KeyEndpoint  # KEYBOARD or MEDIA
+    report: bytes
+
+
+HotkeyTimeline = tuple[TimelineEvent, ...]
+
+
+class CompiledHotkey(NamedTuple):
+    steps: HotkeyProgram
+    # The reports the steps produce when no key is held at the start.
+    timeline: HotkeyTimeline
+
+
+def _compile_step(step: HotkeyStep) -> CompiledStep:
+    key = Key(step.key_code)
+    if is_modifier_key(key):
+        endpoint = KeyEndpoint.MODIFIER
+    elif is_media_key(key):
+        endpoint = KeyEndpoint.MEDIA
+    else:
+        endpoint = KeyEndpoint.KEYBOARD
+
+    return CompiledStep(
+        key_name=key.name,
+        key_code=key_to_keycode(key),
+        endpoint=endpoint,
+        action_type=step.action_type,
+        delay_ns=step.wait * 1_000_000 if step.wait else 0,
+    )
+
+
+def compile_timeline(steps: HotkeyProgram) -> HotkeyTimeline:
+    """Plays `steps` against a released keyboard and records every report.
+
+    Key state is tracked the same way `HidKeyboardService` does it, so each
+    report already carries the modifiers and keys held at that point.
+
+    Raises:
+        ValueError: If more than 6 keys would be held at once.
+    """
+    timeline = []
+    offset_ns = 0
+    modifiers = 0
+    keys = (0,) * (len(KEYBOARD_REPORT_RELEASED) - 2)
+
+    for step in steps:
+        offset_ns += step.delay_ns
+        down = step.action_type == KeyActionType.DOWN
+
+        if step.endpoint == KeyEndpoint.MEDIA:
+            report = pack_consumer_report(step.key_code if down else 0)
+            timeline.append(TimelineEvent(offset_ns, KeyEndpoint.MEDIA, report))
+            continue
+
+        if step.endpoint == KeyEndpoint.MODIFIER:
+            modifiers = modifiers | step.key_code if down else modifiers & ~step.key_code
+        elif down and step.key_code not in keys:
+            if 0 not in keys:
+                raise ValueError('Cannot press more than 6 keys at once')
+            free_index = keys.index(0)
+            keys = keys[:free_index] + (step.key_code,) + keys[free_index + 1 :]
+        elif not down:
+            keys = tuple(0 if k == step.key_code else k for k in keys)
+
+        report = pack_keyboard_report(modifiers, keys)
+        timeline.append(TimelineEvent(offset_ns, KeyEndpoint.KEYBOARD, report))
+
+    return tuple(timeline)
+
+
+@functools.lru_cache(maxsize=HOTKEY_CACHE_SIZE)
+def compile_hotkey(hotkey_str: str) -> CompiledHotkey:
+    """Parses `hotkey_str` into what `InputService.press_hotkey` sends.
+
+    Clients send the same few hotkeys over and over, so the results for the
+    most recently used strings are cached. They are immutable and can be
+    shared between calls.
+
+    Raises:
+        KeyError: If the string names an unknown key.
+        ValueError: If the hotkey holds more than 6 keys at once.
+    """
+    steps = tuple(_compile_step(step) for step in parse_hotkey(hotkey_str))
+    return CompiledHotkey(steps, compile_timeline(steps))
+
+
+def hotkey_cache_info():
+    """Hits, misses and size of the `compile_hotkey` cache."""
+    return compile_hotkey.cache_info()
@@ -0,0 +1,74 @@
+import unittest
+
+from hotkey_parser import CompiledStep
+from hotkey_parser import KeyEndpoint
+from hotkey_parser import TimelineEvent
+from hotkey_parser import compile_hotkey
+from hotkey_parser import hotkey_cache_info
+from key import KeyActionType
+
+
+class CompileHotkeyTest(unittest.TestCase):
+    def setUp(self):
+        compile_hotkey.cache_clear()
+
+    def test_steps_are_resolved_to_hid_usages_and_endpoints(self):
+        steps = compile_hotkey('{Ctrl Down}a{Ctrl Up:250}').steps
+
+        ctrl = ('KEY_LCONTROL', 0x01, KeyEndpoint.MODIFIER)  # modifier bit
+        a = ('KEY_A', 0x04, KeyEndpoint.KEYBOARD)
+        self.assertEqual(
+            steps,
+            (
+                CompiledStep(*ctrl, KeyActionType.DOWN, 0),
+                CompiledStep(*a, KeyActionType.DOWN, 0),
+                CompiledStep(*a, KeyActionType.UP, 0),
+                CompiledStep(*ctrl, KeyActionType.UP, 250_000_000),
+            ),
+        )
+
+    def test_timeline_folds_held_keys_into_each_report(self):
+        timeline = compile_hotkey('{Shift Down}ab{Shift Up:100}{Volume_Up}').timeline
+
+        def keyboard(offset_ns, modifiers, key=0):
+            return TimelineEvent(
+                offset_ns, KeyEndpoint.KEYBOARD, bytes([modifiers, 0, key, 0, 0, 0, 0, 0])
+            )
+
+        shift = 0x02
+        self.assertEqual(
+            timeline,
+            (
+                keyboard(0, shift),
+                keyboard(0, shift, 0x04),
+                keyboard(0, shift),
+                keyboard(0, shift, 0x05),
+                keyboard(0, shift),
+                keyboard(100_000_000, 0),
+                TimelineEvent(100_000_000, KeyEndpoint.MEDIA, b'\xe9\x00'),
+                TimelineEvent(100_000_000, KeyEndpoint.MEDIA, b'\x00\x00'),
+            ),
+        )
+
+    def test_holding_more_than_six_keys_does_not_compile(self):
+        with self.assertRaises(ValueError):
+            compile_hotkey('{a Down}{b Down}{c Down}{d Down}{e Down}{f Down}{g Down}')
+
+    def test_repeated_hotkeys_are_served_from_the_cache(self):
+        first = compile_hotkey('{Alt}{Tab}')
+        second = compile_hotkey('{Alt}{Tab}')
+        compile_hotkey('x')
+
+        self.assertIs(first, second)
+        info = hotkey_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 2))
+
+    def test_unknown_keys_raise_and_are_not_cached(self):
+        with self.assertRaises(KeyError):
+            compile_hotkey('{NoSuchKey}')
+
+        self.assertEqual(hotkey_cache_info().currsize, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,21 @@
 import json
 import logging
-import multiprocessing
 import shlex
 import subprocess
 from typing import NoReturn
-from collections.abc import Iterable
+
+from hid.reports import MOUSE_REPORT_REL8
+from hid.reports import MouseReportFormat
+from hid.reports import ReportHex
+from hid.reports import pack_consumer_report
+from hid.reports import pack_keyboard_report
+from hid_handles import HidEndpointStats
+from hid_handles import HidHandleRegistry
 
 
 KEYBOARD_PAGE = 0x07
 CONSUMER_PAGE = 0x0C
 
-_hid_lock = multiprocessing.Lock()
-
 
 class InputBackend:
     def send_keyboard_report(self, modifiers: int, keys: tuple[int, ...]) -> None:
@@ -41,34 +45,35 @@ class UsbGadgetBackend(InputBackend):
         mouse_path: str,
         media_path: str,
         logger: logging.Logger,
+        mouse_report_format: MouseReportFormat = MOUSE_REPORT_REL8,
     ):
         self.keyboard_path = keyboard_path
         self.mouse_path = mouse_path
         self.media_path = media_path
+        self.mouse_report_format = mouse_report_format
         self._logger = logger
+        self._handles = HidHandleRegistry(logger)
 
-    def _write_to_hid(self, hid_path: str, buffer: Iterable[int]) -> None:
-        if self._logger.getEffectiveLevel() == logging.DEBUG:
-            self._logger.debug(
-                'writing to HID interface %s: %s',
-                hid_path,
-                ' '.join([f'{x:#04x}' for x in buffer]),
-            )
+    def _write_to_hid(self, hid_path: str, report: bytes) -> None:
+        self._logger.debug(
+            'writing to HID interface %s: %s', hid_path, ReportHex(report)
+        )
 
         try:
-            with _hid_lock:
-                with open(hid_path, 'ab+') as hid_handle:
-                    hid_handle.write(bytearray(buffer))
+            self._handles.write(hid_path, report)
         except BlockingIOError:
             self._logger.error(
                 'Failed to write to HID interface: %s. Is USB cable connected?', hid_path
             )
 
+    def write_stats(self) -> dict[str, HidEndpointStats]:
+        return self._handles.stats()
+
     def send_keyboard_report(self, modifiers: int, keys: tuple[int, ...]) -> None:
-        self._write_to_hid(self.keyboard_path, (modifiers, 0, *keys))
+        self._write_to_hid(self.keyboard_path, pack_keyboard_report(modifiers, keys))
 
     def send_consumer_report(self, usage: int) -> None:
-        self._write_to_hid(self.media_path, (usage & 0xFF, usage >> 8))
+        self._write_to_hid(self.media_path, pack_consumer_report(usage))
 
     def send_mouse_report(
         self,
@@ -78,19 +83,20 @@ class UsbGadgetBackend(InputBackend):
         vertical_wheel: int,
         horizontal_wheel: int,
     ) -> None:
+        report_format = self.mouse_report_format
         self._write_to_hid(
             self.mouse_path,
-            (
+            report_format.pack(
                 buttons,
-                x & 0xFF,
-                y & 0xFF,
-                vertical_wheel & 0xFF,
-                horizontal_wheel & 0xFF,
+                report_format.clamp(x),
+                report_format.clamp(y),
+                max(-127, min(127, vertical_wheel)),
+                max(-127, min(127, horizontal_wheel)),
             ),
         )
 
     def close(self) -> None:
-        pass
+        self._handles.close()
 
 
 class KarabinerBackend(InputBackend):
@@ -20,7 +20,7 @@ class KarabinerBackendTest(unittest.TestCase):
 
         backend.send_consumer_report(0x0224)
 
-        self.assertEqual(writes, [('/dev/null', (0x24, 0x02))])
+        self.assertEqual(writes, [('/dev/null', b'\x24\x02')])
 
     def test_keyboard_report_sends_state_transitions(self):
         backend = KarabinerBackend.__new__(KarabinerBackend)
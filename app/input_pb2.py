@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0f\x61pp/input.proto\"q\n\nKeyOptions\x12\x16\n\tno_repeat\x18\x01 \x01(\x08H\x00\x88\x01\x01\x12\x19\n\x0cno_modifiers\x18\x02 \x01(\x08H\x01\x88\x01\x01\x12\x11\n\tmodifiers\x18\x03 \x03(\x05\x42\x0c\n\n_no_repeatB\x0f\n\r_no_modifiers\"^\n\x03Key\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x1c\n\x04type\x18\x02 \x01(\x0e\x32\x0e.KeyActionType\x12!\n\x07options\x18\x03 \x01(\x0b\x32\x0b.KeyOptionsH\x00\x88\x01\x01\x42\n\n\x08_options\"Y\n\rHotkeyOptions\x12\x12\n\x05speed\x18\x01 \x01(\x05H\x00\x88\x01\x01\x12\x19\n\x0cno_modifiers\x18\x02 \x01(\x08H\x01\x88\x01\x01\x42\x08\n\x06_speedB\x0f\n\r_no_modifiers\"h\n\x06Hotkey\x12\x0e\n\x06hotkey\x18\x01 \x01(\t\x12\x1c\n\x04type\x18\x02 \x01(\x0e\x32\x0e.KeyActionType\x12$\n\x07options\x18\x03 \x01(\x0b\x32\x0e.HotkeyOptionsH\x00\x88\x01\x01\x42\n\n\x08_options\"k\n\x08MouseKey\x12\n\n\x02id\x18\x01 \x01(\x05\x12%\n\x04type\x18\x02 \x01(\x0e\x32\x17.MouseKey.KeyActionType\",\n\rKeyActionType\x12\x06\n\x02UP\x10\x00\x12\x08\n\x04\x44OWN\x10\x01\x12\t\n\x05PRESS\x10\x03\"3\n\tMouseMove\x12\t\n\x01x\x18\x01 \x01(\x02\x12\t\n\x01y\x18\x02 \x01(\x02\x12\x10\n\x08relative\x18\x03 \x01(\x08\"\x1b\n\x08Response\x12\x0f\n\x07message\x18\x01 \x01(\t\"n\n\x06\x43onfig\x12\x19\n\x0c\x63ursor_speed\x18\x01 \x01(\x02H\x00\x88\x01\x01\x12 \n\x13\x63ursor_acceleration\x18\x02 \x01(\x02H\x01\x88\x01\x01\x42\x0f\n\r_cursor_speedB\x16\n\x14_cursor_acceleration\"\x07\n\x05\x45mpty*,\n\rKeyActionType\x12\x06\n\x02UP\x10\x00\x12\x08\n\x04\x44OWN\x10\x01\x12\t\n\x05PRESS\x10\x03\x32\xf1\x01\n\x0cInputMethods\x12\x1b\n\x08PressKey\x12\x04.Key\x1a\t.Response\x12!\n\x0bPressHotkey\x12\x07.Hotkey\x1a\t.Response\x12%\n\rPressMouseKey\x12\t.MouseKey\x1a\t.Response\x12\"\n\tMoveMouse\x12\n.MouseMove\x1a\t.Response\x12\x19\n\x04Ping\x12\x06.Empty\x1a\t.Response\x12\x1d\n\tSetConfig\x12\x07.Config\x1a\x07.Config\x12\x1c\n\tGetConfig\x12\x06.Empty\x1a\x07.Configb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0f\x61pp/input.proto\"q\n\nKeyOptions\x12\x16\n\tno_repeat\x18\x01 \x01(\x08H\x00\x88\x01\x01\x12\x19\n\x0cno_modifiers\x18\x02 \x01(\x08H\x01\x88\x01\x01\x12\x11\n\tmodifiers\x18\x03 \x03(\x05\x42\x0c\n\n_no_repeatB\x0f\n\r_no_modifiers\"^\n\x03Key\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x1c\n\x04type\x18\x02 \x01(\x0e\x32\x0e.KeyActionType\x12!\n\x07options\x18\x03 \x01(\x0b\x32\x0b.KeyOptionsH\x00\x88\x01\x01\x42\n\n\x08_options\"Y\n\rHotkeyOptions\x12\x12\n\x05speed\x18\x01 \x01(\x05H\x00\x88\x01\x01\x12\x19\n\x0cno_modifiers\x18\x02 \x01(\x08H\x01\x88\x01\x01\x42\x08\n\x06_speedB\x0f\n\r_no_modifiers\"h\n\x06Hotkey\x12\x0e\n\x06hotkey\x18\x01 \x01(\t\x12\x1c\n\x04type\x18\x02 \x01(\x0e\x32\x0e.KeyActionType\x12$\n\x07options\x18\x03 \x01(\x0b\x32\x0e.HotkeyOptionsH\x00\x88\x01\x01\x42\n\n\x08_options\"k\n\x08MouseKey\x12\n\n\x02id\x18\x01 \x01(\x05\x12%\n\x04type\x18\x02 \x01(\x0e\x32\x17.MouseKey.KeyActionType\",\n\rKeyActionType\x12\x06\n\x02UP\x10\x00\x12\x08\n\x04\x44OWN\x10\x01\x12\t\n\x05PRESS\x10\x03\"3\n\tMouseMove\x12\t\n\x01x\x18\x01 \x01(\x02\x12\t\n\x01y\x18\x02 \x01(\x02\x12\x10\n\x08relative\x18\x03 \x01(\x08\")\n\x11MouseMoveAbsolute\x12\t\n\x01x\x18\x01 \x01(\x02\x12\t\n\x01y\x18\x02 \x01(\x02\"\xc7\x01\n\nInputEvent\x12\x0b\n\x03seq\x18\x01 \x01(\x04\x12\x13\n\x03key\x18\x02 \x01(\x0b\x32\x04.KeyH\x00\x12\x19\n\x06hotkey\x18\x03 \x01(\x0b\x32\x07.HotkeyH\x00\x12\x1e\n\tmouse_key\x18\x04 \x01(\x0b\x32\t.MouseKeyH\x00\x12 \n\nmouse_move\x18\x05 \x01(\x0b\x32\n.MouseMoveH\x00\x12\x31\n\x13mouse_move_absolute\x18\x06 \x01(\x0b\x32\x12.MouseMoveAbsoluteH\x00\x42\x07\n\x05\x65vent\"\'\n\x08InputAck\x12\x0b\n\x03seq\x18\x01 \x01(\x04\x12\x0e\n\x06\x66\x61iled\x18\x02 \x03(\x04\"\xd2\x01\n\x0fTimedInputEvent\x12\x11\n\toffset_us\x18\x01 \x01(\r\x12\x13\n\x03key\x18\x02 \x01(\x0b\x32\x04.KeyH\x00\x12\x19\n\x06hotkey\x18\x03 \x01(\x0b\x32\x07.HotkeyH\x00\x12\x1e\n\tmouse_key\x18\x04 \x01(\x0b\x32\t.MouseKeyH\x00\x12 \n\nmouse_move\x18\x05 \x01(\x0b\x32\n.MouseMoveH\x00\x12\x31\n\x13mouse_move_absolute\x18\x06 \x01(\x0b\x32\x12.MouseMoveAbsoluteH\x00\x42\x07\n\x05\x65vent\".\n\nEventBatch\x12 \n\x06\x65vents\x18\x01 \x03(\x0b\x32\x10.TimedInputEvent\"0\n\x11MotionLaneSession\x12\x0c\n\x04port\x18\x01 \x01(\r\x12\r\n\x05token\x18\x02 \x01(\x0c\"V\n\x0fTypeTextRequest\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x0e\n\x06layout\x18\x02 \x01(\t\x12\x13\n\x0binterval_ms\x18\x03 \x01(\r\x12\x10\n\x08rollover\x18\x04 \x01(\x08\"f\n\x10TypeTextProgress\x12\r\n\x05typed\x18\x01 \x01(\r\x12\r\n\x05total\x18\x02 \x01(\r\x12\x1e\n\x11\x66irst_unsupported\x18\x03 \x01(\rH\x00\x88\x01\x01\x42\x14\n\x12_first_unsupported\"\x1b\n\x08Response\x12\x0f\n\x07message\x18\x01 \x01(\t\"n\n\x06\x43onfig\x12\x19\n\x0c\x63ursor_speed\x18\x01 \x01(\x02H\x00\x88\x01\x01\x12 \n\x13\x63ursor_acceleration\x18\x02 \x01(\x02H\x01\x88\x01\x01\x42\x0f\n\r_cursor_speedB\x16\n\x14_cursor_acceleration\"\x07\n\x05\x45mpty\"\x1d\n\x0cStatsRequest\x12\r\n\x05reset\x18\x01 \x01(\x08\"`\n\x10LatencyHistogram\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0e\n\x06metric\x18\x02 \x01(\t\x12\x0e\n\x06\x63ounts\x18\x03 \x03(\x04\x12\x0e\n\x06sum_us\x18\x04 \x01(\x04\x12\x0e\n\x06max_us\x18\x05 \x01(\x04\"a\n\x05Stats\x12\x18\n\x10\x62ucket_bounds_us\x18\x01 \x03(\r\x12\x1e\n\x03rpc\x18\x02 \x03(\x0b\x32\x11.LatencyHistogram\x12\x1e\n\x03hid\x18\x03 \x03(\x0b\x32\x11.LatencyHistogram*,\n\rKeyActionType\x12\x06\n\x02UP\x10\x00\x12\x08\n\x04\x44OWN\x10\x01\x12\t\n\x05PRESS\x10\x03\x32\xfa\x03\n\x0cInputMethods\x12\x1b\n\x08PressKey\x12\x04.Key\x1a\t.Response\x12!\n\x0bPressHotkey\x12\x07.Hotkey\x1a\t.Response\x12%\n\rPressMouseKey\x12\t.MouseKey\x1a\t.Response\x12\"\n\tMoveMouse\x12\n.MouseMove\x1a\t.Response\x12\x32\n\x11MoveMouseAbsolute\x12\x12.MouseMoveAbsolute\x1a\t.Response\x12\x19\n\x04Ping\x12\x06.Empty\x1a\t.Response\x12)\n\x0bInputStream\x12\x0b.InputEvent\x1a\t.InputAck(\x01\x30\x01\x12$\n\nSendEvents\x12\x0b.EventBatch\x1a\t.Response\x12,\n\x0eOpenMotionLane\x12\x06.Empty\x1a\x12.MotionLaneSession\x12\x31\n\x08TypeText\x12\x10.TypeTextRequest\x1a\x11.TypeTextProgress0\x01\x12\x1d\n\tSetConfig\x12\x07.Config\x1a\x07.Config\x12\x1c\n\tGetConfig\x12\x06.Empty\x1a\x07.Config\x12!\n\x08GetStats\x12\r.StatsRequest\x1a\x06.Statsb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -47,12 +47,34 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_MOUSEKEY_KEYACTIONTYPE']._serialized_end=534
   _globals['_MOUSEMOVE']._serialized_start=536
   _globals['_MOUSEMOVE']._serialized_end=587
-  _globals['_RESPONSE']._serialized_start=589
-  _globals['_RESPONSE']._serialized_end=616
-  _globals['_CONFIG']._serialized_start=618
-  _globals['_CONFIG']._serialized_end=728
-  _globals['_EMPTY']._serialized_start=730
-  _globals['_EMPTY']._serialized_end=737
-  _globals['_INPUTMETHODS']._serialized_start=786
-  _globals['_INPUTMETHODS']._serialized_end=1027
+  _globals['_MOUSEMOVEABSOLUTE']._serialized_start=589
+  _globals['_MOUSEMOVEABSOLUTE']._serialized_end=630
+  _globals['_INPUTEVENT']._serialized_start=633
+  _globals['_INPUTEVENT']._serialized_end=832
+  _globals['_INPUTACK']._serialized_start=834
+  _globals['_INPUTACK']._serialized_end=873
+  _globals['_TIMEDINPUTEVENT']._serialized_start=876
+  _globals['_TIMEDINPUTEVENT']._serialized_end=1086
+  _globals['_EVENTBATCH']._serialized_start=1088
+  _globals['_EVENTBATCH']._serialized_end=1134
+  _globals['_MOTIONLANESESSION']._serialized_start=1136
+  _globals['_MOTIONLANESESSION']._serialized_end=1184
+  _globals['_TYPETEXTREQUEST']._serialized_start=1186
+  _globals['_TYPETEXTREQUEST']._serialized_end=1272
+  _globals['_TYPETEXTPROGRESS']._serialized_start=1274
+  _globals['_TYPETEXTPROGRESS']._serialized_end=1376
+  _globals['_RESPONSE']._serialized_start=1378
+  _globals['_RESPONSE']._serialized_end=1405
+  _globals['_CONFIG']._serialized_start=1407
+  _globals['_CONFIG']._serialized_end=1517
+  _globals['_EMPTY']._serialized_start=1519
+  _globals['_EMPTY']._serialized_end=1526
+  _globals['_STATSREQUEST']._serialized_start=1528
+  _globals['_STATSREQUEST']._serialized_end=1557
+  _globals['_LATENCYHISTOGRAM']._serialized_start=1559
+  _globals['_LATENCYHISTOGRAM']._serialized_end=1655
+  _globals['_STATS']._serialized_start=1657
+  _globals['_STATS']._serialized_end=1754
+  _globals['_INPUTMETHODS']._serialized_start=1803
+  _globals['_INPUTMETHODS']._serialized_end=2309
 # @@protoc_insertion_point(module_scope)
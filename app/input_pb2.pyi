@@ -79,6 +79,90 @@ class MouseMove(_message.Message):
     relative: bool
     def __init__(self, x: _Optional[float] = ..., y: _Optional[float] = ..., relative: bool = ...) -> None: ...
 
+class MouseMoveAbsolute(_message.Message):
+    __slots__ = ("x", "y")
+    X_FIELD_NUMBER: _ClassVar[int]
+    Y_FIELD_NUMBER: _ClassVar[int]
+    x: float
+    y: float
+    def __init__(self, x: _Optional[float] = ..., y: _Optional[float] = ...) -> None: ...
+
+class InputEvent(_message.Message):
+    __slots__ = ("seq", "key", "hotkey", "mouse_key", "mouse_move", "mouse_move_absolute")
+    SEQ_FIELD_NUMBER: _ClassVar[int]
+    KEY_FIELD_NUMBER: _ClassVar[int]
+    HOTKEY_FIELD_NUMBER: _ClassVar[int]
+    MOUSE_KEY_FIELD_NUMBER: _ClassVar[int]
+    MOUSE_MOVE_FIELD_NUMBER: _ClassVar[int]
+    MOUSE_MOVE_ABSOLUTE_FIELD_NUMBER: _ClassVar[int]
+    seq: int
+    key: Key
+    hotkey: Hotkey
+    mouse_key: MouseKey
+    mouse_move: MouseMove
+    mouse_move_absolute: MouseMoveAbsolute
+    def __init__(self, seq: _Optional[int] = ..., key: _Optional[_Union[Key, _Mapping]] = ..., hotkey: _Optional[_Union[Hotkey, _Mapping]] = ..., mouse_key: _Optional[_Union[MouseKey, _Mapping]] = ..., mouse_move: _Optional[_Union[MouseMove, _Mapping]] = ..., mouse_move_absolute: _Optional[_Union[MouseMoveAbsolute, _Mapping]] = ...) -> None: ...
+
+class InputAck(_message.Message):
+    __slots__ = ("seq", "failed")
+    SEQ_FIELD_NUMBER: _ClassVar[int]
+    FAILED_FIELD_NUMBER: _ClassVar[int]
+    seq: int
+    failed: _containers.RepeatedScalarFieldContainer[int]
+    def __init__(self, seq: _Optional[int] = ..., failed: _Optional[_Iterable[int]] = ...) -> None: ...
+
+class TimedInputEvent(_message.Message):
+    __slots__ = ("offset_us", "key", "hotkey", "mouse_key", "mouse_move", "mouse_move_absolute")
+    OFFSET_US_FIELD_NUMBER: _ClassVar[int]
+    KEY_FIELD_NUMBER: _ClassVar[int]
+    HOTKEY_FIELD_NUMBER: _ClassVar[int]
+    MOUSE_KEY_FIELD_NUMBER: _ClassVar[int]
+    MOUSE_MOVE_FIELD_NUMBER: _ClassVar[int]
+    MOUSE_MOVE_ABSOLUTE_FIELD_NUMBER: _ClassVar[int]
+    offset_us: int
+    key: Key
+    hotkey: Hotkey
+    mouse_key: MouseKey
+    mouse_move: MouseMove
+    mouse_move_absolute: MouseMoveAbsolute
+    def __init__(self, offset_us: _Optional[int] = ..., key: _Optional[_Union[Key, _Mapping]] = ..., hotkey: _Optional[_Union[Hotkey, _Mapping]] = ..., mouse_key: _Optional[_Union[MouseKey, _Mapping]] = ..., mouse_move: _Optional[_Union[MouseMove, _Mapping]] = ..., mouse_move_absolute: _Optional[_Union[MouseMoveAbsolute, _Mapping]] = ...) -> None: ...
+
+class EventBatch(_message.Message):
+    __slots__ = ("events",)
+    EVENTS_FIELD_NUMBER: _ClassVar[int]
+    events: _containers.RepeatedCompositeFieldContainer[TimedInputEvent]
+    def __init__(self, events: _Optional[_Iterable[_Union[TimedInputEvent, _Mapping]]] = ...) -> None: ...
+
+class MotionLaneSession(_message.Message):
+    __slots__ = ("port", "token")
+    PORT_FIELD_NUMBER: _ClassVar[int]
+    TOKEN_FIELD_NUMBER: _ClassVar[int]
+    port: int
+    token: bytes
+    def __init__(self, port: _Optional[int] = ..., token: _Optional[bytes] = ...) -> None: ...
+
+class TypeTextRequest(_message.Message):
+    __slots__ = ("text", "layout", "interval_ms", "rollover")
+    TEXT_FIELD_NUMBER: _ClassVar[int]
+    LAYOUT_FIELD_NUMBER: _ClassVar[int]
+    INTERVAL_MS_FIELD_NUMBER: _ClassVar[int]
+    ROLLOVER_FIELD_NUMBER: _ClassVar[int]
+    text: str
+    layout: str
+    interval_ms: int
+    rollover: bool
+    def __init__(self, text: _Optional[str] = ..., layout: _Optional[str] = ..., interval_ms: _Optional[int] = ..., rollover: bool = ...) -> None: ...
+
+class TypeTextProgress(_message.Message):
+    __slots__ = ("typed", "total", "first_unsupported")
+    TYPED_FIELD_NUMBER: _ClassVar[int]
+    TOTAL_FIELD_NUMBER: _ClassVar[int]
+    FIRST_UNSUPPORTED_FIELD_NUMBER: _ClassVar[int]
+    typed: int
+    total: int
+    first_unsupported: int
+    def __init__(self, typed: _Optional[int] = ..., total: _Optional[int] = ..., first_unsupported: _Optional[int] = ...) -> None: ...
+
 class Response(_message.Message):
     __slots__ = ("message",)
     MESSAGE_FIELD_NUMBER: _ClassVar[int]
@@ -96,3 +180,33 @@ class Config(_message.Message):
 class Empty(_message.Message):
     __slots__ = ()
     def __init__(self) -> None: ...
+
+class StatsRequest(_message.Message):
+    __slots__ = ("reset",)
+    RESET_FIELD_NUMBER: _ClassVar[int]
+    reset: bool
+    def __init__(self, reset: bool = ...) -> None: ...
+
+class LatencyHistogram(_message.Message):
+    __slots__ = ("name", "metric", "counts", "sum_us", "max_us")
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    METRIC_FIELD_NUMBER: _ClassVar[int]
+    COUNTS_FIELD_NUMBER: _ClassVar[int]
+    SUM_US_FIELD_NUMBER: _ClassVar[int]
+    MAX_US_FIELD_NUMBER: _ClassVar[int]
+    name: str
+    metric: str
+    counts: _containers.RepeatedScalarFieldContainer[int]
+    sum_us: int
+    max_us: int
+    def __init__(self, name: _Optional[str] = ..., metric: _Optional[str] = ..., counts: _Optional[_Iterable[int]] = ..., sum_us: _Optional[int] = ..., max_us: _Optional[int] = ...) -> None: ...
+
+class Stats(_message.Message):
+    __slots__ = ("bucket_bounds_us", "rpc", "hid")
+    BUCKET_BOUNDS_US_FIELD_NUMBER: _ClassVar[int]
+    RPC_FIELD_NUMBER: _ClassVar[int]
+    HID_FIELD_NUMBER: _ClassVar[int]
+    bucket_bounds_us: _containers.RepeatedScalarFieldContainer[int]
+    rpc: _containers.RepeatedCompositeFieldContainer[LatencyHistogram]
+    hid: _containers.RepeatedCompositeFieldContainer[LatencyHistogram]
+    def __init__(self, bucket_bounds_us: _Optional[_Iterable[int]] = ..., rpc: _Optional[_Iterable[_Union[LatencyHistogram, _Mapping]]] = ..., hid: _Optional[_Iterable[_Union[LatencyHistogram, _Mapping]]] = ...) -> None: ...
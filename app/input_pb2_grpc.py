@@ -55,11 +55,36 @@ class InputMethodsStub(object):
                 request_serializer=app_dot_input__pb2.MouseMove.SerializeToString,
                 response_deserializer=app_dot_input__pb2.Response.FromString,
                 _registered_method=True)
+        self.MoveMouseAbsolute = channel.unary_unary(
+                '/InputMethods/MoveMouseAbsolute',
+                request_serializer=app_dot_input__pb2.MouseMoveAbsolute.SerializeToString,
+                response_deserializer=app_dot_input__pb2.Response.FromString,
+                _registered_method=True)
         self.Ping = channel.unary_unary(
                 '/InputMethods/Ping',
                 request_serializer=app_dot_input__pb2.Empty.SerializeToString,
                 response_deserializer=app_dot_input__pb2.Response.FromString,
                 _registered_method=True)
+        self.InputStream = channel.stream_stream(
+                '/InputMethods/InputStream',
+                request_serializer=app_dot_input__pb2.InputEvent.SerializeToString,
+                response_deserializer=app_dot_input__pb2.InputAck.FromString,
+                _registered_method=True)
+        self.SendEvents = channel.unary_unary(
+                '/InputMethods/SendEvents',
+                request_serializer=app_dot_input__pb2.EventBatch.SerializeToString,
+                response_deserializer=app_dot_input__pb2.Response.FromString,
+                _registered_method=True)
+        self.OpenMotionLane = channel.unary_unary(
+                '/InputMethods/OpenMotionLane',
+                request_serializer=app_dot_input__pb2.Empty.SerializeToString,
+                response_deserializer=app_dot_input__pb2.MotionLaneSession.FromString,
+                _registered_method=True)
+        self.TypeText = channel.unary_stream(
+                '/InputMethods/TypeText',
+                request_serializer=app_dot_input__pb2.TypeTextRequest.SerializeToString,
+                response_deserializer=app_dot_input__pb2.TypeTextProgress.FromString,
+                _registered_method=True)
         self.SetConfig = channel.unary_unary(
                 '/InputMethods/SetConfig',
                 request_serializer=app_dot_input__pb2.Config.SerializeToString,
@@ -70,6 +95,11 @@ class InputMethodsStub(object):
                 request_serializer=app_dot_input__pb2.Empty.SerializeToString,
                 response_deserializer=app_dot_input__pb2.Config.FromString,
                 _registered_method=True)
+        self.GetStats = channel.unary_unary(
+                '/InputMethods/GetStats',
+                request_serializer=app_dot_input__pb2.StatsRequest.SerializeToString,
+                response_deserializer=app_dot_input__pb2.Stats.FromString,
+                _registered_method=True)
 
 
 class InputMethodsServicer(object):
@@ -100,12 +130,52 @@ class InputMethodsServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def MoveMouseAbsolute(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def Ping(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def InputStream(self, request_iterator, context):
+        """Carries every input event of a client over one long-lived stream. The
+        server periodically acknowledges the highest sequence number processed.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SendEvents(self, request, context):
+        """Replays a batch of events with their original spacing. Returns once the
+        last event has been processed. Batches may span at most 250ms.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def OpenMotionLane(self, request, context):
+        """Opens a session on the UDP motion lane, which carries mouse motion and
+        scroll as MotionDatagrams. Fails with FAILED_PRECONDITION if the lane is
+        disabled.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TypeText(self, request, context):
+        """Types text with the keystrokes of a keyboard layout, one character
+        after another, and reports progress after each one. Nothing is typed if
+        the layout has no keystroke for a character.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def SetConfig(self, request, context):
         """Configuration
         """
@@ -119,6 +189,13 @@ class InputMethodsServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetStats(self, request, context):
+        """Latency histograms of the server's calls and HID writes.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_InputMethodsServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -142,11 +219,36 @@ def add_InputMethodsServicer_to_server(servicer, server):
                     request_deserializer=app_dot_input__pb2.MouseMove.FromString,
                     response_serializer=app_dot_input__pb2.Response.SerializeToString,
             ),
+            'MoveMouseAbsolute': grpc.unary_unary_rpc_method_handler(
+                    servicer.MoveMouseAbsolute,
+                    request_deserializer=app_dot_input__pb2.MouseMoveAbsolute.FromString,
+                    response_serializer=app_dot_input__pb2.Response.SerializeToString,
+            ),
             'Ping': grpc.unary_unary_rpc_method_handler(
                     servicer.Ping,
                     request_deserializer=app_dot_input__pb2.Empty.FromString,
                     response_serializer=app_dot_input__pb2.Response.SerializeToString,
             ),
+            'InputStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.InputStream,
+                    request_deserializer=app_dot_input__pb2.InputEvent.FromString,
+                    response_serializer=app_dot_input__pb2.InputAck.SerializeToString,
+            ),
+            'SendEvents': grpc.unary_unary_rpc_method_handler(
+                    servicer.SendEvents,
+                    request_deserializer=app_dot_input__pb2.EventBatch.FromString,
+                    response_serializer=app_dot_input__pb2.Response.SerializeToString,
+            ),
+            'OpenMotionLane': grpc.unary_unary_rpc_method_handler(
+                    servicer.OpenMotionLane,
+                    request_deserializer=app_dot_input__pb2.Empty.FromString,
+                    response_serializer=app_dot_input__pb2.MotionLaneSession.SerializeToString,
+            ),
+            'TypeText': grpc.unary_stream_rpc_method_handler(
+                    servicer.TypeText,
+                    request_deserializer=app_dot_input__pb2.TypeTextRequest.FromString,
+                    response_serializer=app_dot_input__pb2.TypeTextProgress.SerializeToString,
+            ),
             'SetConfig': grpc.unary_unary_rpc_method_handler(
                     servicer.SetConfig,
                     request_deserializer=app_dot_input__pb2.Config.FromString,
@@ -157,6 +259,11 @@ def add_InputMethodsServicer_to_server(servicer, server):
                     request_deserializer=app_dot_input__pb2.Empty.FromString,
                     response_serializer=app_dot_input__pb2.Config.SerializeToString,
             ),
+            'GetStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetStats,
+                    request_deserializer=app_dot_input__pb2.StatsRequest.FromString,
+                    response_serializer=app_dot_input__pb2.Stats.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'InputMethods', rpc_method_handlers)
@@ -277,6 +384,33 @@ class InputMethods(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def MoveMouseAbsolute(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/InputMethods/MoveMouseAbsolute',
+            app_dot_input__pb2.MouseMoveAbsolute.SerializeToString,
+            app_dot_input__pb2.Response.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def Ping(request,
             target,
@@ -304,6 +438,114 @@ class InputMethods(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def InputStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/InputMethods/InputStream',
+            app_dot_input__pb2.InputEvent.SerializeToString,
+            app_dot_input__pb2.InputAck.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SendEvents(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/InputMethods/SendEvents',
+            app_dot_input__pb2.EventBatch.SerializeToString,
+            app_dot_input__pb2.Response.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def OpenMotionLane(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/InputMethods/OpenMotionLane',
+            app_dot_input__pb2.Empty.SerializeToString,
+            app_dot_input__pb2.MotionLaneSession.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def TypeText(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/InputMethods/TypeText',
+            app_dot_input__pb2.TypeTextRequest.SerializeToString,
+            app_dot_input__pb2.TypeTextProgress.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def SetConfig(request,
             target,
@@ -357,3 +599,30 @@ class InputMethods(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/InputMethods/GetStats',
+            app_dot_input__pb2.StatsRequest.SerializeToString,
+            app_dot_input__pb2.Stats.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
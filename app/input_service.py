@@ -1,15 +1,39 @@
+import asyncio
 import logging
-import multiprocessing
+import threading
 import time
 from math import floor
-from typing import BinaryIO, Iterable
+from math import isfinite
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+from typing import Sequence
+from typing import Union
 
-import execute
 from button import Button
 from button import button_to_hid
 from config_service import ConfigService
 from hid import keycodes
 from hid.keycodes import modifier_keycodes
+from hid.reports import KEYBOARD_REPORT_RELEASED
+from hid.reports import MOUSE_REPORT_REL8
+from hid.reports import TABLET_REPORT
+from hid.reports import MouseReportFormat
+from hid.reports import ReportHex
+from hid.reports import mouse_report_format
+from hid.reports import pack_consumer_report
+from hid.reports import pack_keyboard_report
+from hid_handles import HidHandleRegistry
+from hid_writer import AsyncHidWriter
+from hid_writer import AsyncHidWriterPool
+from hid_writer import HidWriter
+from hid_writer import HidWriterPool
+from hid_writer import LateReportPolicy
+from hid_writer import OverflowPolicy
+from hotkey_parser import CompiledHotkey
+from hotkey_parser import CompiledStep
+from hotkey_parser import HotkeyTimeline
+from hotkey_parser import KeyEndpoint
 from key import ButtonActionType
 from key import HotkeyOptions
 from key import Key
@@ -18,40 +42,66 @@ from key import KeyOptions
 from key_utils import is_media_key
 from key_utils import is_modifier_key
 from key_utils import key_to_keycode
+from pointer_acceleration import PointerAcceleration
+from scheduler import AsyncLane
+from scheduler import Lane
+from scheduler import Scheduler
 
-_hid_lock = multiprocessing.Lock()
+_hid_handles = HidHandleRegistry(logging.getLogger(__name__))
+_hid_writers: Union[HidWriterPool, AsyncHidWriterPool] = HidWriterPool(
+    _hid_handles, logging.getLogger(__name__)
+)
 
-def _write_to_hid_handle(hid_handle: BinaryIO, buffer: Iterable[int]):
-    try:
-        hid_handle.write(bytearray(buffer))
-    except BlockingIOError:
-        logging.error('Failed to write to HID interface. Is USB cable connected?')
+# How long a MOVE mouse button action holds the button down.
+MOUSE_PRESS_DURATION_S = 0.15
 
 
-def _write_to_hid(hid_path: str, buffer: Iterable[int]):
-    if logging.getLogger().getEffectiveLevel() == logging.DEBUG:
-        logging.debug(
-            'writing to HID interface %s: %s',
-            hid_path,
-            ' '.join([f'{x:#04x}' for x in buffer]),
-        )
+def _write_to_hid(hid_path: str, report: bytes, **writer_options):
+    logging.debug('writing to HID interface %s: %s', hid_path, ReportHex(report))
+
+    # The report is written by the endpoint's writer thread; write errors are
+    # logged there.
+    _hid_writers.writer(hid_path, **writer_options).submit(report)
+
+
+def use_async_hid_writers(loop: asyncio.AbstractEventLoop) -> AsyncHidWriterPool:
+    """Writes HID reports from `loop` instead of per-endpoint threads.
+
+    Must be called before the first report is sent.
+    """
+    global _hid_writers
+    _hid_writers = AsyncHidWriterPool(_hid_handles, logging.getLogger(__name__), loop)
+    return _hid_writers
+
+
+def hid_write_stats():
+    return _hid_handles.stats()
+
+
+def hid_queue_stats():
+    return _hid_writers.stats()
+
+
+def hid_latency(reset: bool = False):
+    return _hid_writers.latency(reset)
 
-    try:
-        with _hid_lock:
-            with open(hid_path, 'ab+') as hid_handle:
-                hid_handle.write(bytearray(buffer))
-    except BlockingIOError:
-        logging.error(
-            'Failed to write to HID interface: %s. Is USB cable connected?', hid_path
-        )
+
+def flush_hid_writes(timeout: Optional[float] = None) -> bool:
+    """Waits until every queued HID report has been written."""
+    return _hid_writers.flush(timeout)
 
 
 def release_all_keys(keyboard_path: str):
-    _write_to_hid(keyboard_path, [0] * 8)
+    _write_to_hid(keyboard_path, KEYBOARD_REPORT_RELEASED)
 
 
 class HidKeyboardService:
-    """Service for sending input events to the target machine over USB HID."""
+    """Service for sending input events to the target machine over USB HID.
+
+    Key state updates and the report they produce happen under one lock, so
+    concurrent callers cannot lose each other's keys or queue reports out of
+    order.
+    """
 
     keyboard_path: str
     media_path: str
@@ -61,10 +111,13 @@ class HidKeyboardService:
     _modifiers_byte: int
 
     def _send_key_hid_state(self):
-        _write_to_hid(self.keyboard_path, (self._modifiers_byte, 0, *self._pressed_keys))
+        _write_to_hid(
+            self.keyboard_path,
+            pack_keyboard_report(self._modifiers_byte, self._pressed_keys),
+        )
 
     def _send_media_hid_state(self, media_key: int):
-        _write_to_hid(self.media_path, (media_key, 0))
+        _write_to_hid(self.media_path, pack_consumer_report(media_key))
 
     def __init__(self, keyboard_path: str, media_path: str, logger: logging.Logger):
         self.keyboard_path = keyboard_path
@@ -72,6 +125,7 @@ class HidKeyboardService:
         self._logger = logger
         self._pressed_keys = (0, 0, 0, 0, 0, 0)
         self._modifiers_byte = 0
+        self._state_lock = threading.Lock()
         self._active_modifiers = {
             keycodes.MODIFIER_LEFT_CTRL: False,
             keycodes.MODIFIER_LEFT_SHIFT: False,
@@ -124,58 +178,57 @@ class HidKeyboardService:
         return keyCode in self._pressed_keys[2:]
 
     def send_key_state(self, keyCode: int, action: KeyActionType):
-        self._set_key_state(keyCode, action == KeyActionType.DOWN)
-        self._send_key_hid_state()
-
-    def send_key_press(self, keyCode: int, interval: int = 30):
-        self.send_key_state(keyCode, KeyActionType.DOWN)
-        time.sleep(interval / 1000)
-        self.send_key_state(keyCode, KeyActionType.UP)
+        with self._state_lock:
+            self._set_key_state(keyCode, action == KeyActionType.DOWN)
+            self._send_key_hid_state()
 
     def send_media_key_state(self, keyCode: int, action: KeyActionType):
         self._send_media_hid_state(keyCode if action == KeyActionType.DOWN else 0)
 
-    def send_media_key_press(self, keyCode: int, interval: int = 30):
-        self._send_media_hid_state(keyCode)
-        time.sleep(interval / 1000)
-        self._send_media_hid_state(0)
-
     def send_modifier_state(self, modifier: int, action: KeyActionType):
         if not self.is_modifier(modifier):
             raise ValueError(f'Key {modifier} is not a modifier key')
 
-        self._set_modifier_state(modifier, action == KeyActionType.DOWN)
-
-        self._send_key_hid_state()
-
-    def send_modifier_press(self, modifier: int, interval: int = 30):
-        if not self.is_modifier(modifier):
-            raise ValueError(f'Key {modifier} is not a modifier key')
+        with self._state_lock:
+            self._set_modifier_state(modifier, action == KeyActionType.DOWN)
+            self._send_key_hid_state()
+
+    def is_released(self) -> bool:
+        """Whether no key or modifier is held."""
+        with self._state_lock:
+            return not self._modifiers_byte and not any(self._pressed_keys)
+
+    def send_report(self, endpoint: KeyEndpoint, report: bytes):
+        """Writes a report built elsewhere, e.g. by `compile_timeline`.
+
+        Keyboard reports replace the held keys and modifiers with theirs, so
+        key events sent by anything but the action that owns these reports
+        would be undone. `InputService` only calls this from actions on the
+        keyboard lane, which nothing else writes to in the meantime.
+        """
+        if endpoint == KeyEndpoint.MEDIA:
+            _write_to_hid(self.media_path, report)
+            return
 
-        self.send_modifier_state(modifier, KeyActionType.DOWN)
-        time.sleep(interval / 1000)
-        self.send_modifier_state(modifier, KeyActionType.UP)
+        with self._state_lock:
+            self._modifiers_byte = report[0]
+            self._pressed_keys = tuple(report[2:])
+            for modifier in self._active_modifiers:
+                self._active_modifiers[modifier] = bool(report[0] & modifier)
+            _write_to_hid(self.keyboard_path, report)
 
     def unpress_all_keys(self):
-        self._pressed_keys = (0, 0, 0, 0, 0, 0, 0, 0)
+        with self._state_lock:
+            self._pressed_keys = (0, 0, 0, 0, 0, 0)
 
-        for modifier in self._active_modifiers:
-            self._active_modifiers[modifier] = False
+            for modifier in self._active_modifiers:
+                self._active_modifiers[modifier] = False
 
-        self._recalculate_modifiers_byte()
-        self._send_key_hid_state()
+            self._recalculate_modifiers_byte()
+            self._send_key_hid_state()
         self._send_media_hid_state(0)
 
 
-def _send_mouse_event(mouse_path: str, buffer: Iterable[int]):
-    try:
-        _write_to_hid(mouse_path, buffer)
-    except (BrokenPipeError, ValueError) as e:
-        logging.info(f'Failed to write mouse report {[f"{x:#04x}" for x in buffer]}')
-        
-        raise RuntimeError(f'Failed to write mouse report {[f"{x:#04x}" for x in buffer]}') from e
-
-
 def send_mouse_event(
     mouse_path: str,
     buttons: int,
@@ -183,7 +236,8 @@ def send_mouse_event(
     relative_y: float,
     vertical_wheel_delta: int,
     horizontal_wheel_delta: int,
-    speed: float
+    speed: float,
+    report_format: MouseReportFormat = MOUSE_REPORT_REL8,
 ) -> None:
     """Send a mouse event to the target machine over USB HID.
 
@@ -195,27 +249,32 @@ def send_mouse_event(
         horizontal scroll wheel.
     :param horizontal_wheel_delta:
     :param speed: A multiplier for the mouse's speed.
+    :param report_format: Layout of the gadget's mouse report.
     :return: None
     """
     # pylint: disable=invalid-name
     x, y = floor(relative_x * speed * 5), floor(relative_y * speed * 5)
 
-    buf = [0] * 5
-    buf[0] = buttons  # Byte 0 = Button 1 pressed
-    buf[1] = x & 0xFF
-    buf[2] = y & 0xFF
-    buf[3] = _translate_vertical_wheel_delta(vertical_wheel_delta) & 0xFF
-    buf[4] = horizontal_wheel_delta & 0xFF
+    buf = report_format.pack(
+        buttons,  # Byte 0 = Button 1 pressed
+        report_format.clamp(x),
+        report_format.clamp(y),
+        _clamp_wheel(_translate_vertical_wheel_delta(vertical_wheel_delta)),
+        _clamp_wheel(horizontal_wheel_delta),
+    )
 
     # logging.info(f'Sending packet to mouse: {[f" {x:#04x}" for x in buf]}')
 
-    execute.with_timeout_t(
-        _write_to_hid,
-        args=(mouse_path, buf),
-        timeout_in_seconds=0.005,
+    _write_to_hid(
+        mouse_path, buf, policy=OverflowPolicy.MERGE, merge=report_format.merge
     )
 
 
+def _clamp_wheel(delta: int) -> int:
+    # Both wheels are int8 in every mouse report profile.
+    return max(-127, min(127, delta))
+
+
 def _translate_vertical_wheel_delta(vertical_wheel_delta: int) -> int:
     # a negative wheel delta number indicates upward scrolling but in HID, negative means
     # downward scrolling.
@@ -226,18 +285,60 @@ class HidMouseService:
     """Service for sending input events to the target machine over USB HID.
 
     Keeps track of the state of the buttons and sends the appropriate events.
+
+    Relative motion is accumulated rather than written per event: while a motion
+    report is waiting for the endpoint, new deltas are folded into it, and
+    anything beyond the axis range of one report carries over into the next.
+    Fractions of a count are kept as well, so slow drags made of many small
+    deltas still move the cursor.
+
+    Movements are scaled by `cursor_speed` and by a gain that grows with the
+    pointer velocity according to `cursor_acceleration`.
+
+    Absolute positions go to the separate tablet endpoint at `tablet_path`.
+    Only the latest position matters there, so a position that is still
+    pending when a newer one arrives is simply replaced.
     """
 
     mouse_path: str
+    tablet_path: str
     _logger: logging.Logger
     _button_state: int
     _config_service: ConfigService
+    _pending_x: float
+    _pending_y: float
+    _pending_wheel: int
+    _pending_hwheel: int
+    _motion_queued: bool
+    _coalesced_events: int
+    _writer: Optional[Union[HidWriter, AsyncHidWriter]]
+    _report_format: MouseReportFormat
+    _pending_position: Optional[tuple[int, int]]
+    _acceleration: PointerAcceleration
 
-    def __init__(self, config_service: ConfigService, mouse_path: str, logger: logging.Logger):
+    def __init__(
+        self,
+        config_service: ConfigService,
+        mouse_path: str,
+        logger: logging.Logger,
+        tablet_path: str = '/dev/null',
+    ):
         self.mouse_path = mouse_path
+        self.tablet_path = tablet_path
         self._logger = logger
         self._button_state = 0
         self._config_service = config_service
+        self._motion_lock = threading.Lock()
+        self._pending_x = 0.0
+        self._pending_y = 0.0
+        self._pending_wheel = 0
+        self._pending_hwheel = 0
+        self._motion_queued = False
+        self._coalesced_events = 0
+        self._writer = None
+        self._report_format = mouse_report_format(config_service.mouse_report_profile)
+        self._pending_position = None
+        self._acceleration = PointerAcceleration(config_service.cursor_acceleration)
     
     @property
     def acceleration(self):
@@ -246,17 +347,43 @@ class HidMouseService:
     @property
     def speed(self):
         return self._config_service.cursor_speed
-    
+
+    @property
+    def coalesced_events(self) -> int:
+        """Number of movements merged into an already pending motion report."""
+        return self._coalesced_events
+
+    def _mouse_writer(self) -> Union[HidWriter, AsyncHidWriter]:
+        writer = self._writer
+        if writer is None or writer.hid_path != self.mouse_path:
+            config = self._config_service
+            writer = _hid_writers.writer(
+                self.mouse_path,
+                policy=OverflowPolicy.MERGE,
+                merge=self._report_format.merge,
+                deadline_ms=config.hid_write_deadline_ms,
+                # Relative motion is taken out of the accumulator when the
+                # report is built, so 'drop' loses it for good; unlike the
+                # tablet, the default is to write it late.
+                late_policy=LateReportPolicy[config.mouse_late_report_policy.upper()],
+            )
+            self._writer = writer
+        return writer
+
+    def _tablet_writer(self) -> Union[HidWriter, AsyncHidWriter]:
+        return _hid_writers.writer(
+            self.tablet_path,
+            deadline_ms=self._config_service.hid_write_deadline_ms,
+            late_policy=LateReportPolicy.DROP,
+        )
+
     def _write_to_hid(self):
-        # Send event with current button state but no movement/scroll
-        send_mouse_event(
-            self.mouse_path,
-            self._button_state,  # Current button state
-            0.0,  # No X movement
-            0.0,  # No Y movement
-            0,  # No vertical scroll
-            0,  # No horizontal scroll
-            self.speed
+        # Send event with current button state but no movement/scroll. Unlike
+        # motion, a button change is never made obsolete by a later report, so
+        # it is written however late it is.
+        self._mouse_writer().submit(
+            self._report_format.pack(self._button_state, 0, 0),
+            late_policy=LateReportPolicy.WRITE,
         )
 
     def send_button_state(self, button: Button, action: ButtonActionType):
@@ -267,28 +394,125 @@ class HidMouseService:
             self._button_state |= button_mask
         elif action == ButtonActionType.UP:
             self._button_state &= ~button_mask
-        elif action == ButtonActionType.MOVE:
-            self.send_button_press(button)
 
         self._write_to_hid()
 
-    def send_button_press(self, button: Button):
-        """Send a mouse button press event."""
-        self.send_button_state(button, ButtonActionType.DOWN)
-        time.sleep(0.15)
-        self.send_button_state(button, ButtonActionType.UP)
-
-    def send_movement(self, delta_x: float, delta_y: float):
-        """Send a mouse movement event."""
-        send_mouse_event(
-            self.mouse_path,
-            self._button_state,  # Keep current button state
-            delta_x,
-            delta_y,
-            0,  # No vertical scroll
-            0,  # No horizontal scroll
-            self.speed
-        )
+    def _take_motion_report(self) -> Optional[bytes]:
+        # Called by the mouse writer thread each time the pending motion report
+        # reaches the front of the queue.
+        report_format = self._report_format
+        with self._motion_lock:
+            try:
+                # int() truncates towards zero, so the fraction left behind
+                # never biases motion in either direction.
+                x = report_format.clamp(int(self._pending_x))
+                y = report_format.clamp(int(self._pending_y))
+                wheel = _clamp_wheel(self._pending_wheel)
+                hwheel = _clamp_wheel(self._pending_hwheel)
+            except Exception:
+                # The writer drops a builder that raises. Start over, or no
+                # later movement would ever queue a new one.
+                self._pending_x = self._pending_y = 0.0
+                self._pending_wheel = self._pending_hwheel = 0
+                self._motion_queued = False
+                raise
+            if not (x or y or wheel or hwheel):
+                # At most a fraction of a count is left; it stays pending and
+                # is carried into the next movement.
+                self._motion_queued = False
+                return None
+
+            self._pending_x -= x
+            self._pending_y -= y
+            self._pending_wheel -= wheel
+            self._pending_hwheel -= hwheel
+
+        return report_format.pack(self._button_state, x, y, wheel, hwheel)
+
+    def send_movement(
+        self, delta_x: float, delta_y: float, timestamp_ns: Optional[int] = None
+    ):
+        """Send a mouse movement event.
+
+        Args:
+            delta_x: Horizontal movement.
+            delta_y: Vertical movement.
+            timestamp_ns: `time.monotonic_ns()` at which the movement happened,
+                used to measure pointer velocity. Defaults to now.
+
+        NaN and infinite deltas are ignored.
+        """
+        if not (delta_x or delta_y):
+            return
+        if not (isfinite(delta_x) and isfinite(delta_y)):
+            self._logger.warning('Ignoring non-finite mouse movement')
+            return
+
+        speed = self.speed * 5
+        acceleration = self._acceleration
+        with self._motion_lock:
+            # Only rebuilds the gain table after SetConfig changed the value.
+            acceleration.configure(self.acceleration)
+            gain = acceleration.gain(delta_x, delta_y, timestamp_ns)
+            x, y = delta_x * speed * gain, delta_y * speed * gain
+            if not (x or y):
+                return
+
+            self._pending_x += x
+            self._pending_y += y
+            if self._motion_queued:
+                self._coalesced_events += 1
+                return
+            self._motion_queued = True
+
+        self._mouse_writer().submit_deferred(self._take_motion_report)
+
+    def send_scroll(self, vertical: int, horizontal: int):
+        """Scrolls the wheels, folded into the pending motion report.
+
+        Args:
+            vertical: Wheel detents; negative values scroll up.
+            horizontal: Pan detents; negative values pan left.
+        """
+        if not (vertical or horizontal):
+            return
+
+        with self._motion_lock:
+            self._pending_wheel += _translate_vertical_wheel_delta(vertical)
+            self._pending_hwheel += horizontal
+            if self._motion_queued:
+                self._coalesced_events += 1
+                return
+            self._motion_queued = True
+
+        self._mouse_writer().submit_deferred(self._take_motion_report)
+
+    def _take_position_report(self) -> Optional[bytes]:
+        with self._motion_lock:
+            position, self._pending_position = self._pending_position, None
+        if position is None:
+            return None
+
+        # Buttons are only ever reported on the relative mouse; pressing them
+        # here as well would leave them held on one of the two devices.
+        return TABLET_REPORT.pack(0, *position)
+
+    def send_absolute(self, x: float, y: float):
+        """Moves the cursor to a normalized position on the target screen.
+
+        Args:
+            x: Horizontal position, from 0 (left edge) to 1 (right edge).
+            y: Vertical position, from 0 (top edge) to 1 (bottom edge).
+        """
+        position = (TABLET_REPORT.scale(x), TABLET_REPORT.scale(y))
+        with self._motion_lock:
+            pending = self._pending_position is not None
+            self._pending_position = position
+            if pending:
+                self._coalesced_events += 1
+                return
+
+        self._tablet_writer().submit_deferred(self._take_position_report)
 
     def release_all_buttons(self):
         """Release all mouse buttons."""
@@ -310,39 +534,21 @@ class InputService:
         mouse_service: HidMouseService,
         config_service: ConfigService,
         logger: logging.Logger,
+        scheduler: Optional[Scheduler] = None,
     ):
         self._kb_service = hid_service
         self._mouse_service = mouse_service
         self._config_service = config_service
         self._logger = logger
+        self._scheduler = scheduler or Scheduler(logger)
+        self._keyboard_lane = Lane('keyboard', self._scheduler, logger)
+        self._mouse_lane = Lane('mouse', self._scheduler, logger)
+        self._async_keyboard_lane = AsyncLane('keyboard')
+        self._async_mouse_lane = AsyncLane('mouse')
 
         self._kb_service.unpress_all_keys()
 
-    def _press_key(self, key_code: int, action_type: KeyActionType, _: KeyOptions):
-        if action_type == KeyActionType.PRESS:
-            self._kb_service.send_key_press(
-                key_code, self._config_service.key_press_interval
-            )
-        else:
-            self._kb_service.send_key_state(key_code, action_type)
-
-    def _press_modifier(self, key_code: int, action_type: KeyActionType):
-        if action_type == KeyActionType.PRESS:
-            self._kb_service.send_modifier_press(
-                key_code, self._config_service.key_press_interval
-            )
-        else:
-            self._kb_service.send_modifier_state(key_code, action_type)
-
-    def _press_media_key(self, key_code: int, action_type: KeyActionType):
-        if action_type == KeyActionType.PRESS:
-            self._kb_service.send_media_key_press(
-                key_code, self._config_service.key_press_interval
-            )
-        else:
-            self._kb_service.send_media_key_state(key_code, action_type)
-
-    def press_key(self, key: Key, action_type: KeyActionType, options: KeyOptions):
+    def _apply_key(self, key: Key, action_type: KeyActionType, options: KeyOptions):
         key_code = key_to_keycode(key)
         self._logger.info(
             f'Pressing {action_type.name} {key.name}({key_code}) {options}'
@@ -350,54 +556,200 @@ class InputService:
         if is_modifier_key(key):
             self._kb_service.send_modifier_state(key_code, action_type)
         elif is_media_key(key):
-            self._press_media_key(key_code, action_type)
+            self._kb_service.send_media_key_state(key_code, action_type)
         else:
-            self._press_key(key_code, action_type, options)
+            self._kb_service.send_key_state(key_code, action_type)
+
+    def press_key(self, key: Key, action_type: KeyActionType, options: KeyOptions):
+        """Sends the key event; a PRESS returns once the key is down."""
+        self._keyboard_lane.submit(self._key_steps(key, action_type, options))
 
     def move_mouse(self, delta_x: float, delta_y: float):
         self._logger.debug(f'Moving mouse by {delta_x}, {delta_y}')
         self._mouse_service.send_movement(delta_x, delta_y)
 
-    def press_mouse_key(self, button: Button, action_type: ButtonActionType):
+    def move_mouse_absolute(self, x: float, y: float):
+        self._logger.debug(f'Moving mouse to {x}, {y}')
+        self._mouse_service.send_absolute(x, y)
+
+    def _apply_mouse_key(self, button: Button, action_type: ButtonActionType):
         self._logger.debug(f'Pressing mouse {action_type.name} {button.name}')
         self._mouse_service.send_button_state(button, action_type)
 
-    def press_hotkey(
-        self, hotkey_steps, action_type: KeyActionType, options: HotkeyOptions
+    def press_mouse_key(self, button: Button, action_type: ButtonActionType):
+        """Sends the button event; a MOVE returns once the button is down."""
+        self._mouse_lane.submit(self._mouse_key_steps(button, action_type))
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Waits for pending releases and hotkey steps to be sent.
+
+        Returns:
+            False if `timeout` expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for lane in (self._keyboard_lane, self._mouse_lane):
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            if not lane.wait_idle(remaining):
+                return False
+        return True
+
+    # Actions that wait between reports are generators that send the reports
+    # and yield the delay in seconds before the next one. The blocking methods
+    # run them on a `Lane`, which waits on the scheduler thread so the calling
+    # thread returns after the first report; the *_async methods are for
+    # asyncio callers and run them on an `AsyncLane`, which waits on the event
+    # loop and keeps the same one-action-at-a-time order.
+
+    def _key_steps(
+        self, key: Key, action_type: KeyActionType, options: KeyOptions
+    ) -> Iterator[float]:
+        if action_type != KeyActionType.PRESS or is_modifier_key(key):
+            self._apply_key(key, action_type, options)
+            return
+
+        self._apply_key(key, KeyActionType.DOWN, options)
+        yield self._config_service.key_press_interval / 1000
+        self._apply_key(key, KeyActionType.UP, options)
+
+    async def press_key_async(
+        self, key: Key, action_type: KeyActionType, options: KeyOptions
     ):
-        self._logger.info(
-            f'Processing hotkey with {len(hotkey_steps)} steps, action: {action_type.name}'
-        )
+        await self._async_keyboard_lane.run(self._key_steps(key, action_type, options))
 
-        if action_type == KeyActionType.UP:
+    def _mouse_key_steps(
+        self, button: Button, action_type: ButtonActionType
+    ) -> Iterator[float]:
+        if action_type != ButtonActionType.MOVE:
+            self._apply_mouse_key(button, action_type)
             return
 
-        # Default speed if not specified
-        default_speed = (
-            options.speed
-            if options and options.speed is not None
-            else self._config_service.key_press_interval
+        self._apply_mouse_key(button, ButtonActionType.DOWN)
+        yield MOUSE_PRESS_DURATION_S
+        self._apply_mouse_key(button, ButtonActionType.UP)
+
+    async def press_mouse_key_async(self, button: Button, action_type: ButtonActionType):
+        await self._async_mouse_lane.run(self._mouse_key_steps(button, action_type))
+
+    def _apply_hotkey_step(self, step: CompiledStep):
+        self._logger.info(
+            'Pressing %s %s(%d)', step.action_type.name, step.key_name, step.key_code
+        )
+        if step.endpoint == KeyEndpoint.MODIFIER:
+            self._kb_service.send_modifier_state(step.key_code, step.action_type)
+        elif step.endpoint == KeyEndpoint.MEDIA:
+            self._kb_service.send_media_key_state(step.key_code, step.action_type)
+        else:
+            self._kb_service.send_key_state(step.key_code, step.action_type)
+
+    def _timeline_steps(self, timeline: HotkeyTimeline) -> Iterator[float]:
+        previous_ns = 0
+        for offset_ns, endpoint, report in timeline:
+            if offset_ns > previous_ns:
+                yield (offset_ns - previous_ns) / 1e9
+                previous_ns = offset_ns
+            self._kb_service.send_report(endpoint, report)
+
+    def _hotkey_steps(
+        self, hotkey: CompiledHotkey, action_type: KeyActionType
+    ) -> Iterator[float]:
+        self._logger.info(
+            'Processing hotkey with %d steps, action: %s',
+            len(hotkey.steps),
+            action_type.name,
         )
 
-        # Process each step in the sequence
-        for step in hotkey_steps:
-            key_code = step.key_code
-            step_action = step.action_type
+        if action_type == KeyActionType.UP:
+            return
 
-            if step.wait:
-                time.sleep(step.wait / 1000)
+        if self._kb_service.is_released():
+            yield from self._timeline_steps(hotkey.timeline)
+            return
 
-            key = Key(key_code)
+        # The timeline assumes nothing is held; fold the steps into the keys
+        # that are.
+        for step in hotkey.steps:
+            if step.delay_ns:
+                yield step.delay_ns / 1e9
+            self._apply_hotkey_step(step)
 
-            # Use step-specific speed or default
-            speed = step.speed if step.speed is not None else default_speed
+    def press_hotkey(
+        self,
+        hotkey: CompiledHotkey,
+        action_type: KeyActionType,
+        options: Optional[HotkeyOptions],
+    ):
+        """Sends the hotkey; returns once its first report was sent.
 
-            key_options = KeyOptions(
-                no_repeat=True,
-                disable_unwanted_modifiers=options.disable_unwanted_modifiers if options else False
-            )
+        Args:
+            hotkey: From `hotkey_parser.compile_hotkey`.
+            action_type: UP sends nothing.
+            options: Unused; a compiled hotkey holds nothing but DOWN and UP
+                steps, which is all these options could affect.
+        """
+        self._keyboard_lane.submit(self._hotkey_steps(hotkey, action_type))
 
-            self.press_key(key, step_action, key_options)
+    async def press_hotkey_async(
+        self,
+        hotkey: CompiledHotkey,
+        action_type: KeyActionType,
+        options: Optional[HotkeyOptions],
+    ):
+        await self._async_keyboard_lane.run(self._hotkey_steps(hotkey, action_type))
 
-            if step_action == KeyActionType.PRESS:
-                time.sleep(speed / 1000)
+    def _text_steps(
+        self,
+        script: Sequence[tuple[bytes, int]],
+        interval_s: float,
+        progress: Callable[[int, bool], bool],
+    ) -> Iterator[float]:
+        typed = 0
+        try:
+            for report, typed_after in script:
+                self._kb_service.send_report(KeyEndpoint.KEYBOARD, report)
+                if typed_after != typed:
+                    typed = typed_after
+                    if not progress(typed, False):
+                        self._kb_service.send_report(
+                            KeyEndpoint.KEYBOARD, KEYBOARD_REPORT_RELEASED
+                        )
+                        return
+                yield interval_s
+        except GeneratorExit:
+            # Closed between two reports, e.g. because the caller was
+            # cancelled; the last report may still be holding keys.
+            self._kb_service.send_report(KeyEndpoint.KEYBOARD, KEYBOARD_REPORT_RELEASED)
+            raise
+        finally:
+            progress(typed, True)
+
+    def type_text(
+        self,
+        script: Sequence[tuple[bytes, int]],
+        interval_s: float,
+        progress: Callable[[int, bool], bool],
+    ):
+        """Types text; returns once the first report was sent.
+
+        The reports replace the keys held before them, and the keyboard is
+        released once the text is typed.
+
+        Args:
+            script: (report, characters typed) tuples from
+                `text_to_hid.encode_typing`.
+            interval_s: Time between two reports.
+            progress: Called with the number of characters typed and False
+                whenever it grew, and once more with True when typing stopped.
+                Typing stops early, with the keys released, if it returns
+                False.
+        """
+        self._keyboard_lane.submit(self._text_steps(script, interval_s, progress))
+
+    async def type_text_async(
+        self,
+        script: Sequence[tuple[bytes, int]],
+        interval_s: float,
+        progress: Callable[[int, bool], bool],
+    ):
+        await self._async_keyboard_lane.run(
+            self._text_steps(script, interval_s, progress)
+        )
@@ -1,16 +1,50 @@
+import asyncio
 import logging
+import os
+import struct
+import tempfile
+import time
 import unittest
 from typing import cast
 from typing import Any
 
+import input_service
 from button import Button
+from hid import keycodes
+from hotkey_parser import compile_hotkey
+from input_service import HidKeyboardService
 from input_service import HidMouseService
+from input_service import InputService
 from key import ButtonActionType
+from key import Key
+from key import KeyActionType
+from text_to_hid import encode_typing
 
 
 class Config:
     cursor_speed = 1.0
+    cursor_acceleration = 1.0
     key_press_interval = 0
+    hid_write_deadline_ms = 20
+    mouse_late_report_policy = 'write'
+    mouse_report_profile = 'rel8'
+
+
+class Rel16Config(Config):
+    mouse_report_profile = 'rel16'
+
+
+class SlowHostConfig(Config):
+    hid_write_deadline_ms = 1000
+
+
+class LongPressConfig(Config):
+    key_press_interval = 200
+
+
+class DropLateConfig(Config):
+    hid_write_deadline_ms = 1
+    mouse_late_report_policy = 'drop'
 
 
 class Backend:
@@ -41,5 +75,304 @@ class HidMouseServiceTest(unittest.TestCase):
         )
 
 
+class HidMouseServiceMotionTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.mouse_path = os.path.join(tmp.name, 'hidg1')
+        self.service = HidMouseService(
+            cast(Any, Config()), self.mouse_path, logging.getLogger(__name__)
+        )
+
+    def _reports(self):
+        input_service.flush_hid_writes()
+        with open(self.mouse_path, 'rb') as f:
+            data = f.read()
+        return list(struct.iter_unpack('<Bbbbb', data))
+
+    def test_large_delta_carries_into_following_reports(self):
+        self.service.send_movement(60, -60)
+
+        self.assertEqual(
+            self._reports(),
+            [
+                (0, 127, -127, 0, 0),
+                (0, 127, -127, 0, 0),
+                (0, 46, -46, 0, 0),
+            ],
+        )
+
+    def test_fractional_deltas_accumulate_instead_of_being_floored(self):
+        for _ in range(10):
+            self.service.send_movement(0.1, -0.1)
+
+        reports = self._reports()
+        self.assertEqual(sum(r[1] for r in reports), 5)
+        self.assertEqual(sum(r[2] for r in reports), -5)
+
+    def test_non_finite_delta_is_ignored(self):
+        self.service.send_movement(float('nan'), 1)
+        self.service.send_movement(float('inf'), 0)
+        self.service.send_movement(2, 1)
+
+        self.assertEqual(self._reports(), [(0, 10, 5, 0, 0)])
+
+    def test_motion_recovers_after_a_failed_report(self):
+        # Finite, but overflows to infinity once scaled by the cursor speed.
+        self.service.send_movement(1e308, 0)
+        input_service.flush_hid_writes()
+        self.service.send_movement(2, 1)
+
+        self.assertEqual(self._reports(), [(0, 10, 5, 0, 0)])
+
+    def test_scroll_is_sent_with_hid_wheel_direction(self):
+        self.service.send_scroll(-2, 1)
+
+        self.assertEqual(self._reports(), [(0, 0, 0, 2, 1)])
+
+    def test_movements_are_coalesced_while_endpoint_is_busy(self):
+        endpoint_lock = input_service._hid_handles._endpoint(self.mouse_path).lock
+        writer = self.service._mouse_writer()
+
+        with endpoint_lock:
+            self.service.send_button_state(Button.LEFT, ButtonActionType.DOWN)
+            while writer.stats().depth:
+                time.sleep(0.001)
+            for _ in range(3):
+                self.service.send_movement(2, 1)
+
+        self.assertEqual(
+            self._reports(),
+            [
+                (1, 0, 0, 0, 0),
+                (1, 30, 15, 0, 0),
+            ],
+        )
+        self.assertEqual(self.service.coalesced_events, 2)
+
+    def test_late_button_release_is_written_under_drop_policy(self):
+        service = HidMouseService(
+            cast(Any, DropLateConfig()), self.mouse_path, logging.getLogger(__name__)
+        )
+        endpoint_lock = input_service._hid_handles._endpoint(self.mouse_path).lock
+
+        with endpoint_lock:
+            service.send_button_state(Button.LEFT, ButtonActionType.DOWN)
+            service.send_button_state(Button.LEFT, ButtonActionType.UP)
+            time.sleep(0.01)
+
+        self.assertEqual(
+            self._reports(),
+            [
+                (1, 0, 0, 0, 0),
+                (0, 0, 0, 0, 0),
+            ],
+        )
+
+    def test_rel16_profile_sends_large_delta_in_one_report(self):
+        service = HidMouseService(
+            cast(Any, Rel16Config()), self.mouse_path, logging.getLogger(__name__)
+        )
+
+        service.send_movement(60, -60)
+        input_service.flush_hid_writes()
+
+        with open(self.mouse_path, 'rb') as f:
+            self.assertEqual(list(struct.iter_unpack('<Bhhbb', f.read())), [
+                (0, 300, -300, 0, 0),
+            ])
+
+
+    def test_absolute_positions_keep_only_the_latest_pending_one(self):
+        tablet_path = os.path.join(os.path.dirname(self.mouse_path), 'hidg3')
+        service = HidMouseService(
+            cast(Any, SlowHostConfig()),
+            self.mouse_path,
+            logging.getLogger(__name__),
+            tablet_path=tablet_path,
+        )
+        endpoint_lock = input_service._hid_handles._endpoint(tablet_path).lock
+
+        with endpoint_lock:
+            service.send_absolute(0, 1)
+            while service._pending_position is not None:
+                time.sleep(0.001)
+            service.send_absolute(0.25, 0.5)
+            service.send_absolute(2, -1)
+        input_service.flush_hid_writes()
+
+        with open(tablet_path, 'rb') as f:
+            self.assertEqual(list(struct.iter_unpack('<BHH', f.read())), [
+                (0, 0, 32767),
+                (0, 32767, 0),
+            ])
+        self.assertEqual(service.coalesced_events, 1)
+
+
+class HidKeyboardServiceTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.keyboard_path = os.path.join(tmp.name, 'hidg0')
+        self.media_path = os.path.join(tmp.name, 'hidg2')
+        self.service = HidKeyboardService(
+            self.keyboard_path, self.media_path, logging.getLogger(__name__)
+        )
+
+    def _read(self, path):
+        input_service.flush_hid_writes()
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_keyboard_reports_are_eight_bytes(self):
+        self.service.send_modifier_state(
+            keycodes.MODIFIER_LEFT_SHIFT, KeyActionType.DOWN
+        )
+        self.service.send_key_state(0x04, KeyActionType.DOWN)
+        self.service.unpress_all_keys()
+
+        self.assertEqual(
+            list(struct.iter_unpack('<BB6B', self._read(self.keyboard_path))),
+            [
+                (keycodes.MODIFIER_LEFT_SHIFT, 0, 0, 0, 0, 0, 0, 0),
+                (keycodes.MODIFIER_LEFT_SHIFT, 0, 0x04, 0, 0, 0, 0, 0),
+                (0, 0, 0, 0, 0, 0, 0, 0),
+            ],
+        )
+
+    def test_consumer_usage_is_little_endian(self):
+        self.service.send_media_key_state(0x0224, KeyActionType.DOWN)
+        self.service.send_media_key_state(0x0224, KeyActionType.UP)
+
+        self.assertEqual(self._read(self.media_path), b'\x24\x02\x00\x00')
+
+
+class InputServiceTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.keyboard_path = os.path.join(tmp.name, 'hidg0')
+        keyboard = HidKeyboardService(
+            self.keyboard_path,
+            os.path.join(tmp.name, 'hidg2'),
+            logging.getLogger(__name__),
+        )
+        self.service = InputService(
+            keyboard,
+            cast(Any, None),
+            cast(Any, LongPressConfig()),
+            logging.getLogger(__name__),
+        )
+
+    def _keys(self):
+        input_service.flush_hid_writes()
+        with open(self.keyboard_path, 'rb') as f:
+            # Skip the release InputService sends on start-up.
+            return [r[2] for r in struct.iter_unpack('<BB6B', f.read())][1:]
+
+    def _reports(self):
+        """Modifiers, reserved byte and first key slot of each report."""
+        input_service.flush_hid_writes()
+        with open(self.keyboard_path, 'rb') as f:
+            return [r[:3] for r in struct.iter_unpack('<BB6B', f.read())][1:]
+
+    def test_press_returns_before_the_release(self):
+        start = time.monotonic()
+        self.service.press_key(Key.KEY_A, KeyActionType.PRESS, None)
+
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(self._keys(), [0x04])
+
+        self.assertTrue(self.service.wait_idle(timeout=1))
+        self.assertEqual(self._keys(), [0x04, 0])
+
+    def test_unmapped_key_raises_from_press_key(self):
+        with self.assertRaises(KeyError):
+            self.service.press_key(Key.KEY_MEDIA_STOP, KeyActionType.PRESS, None)
+
+        self.service.press_key(Key.KEY_A, KeyActionType.DOWN, None)
+        self.assertTrue(self.service.wait_idle(timeout=1))
+        self.assertEqual(self._keys(), [0x04])
+
+    def test_events_queue_behind_a_pending_release(self):
+        self.service.press_key(Key.KEY_A, KeyActionType.PRESS, None)
+        self.service.press_key(Key.KEY_B, KeyActionType.DOWN, None)
+
+        self.assertTrue(self.service.wait_idle(timeout=1))
+        self.assertEqual(self._keys(), [0x04, 0, 0x05])
+
+    def test_hotkey_program_waits_before_its_delayed_steps(self):
+        self.service.press_hotkey(
+            compile_hotkey('{Ctrl Down}a{Ctrl Up:50}'), KeyActionType.PRESS, None
+        )
+
+        self.assertTrue(self.service.wait_idle(timeout=1))
+        reports = self._reports()
+        ctrl = 0x01
+        self.assertEqual(
+            reports, [(ctrl, 0, 0), (ctrl, 0, 0x04), (ctrl, 0, 0), (0, 0, 0)]
+        )
+
+    def test_hotkey_keeps_keys_held_before_it(self):
+        self.service.press_key(Key.KEY_LSHIFT, KeyActionType.DOWN, None)
+        self.service.press_hotkey(compile_hotkey('a'), KeyActionType.PRESS, None)
+
+        self.assertTrue(self.service.wait_idle(timeout=1))
+        reports = self._reports()
+        shift = 0x02
+        self.assertEqual(reports, [(shift, 0, 0), (shift, 0, 0x04), (shift, 0, 0)])
+
+    def test_async_key_waits_for_a_hotkey_in_progress(self):
+        async def press():
+            hotkey = asyncio.create_task(self.service.press_hotkey_async(
+                compile_hotkey('{Ctrl Down}a{Ctrl Up:50}'), KeyActionType.PRESS, None
+            ))
+            await asyncio.sleep(0.01)
+            await self.service.press_key_async(
+                Key.KEY_LSHIFT, KeyActionType.DOWN, None
+            )
+            await hotkey
+
+        asyncio.run(press())
+
+        reports = self._reports()
+        ctrl, shift = 0x01, 0x02
+        self.assertEqual(
+            reports,
+            [(ctrl, 0, 0), (ctrl, 0, 0x04), (ctrl, 0, 0), (0, 0, 0), (shift, 0, 0)],
+        )
+
+    def _cancel_typing(self, script):
+        progress = []
+
+        def report(typed, done):
+            progress.append((typed, done))
+            return True
+
+        async def type_and_cancel():
+            typist = asyncio.create_task(
+                self.service.type_text_async(script, 0.05, report)
+            )
+            await asyncio.sleep(0.01)
+            typist.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await typist
+
+        asyncio.run(type_and_cancel())
+        return progress
+
+    def test_cancelled_async_typing_releases_the_keyboard(self):
+        progress = self._cancel_typing(encode_typing('abc', 'en-US'))
+
+        self.assertEqual(self._reports(), [(0, 0, 0x04), (0, 0, 0)])
+        self.assertEqual(progress, [(1, False), (1, True)])
+
+    def test_cancelled_rollover_typing_releases_every_key(self):
+        self._cancel_typing(encode_typing('ABC', 'en-US', rollover=True))
+
+        shift = 0x02
+        self.assertEqual(self._reports(), [(shift, 0, 0x04), (0, 0, 0)])
+
+
 if __name__ == '__main__':
     unittest.main()
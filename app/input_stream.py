@@ -0,0 +1,262 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import AsyncIterable
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+
+import grpc
+
+import input_pb2
+from timing import precise_sleep
+
+# An ack is sent once this many events are unacknowledged, or ACK_INTERVAL_S
+# after the first unacknowledged one, whichever comes first.
+ACK_EVERY = 32
+ACK_INTERVAL_S = 0.05
+
+# Longest batch SendEvents accepts. The call holds a server worker, and the
+# peer's later sequenced calls, for the whole replay, so batches are meant for
+# short gestures; longer input belongs on InputStream.
+MAX_BATCH_SPAN_US = 250_000
+
+EventDispatcher = Callable[[input_pb2.InputEvent], None]
+TimedEventDispatcher = Callable[[input_pb2.TimedInputEvent], None]
+AsyncEventDispatcher = Callable[[input_pb2.InputEvent], Awaitable[None]]
+AsyncTimedEventDispatcher = Callable[[input_pb2.TimedInputEvent], Awaitable[None]]
+
+
+def validate_batch(events: Iterable[input_pb2.TimedInputEvent]):
+    """Raises ValueError if `events` cannot be replayed as given."""
+    previous_us = 0
+    for i, event in enumerate(events):
+        if event.offset_us < previous_us:
+            raise ValueError(f'Event {i} is earlier than the one before it')
+        if event.offset_us > MAX_BATCH_SPAN_US:
+            raise ValueError(f'Batch spans more than {MAX_BATCH_SPAN_US}us')
+        previous_us = event.offset_us
+
+
+def replay_batch(
+    events: Iterable[input_pb2.TimedInputEvent],
+    dispatch: TimedEventDispatcher,
+    sleep: Callable[[float], None] = precise_sleep,
+):
+    """Dispatches `events`, each at its offset from the start of the replay.
+
+    Offsets are measured from when the replay started rather than from the
+    previous event, so time spent dispatching is not added to the spacing. An
+    event that is already due is dispatched right away.
+    """
+    start_ns = time.monotonic_ns()
+    for event in events:
+        remaining_ns = start_ns + event.offset_us * 1000 - time.monotonic_ns()
+        if remaining_ns > 0:
+            sleep(remaining_ns / 1e9)
+        dispatch(event)
+
+
+async def replay_batch_async(
+    events: Iterable[input_pb2.TimedInputEvent],
+    dispatch: AsyncTimedEventDispatcher,
+):
+    """`replay_batch` for asyncio callers."""
+    start_ns = time.monotonic_ns()
+    for event in events:
+        remaining_ns = start_ns + event.offset_us * 1000 - time.monotonic_ns()
+        if remaining_ns > 0:
+            await asyncio.sleep(remaining_ns / 1e9)
+        await dispatch(event)
+
+
+class InputStreamSession:
+    """State of one client's `InputStream` call.
+
+    The request iterator is drained by `consume` on its own thread, which
+    dispatches events in order as they arrive. `acks` is the response stream:
+    it blocks while there is nothing to acknowledge and otherwise batches
+    cumulative acks, so a busy stream does not answer every event.
+    """
+
+    _logger: logging.Logger
+    _dispatch: EventDispatcher
+    _last_seq: int
+    _acked_seq: int
+    _failed: list[int]
+
+    def __init__(
+        self,
+        dispatch: EventDispatcher,
+        logger: logging.Logger,
+        ack_every: int = ACK_EVERY,
+        ack_interval: float = ACK_INTERVAL_S,
+    ):
+        self._dispatch = dispatch
+        self._logger = logger
+        self._ack_every = ack_every
+        self._ack_interval = ack_interval
+        self._cond = threading.Condition(threading.Lock())
+        self._last_seq = 0
+        self._acked_seq = 0
+        self._failed = []
+        self._done = False
+        self.duplicates = 0
+
+    def process(self, event: input_pb2.InputEvent):
+        """Dispatches `event` unless an event with its `seq` was already seen."""
+        seq = event.seq
+        if seq <= self._last_seq:
+            self.duplicates += 1
+            return
+
+        failed = False
+        try:
+            self._dispatch(event)
+        except Exception:  # pylint: disable=broad-except
+            # Reported in the next ack; one bad event must not end the stream.
+            self._logger.exception('Failed to process input event %d', seq)
+            failed = True
+
+        with self._cond:
+            # Wakes acks() for the first unacknowledged event, which starts
+            # the ack interval, and again once a full batch is waiting.
+            first = self._last_seq == self._acked_seq
+            self._last_seq = seq
+            if failed:
+                self._failed.append(seq)
+            if first or seq - self._acked_seq >= self._ack_every:
+                self._cond.notify_all()
+
+    def consume(self, events: Iterable[input_pb2.InputEvent]):
+        """Dispatches `events` until the client closes its side of the stream."""
+        try:
+            for event in events:
+                self.process(event)
+        except grpc.RpcError:
+            # Cancelled or disconnected; acks() still reports what was done.
+            self._logger.info('Input stream closed by client')
+        finally:
+            self.close()
+
+    def close(self):
+        with self._cond:
+            self._done = True
+            self._cond.notify_all()
+
+    def _unacked(self) -> int:
+        return self._last_seq - self._acked_seq
+
+    def acks(self) -> Iterator[input_pb2.InputAck]:
+        cond = self._cond
+        while True:
+            with cond:
+                cond.wait_for(lambda: self._done or self._unacked())
+                # Give more events a moment to arrive so they share an ack.
+                cond.wait_for(
+                    lambda: self._done or self._unacked() >= self._ack_every,
+                    self._ack_interval,
+                )
+                if not self._unacked():
+                    return
+
+                ack = input_pb2.InputAck(seq=self._last_seq, failed=self._failed)
+                self._acked_seq = self._last_seq
+                self._failed = []
+            yield ack
+
+
+class AsyncInputStreamSession:
+    """`InputStreamSession` for the asyncio server.
+
+    `consume` runs as a task on the loop next to the `acks` generator.
+    """
+
+    _logger: logging.Logger
+    _dispatch: AsyncEventDispatcher
+    _last_seq: int
+    _acked_seq: int
+    _failed: list[int]
+
+    def __init__(
+        self,
+        dispatch: AsyncEventDispatcher,
+        logger: logging.Logger,
+        ack_every: int = ACK_EVERY,
+        ack_interval: float = ACK_INTERVAL_S,
+    ):
+        self._dispatch = dispatch
+        self._logger = logger
+        self._ack_every = ack_every
+        self._ack_interval = ack_interval
+        self._cond = asyncio.Condition()
+        self._last_seq = 0
+        self._acked_seq = 0
+        self._failed = []
+        self._done = False
+        self.duplicates = 0
+
+    async def process(self, event: input_pb2.InputEvent):
+        seq = event.seq
+        if seq <= self._last_seq:
+            self.duplicates += 1
+            return
+
+        failed = False
+        try:
+            await self._dispatch(event)
+        except Exception:  # pylint: disable=broad-except
+            self._logger.exception('Failed to process input event %d', seq)
+            failed = True
+
+        async with self._cond:
+            # Wakes acks() for the first unacknowledged event, which starts
+            # the ack interval, and again once a full batch is waiting.
+            first = self._last_seq == self._acked_seq
+            self._last_seq = seq
+            if failed:
+                self._failed.append(seq)
+            if first or seq - self._acked_seq >= self._ack_every:
+                self._cond.notify_all()
+
+    async def consume(self, events: AsyncIterable[input_pb2.InputEvent]):
+        try:
+            async for event in events:
+                await self.process(event)
+        except grpc.RpcError:
+            self._logger.info('Input stream closed by client')
+        finally:
+            await self.close()
+
+    async def close(self):
+        async with self._cond:
+            self._done = True
+            self._cond.notify_all()
+
+    def _unacked(self) -> int:
+        return self._last_seq - self._acked_seq
+
+    async def acks(self) -> AsyncIterator[input_pb2.InputAck]:
+        cond = self._cond
+        while True:
+            async with cond:
+                await cond.wait_for(lambda: self._done or self._unacked())
+                try:
+                    await asyncio.wait_for(
+                        cond.wait_for(
+                            lambda: self._done or self._unacked() >= self._ack_every
+                        ),
+                        self._ack_interval,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                if not self._unacked():
+                    return
+
+                ack = input_pb2.InputAck(seq=self._last_seq, failed=self._failed)
+                self._acked_seq = self._last_seq
+                self._failed = []
+            yield ack
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import queue
+import threading
+import unittest
+from concurrent import futures
+from typing import Any
+from typing import cast
+
+import grpc
+
+import input_pb2
+import input_pb2_grpc
+from input_stream import MAX_BATCH_SPAN_US
+from input_stream import AsyncInputStreamSession
+from input_stream import InputStreamSession
+from input_stream import replay_batch
+from input_stream import validate_batch
+from server import InputMethodsService
+
+
+def _move(seq, x=1.0, y=0.0):
+    return input_pb2.InputEvent(seq=seq, mouse_move=input_pb2.MouseMove(x=x, y=y))
+
+
+class InputStreamSessionTest(unittest.TestCase):
+    def _run(self, events, dispatch=None, **kwargs):
+        dispatched = []
+        session = InputStreamSession(
+            dispatch or dispatched.append, logging.getLogger(__name__), **kwargs
+        )
+        reader = threading.Thread(target=session.consume, args=(iter(events),))
+        reader.start()
+        acks = list(session.acks())
+        reader.join()
+        return session, dispatched, acks
+
+    def test_acks_are_cumulative_and_batched(self):
+        _, dispatched, acks = self._run(
+            [_move(seq) for seq in range(1, 101)], ack_every=32, ack_interval=1
+        )
+
+        self.assertEqual([e.seq for e in dispatched], list(range(1, 101)))
+        self.assertLess(len(acks), 10)
+        self.assertEqual(acks[-1].seq, 100)
+        self.assertEqual([a.seq for a in acks], sorted(a.seq for a in acks))
+
+    def test_stale_sequence_numbers_are_ignored(self):
+        session, dispatched, acks = self._run([_move(1), _move(2), _move(2), _move(1)])
+
+        self.assertEqual([e.seq for e in dispatched], [1, 2])
+        self.assertEqual(session.duplicates, 2)
+        self.assertEqual(acks[-1].seq, 2)
+
+    def test_failed_events_are_reported_without_ending_the_stream(self):
+        def dispatch(event):
+            if event.seq == 2:
+                raise ValueError('boom')
+
+        _, _, acks = self._run([_move(1), _move(2), _move(3)], dispatch=dispatch)
+
+        self.assertEqual(acks[-1].seq, 3)
+        self.assertEqual([seq for a in acks for seq in a.failed], [2])
+
+    def test_first_event_is_acked_while_the_stream_is_open(self):
+        events = queue.SimpleQueue()
+        session = InputStreamSession(
+            lambda event: None, logging.getLogger(__name__), ack_interval=0.05
+        )
+        reader = threading.Thread(
+            target=session.consume, args=(iter(events.get, None),)
+        )
+        reader.start()
+        self.addCleanup(reader.join)
+        self.addCleanup(events.put, None)
+
+        acks = []
+        waiter = threading.Thread(
+            target=lambda: acks.append(next(session.acks())), daemon=True
+        )
+        waiter.start()
+        events.put(_move(1))
+        waiter.join(timeout=0.5)
+
+        self.assertEqual([a.seq for a in acks], [1])
+
+
+class AsyncInputStreamSessionTest(unittest.IsolatedAsyncioTestCase):
+    async def test_first_event_is_acked_while_the_stream_is_open(self):
+        events = asyncio.Queue()
+
+        async def stream():
+            while (event := await events.get()) is not None:
+                yield event
+
+        async def dispatch(event):
+            pass
+
+        session = AsyncInputStreamSession(
+            dispatch, logging.getLogger(__name__), ack_interval=0.05
+        )
+        reader = asyncio.create_task(session.consume(stream()))
+        acks = session.acks()
+        waiter = asyncio.create_task(acks.__anext__())
+        # Let acks() start waiting before the event comes in.
+        await asyncio.sleep(0.01)
+        events.put_nowait(_move(1))
+
+        ack = await asyncio.wait_for(waiter, 0.5)
+
+        self.assertEqual(ack.seq, 1)
+        events.put_nowait(None)
+        await reader
+        await acks.aclose()
+
+
+def _timed_move(offset_us, x=1.0, y=0.0):
+    return input_pb2.TimedInputEvent(
+        offset_us=offset_us, mouse_move=input_pb2.MouseMove(x=x, y=y)
+    )
+
+
+class ReplayBatchTest(unittest.TestCase):
+    def test_events_are_replayed_at_their_offsets_from_the_start(self):
+        sleeps = []
+        dispatched = []
+
+        replay_batch(
+            [_timed_move(0), _timed_move(10_000), _timed_move(30_000)],
+            dispatched.append,
+            sleep=sleeps.append,
+        )
+
+        self.assertEqual([e.offset_us for e in dispatched], [0, 10_000, 30_000])
+        # The fake sleep does not advance the clock, so each wait is measured
+        # from the start of the batch rather than from the previous event.
+        self.assertEqual(len(sleeps), 2)
+        self.assertAlmostEqual(sleeps[0], 0.01, delta=0.005)
+        self.assertAlmostEqual(sleeps[1], 0.03, delta=0.005)
+
+    def test_offsets_must_not_decrease(self):
+        with self.assertRaises(ValueError):
+            validate_batch([_timed_move(10), _timed_move(5)])
+
+    def test_batch_span_is_limited(self):
+        validate_batch([_timed_move(MAX_BATCH_SPAN_US)])
+        with self.assertRaises(ValueError):
+            validate_batch([_timed_move(MAX_BATCH_SPAN_US + 1)])
+
+
+class InputService:
+    def __init__(self):
+        self.moves = []
+
+    def move_mouse(self, x, y):
+        self.moves.append((x, y))
+
+    def move_mouse_absolute(self, x, y):
+        self.moves.append(('abs', x, y))
+
+
+class InputStreamRpcTest(unittest.TestCase):
+    def setUp(self):
+        self.input_service = InputService()
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+        input_pb2_grpc.add_InputMethodsServicer_to_server(
+            InputMethodsService(
+                config_service=cast(Any, None),
+                input_service=cast(Any, self.input_service),
+                logger=logging.getLogger(__name__),
+            ),
+            self.server,
+        )
+        port = self.server.add_insecure_port('127.0.0.1:0')
+        self.server.start()
+        self.addCleanup(self.server.stop, None)
+
+        self.channel = grpc.insecure_channel(f'127.0.0.1:{port}')
+        self.addCleanup(self.channel.close)
+
+    def test_events_of_every_kind_share_one_stream(self):
+        stub = input_pb2_grpc.InputMethodsStub(self.channel)
+        events = [
+            _move(1, 3, -2),
+            input_pb2.InputEvent(
+                seq=2,
+                mouse_move_absolute=input_pb2.MouseMoveAbsolute(x=0.5, y=2),
+            ),
+            input_pb2.InputEvent(seq=3),
+        ]
+
+        acks = list(stub.InputStream(iter(events), timeout=5))
+
+        self.assertEqual(self.input_service.moves, [(3, -2), ('abs', 0.5, 1.0)])
+        self.assertEqual(acks[-1].seq, 3)
+        self.assertEqual([seq for a in acks for seq in a.failed], [3])
+
+    def test_send_events_replays_the_batch(self):
+        stub = input_pb2_grpc.InputMethodsStub(self.channel)
+        batch = input_pb2.EventBatch(
+            events=[_timed_move(0, 1, 1), _timed_move(20_000, 2, 2)]
+        )
+
+        stub.SendEvents(batch, timeout=5)
+
+        self.assertEqual(self.input_service.moves, [(1, 1), (2, 2)])
+
+    def test_send_events_rejects_out_of_order_batches(self):
+        stub = input_pb2_grpc.InputMethodsStub(self.channel)
+        batch = input_pb2.EventBatch(events=[_timed_move(10), _timed_move(0)])
+
+        with self.assertRaises(grpc.RpcError) as cm:
+            stub.SendEvents(batch, timeout=5)
+
+        self.assertEqual(cm.exception.code(), grpc.StatusCode.INVALID_ARGUMENT)
+        self.assertEqual(self.input_service.moves, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+import bisect
+import threading
+import time
+from typing import Optional
+
+import grpc
+
+import input_pb2
+
+# Upper bounds of the histogram buckets, in microseconds. A last bucket
+# collects everything above the highest bound.
+BUCKET_BOUNDS_US = (
+    50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000,
+    250_000, 1_000_000,
+)
+_BUCKET_BOUNDS_NS = tuple(bound * 1000 for bound in BUCKET_BOUNDS_US)
+
+
+class LatencyHistogram:
+    """Durations counted into the fixed `BUCKET_BOUNDS_US` buckets.
+
+    Recording is a bisect and a few additions under an uncontended lock, cheap
+    enough for every report and call.
+    """
+
+    __slots__ = ('counts', 'sum_ns', 'max_ns', '_lock')
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS_NS) + 1)
+        self.sum_ns = 0
+        self.max_ns = 0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def record_ns(self, duration_ns: int):
+        bucket = bisect.bisect_left(_BUCKET_BOUNDS_NS, duration_ns)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.sum_ns += duration_ns
+            if duration_ns > self.max_ns:
+                self.max_ns = duration_ns
+
+    def to_pb(self, name: str, metric: str) -> input_pb2.LatencyHistogram:
+        return input_pb2.LatencyHistogram(
+            name=name,
+            metric=metric,
+            counts=self.counts,
+            sum_us=self.sum_ns // 1000,
+            max_us=self.max_ns // 1000,
+        )
+
+    def snapshot(self, reset: bool = False) -> 'LatencyHistogram':
+        """Returns a copy, clearing this histogram if `reset` is set."""
+        copy = LatencyHistogram()
+        with self._lock:
+            copy.counts = list(self.counts)
+            copy.sum_ns = self.sum_ns
+            copy.max_ns = self.max_ns
+            if reset:
+                self.counts = [0] * len(self.counts)
+                self.sum_ns = 0
+                self.max_ns = 0
+        return copy
+
+
+class HistogramSet:
+    """Histograms keyed by name, created when first recorded to."""
+
+    _histograms: dict[str, LatencyHistogram]
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def snapshot(self, reset: bool = False) -> dict[str, LatencyHistogram]:
+        return {
+            name: histogram.snapshot(reset)
+            for name, histogram in list(self._histograms.items())
+        }
+
+
+class CallCounter:
+    """Finished calls keyed by method and status code.
+
+    Counts only grow; they are meant to be scraped as counters.
+    """
+
+    _counts: dict[tuple[str, str], int]
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, code: Optional[grpc.StatusCode]):
+        key = (method, (code or grpc.StatusCode.OK).name)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def snapshot(self) -> dict[tuple[str, str], int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+class RpcLatencyInterceptor(grpc.ServerInterceptor):
+    """Records how long unary calls wait for a worker thread and run.
+
+    gRPC calls interceptors when a call arrives, before it is queued for the
+    worker pool, so the time until the handler starts is the queue wait.
+    Install it first to keep time spent in later interceptors out of the
+    queue wait.
+    """
+
+    def __init__(
+        self, queue_wait: HistogramSet, handler: HistogramSet, calls: CallCounter
+    ):
+        self._queue_wait = queue_wait
+        self._handler = handler
+        self._calls = calls
+
+    def intercept_service(self, continuation, handler_call_details):
+        arrived_ns = time.monotonic_ns()
+        handler = continuation(handler_call_details)
+        if handler is None or handler.unary_unary is None:
+            return handler
+
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        queue_wait = self._queue_wait.histogram(method)
+        handler_time = self._handler.histogram(method)
+        calls = self._calls
+        behavior = handler.unary_unary
+
+        def timed(request, context):
+            start_ns = time.monotonic_ns()
+            queue_wait.record_ns(start_ns - arrived_ns)
+            try:
+                response = behavior(request, context)
+            except Exception:
+                # context.abort() sets the code before raising.
+                calls.record(method, context.code() or grpc.StatusCode.UNKNOWN)
+                raise
+            finally:
+                handler_time.record_ns(time.monotonic_ns() - start_ns)
+            calls.record(method, context.code())
+            return response
+
+        return grpc.unary_unary_rpc_method_handler(
+            timed,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+
+
+class AsyncRpcLatencyInterceptor(grpc.aio.ServerInterceptor):
+    """`RpcLatencyInterceptor` for the asyncio server.
+
+    Queue wait is the time until the event loop got to the handler.
+    """
+
+    def __init__(
+        self, queue_wait: HistogramSet, handler: HistogramSet, calls: CallCounter
+    ):
+        self._queue_wait = queue_wait
+        self._handler = handler
+        self._calls = calls
+
+    async def intercept_service(self, continuation, handler_call_details):
+        arrived_ns = time.monotonic_ns()
+        handler = await continuation(handler_call_details)
+        if handler is None or handler.unary_unary is None:
+            return handler
+
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        queue_wait = self._queue_wait.histogram(method)
+        handler_time = self._handler.histogram(method)
+        calls = self._calls
+        behavior = handler.unary_unary
+
+        async def timed(request, context):
+            start_ns = time.monotonic_ns()
+            queue_wait.record_ns(start_ns - arrived_ns)
+            try:
+                response = await behavior(request, context)
+            except Exception:
+                calls.record(method, context.code() or grpc.StatusCode.UNKNOWN)
+                raise
+            finally:
+                handler_time.record_ns(time.monotonic_ns() - start_ns)
+            calls.record(method, context.code())
+            return response
+
+        return grpc.unary_unary_rpc_method_handler(
+            timed,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+
+
+class RpcLatencyStats:
+    """Per-method queue wait, handler time and status codes of unary calls."""
+
+    queue_wait: HistogramSet
+    handler: HistogramSet
+    calls: CallCounter
+
+    def __init__(self):
+        self.queue_wait = HistogramSet()
+        self.handler = HistogramSet()
+        self.calls = CallCounter()
+
+    def interceptor(self) -> RpcLatencyInterceptor:
+        return RpcLatencyInterceptor(self.queue_wait, self.handler, self.calls)
+
+    def async_interceptor(self) -> AsyncRpcLatencyInterceptor:
+        return AsyncRpcLatencyInterceptor(self.queue_wait, self.handler, self.calls)
+
+    def snapshot(
+        self, reset: bool = False
+    ) -> dict[str, dict[str, LatencyHistogram]]:
+        """Histograms by metric ('queue_wait' or 'handler'), then by method."""
+        return {
+            'queue_wait': self.queue_wait.snapshot(reset),
+            'handler': self.handler.snapshot(reset),
+        }
+
+
+def histograms_to_pb(
+    histograms: dict[str, dict[str, LatencyHistogram]],
+) -> list[input_pb2.LatencyHistogram]:
+    """Converts histograms keyed by metric, then by name."""
+    return [
+        histogram.to_pb(str(name), metric)
+        for metric, by_name in histograms.items()
+        for name, histogram in by_name.items()
+    ]
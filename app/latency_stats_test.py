@@ -0,0 +1,108 @@
+import logging
+import unittest
+from concurrent import futures
+from typing import Any
+from typing import cast
+
+import grpc
+
+import input_pb2
+import input_pb2_grpc
+from latency_stats import BUCKET_BOUNDS_US
+from latency_stats import LatencyHistogram
+from latency_stats import RpcLatencyStats
+from server import InputMethodsService
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_durations_land_in_the_bucket_of_their_upper_bound(self):
+        histogram = LatencyHistogram()
+
+        histogram.record_ns(50_000)  # exactly the first bound
+        histogram.record_ns(50_001)
+        histogram.record_ns(5_000_000_000)
+
+        self.assertEqual(histogram.counts[0], 1)
+        self.assertEqual(histogram.counts[1], 1)
+        self.assertEqual(histogram.counts[len(BUCKET_BOUNDS_US)], 1)
+        self.assertEqual(histogram.max_ns, 5_000_000_000)
+
+    def test_snapshot_with_reset_clears_the_histogram(self):
+        histogram = LatencyHistogram()
+        histogram.record_ns(1000)
+
+        snapshot = histogram.snapshot(reset=True)
+
+        self.assertEqual(snapshot.count, 1)
+        self.assertEqual(histogram.count, 0)
+        self.assertEqual(histogram.sum_ns, 0)
+
+
+class InputService:
+    def move_mouse(self, x, y):
+        pass
+
+
+class GetStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.stats = stats = RpcLatencyStats()
+        self.server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=2),
+            interceptors=(stats.interceptor(),),
+        )
+        input_pb2_grpc.add_InputMethodsServicer_to_server(
+            InputMethodsService(
+                config_service=cast(Any, None),
+                input_service=cast(Any, InputService()),
+                logger=logging.getLogger(__name__),
+                rpc_latency=stats,
+            ),
+            self.server,
+        )
+        port = self.server.add_insecure_port('127.0.0.1:0')
+        self.server.start()
+        self.addCleanup(self.server.stop, None)
+
+        channel = grpc.insecure_channel(f'127.0.0.1:{port}')
+        self.addCleanup(channel.close)
+        self.stub = input_pb2_grpc.InputMethodsStub(channel)
+
+    def _rpc_histograms(self, reset=False):
+        stats = self.stub.GetStats(input_pb2.StatsRequest(reset=reset), timeout=5)
+        self.assertEqual(list(stats.bucket_bounds_us), list(BUCKET_BOUNDS_US))
+        return {
+            (h.name, h.metric): sum(h.counts)
+            for h in stats.rpc
+            if h.name == 'MoveMouse'
+        }
+
+    def test_calls_are_recorded_per_method(self):
+        for _ in range(3):
+            self.stub.MoveMouse(input_pb2.MouseMove(x=1, y=1), timeout=5)
+
+        self.assertEqual(
+            self._rpc_histograms(reset=True),
+            {('MoveMouse', 'queue_wait'): 3, ('MoveMouse', 'handler'): 3},
+        )
+        self.assertEqual(
+            self._rpc_histograms(),
+            {('MoveMouse', 'queue_wait'): 0, ('MoveMouse', 'handler'): 0},
+        )
+
+    def test_calls_are_counted_by_status_code(self):
+        self.stub.MoveMouse(input_pb2.MouseMove(x=1, y=1), timeout=5)
+        with self.assertRaises(grpc.RpcError):
+            # Aborts with FAILED_PRECONDITION without a motion lane.
+            self.stub.OpenMotionLane(input_pb2.Empty(), timeout=5)
+
+        self.assertEqual(
+            self.stats.calls.snapshot(),
+            {
+                ('MoveMouse', 'OK'): 1,
+                ('OpenMotionLane', 'FAILED_PRECONDITION'): 1,
+            },
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
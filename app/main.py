@@ -1,15 +1,27 @@
+import asyncio
 import logging
+import resource
 from concurrent import futures
 
 import grpc
 
-import execute
 import input_pb2_grpc
+from aio_server import create_server
 from config_service import ConfigService
+from eio_server import EngineIoFrontend
 from input_service import HidKeyboardService
 from input_service import HidMouseService
 from input_service import InputService
+from input_service import flush_hid_writes
+from input_service import use_async_hid_writers
+from latency_stats import RpcLatencyStats
+from metrics import MetricsExporter
+from motion_lane import MotionLane
+from peer_sequencer import PeerSequencer
+from peer_sequencer import PeerSequencingInterceptor
+from scheduler import Scheduler
 from server import InputMethodsService
+from timing import set_spin_budget_us
 
 root_logger = logging.getLogger()
 root_logger.propagate = True
@@ -31,22 +43,19 @@ root_logger.addHandler(stdout_logger)
 root_logger.addHandler(stderr_logger)
 
 
-def _noop(*args, **kwargs):
-    pass
-
-
 if __name__ == '__main__':
     logger = logging.getLogger(__name__)
     logger.setLevel(logging.INFO)
 
-    # warm up processes
-    execute.with_timeout_t(_noop, timeout_in_seconds=1)
-
-    thread_pool = futures.ThreadPoolExecutor(max_workers=10)
-    server = grpc.server(thread_pool)
-
     config_service = ConfigService(logger=logging.getLogger(__name__))
 
+    is_aio = config_service.server_mode == 'aio'
+    if is_aio:
+        # Has to happen before the services below send their first reports.
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        hid_writers = use_async_hid_writers(loop)
+
     hid_service = HidKeyboardService(
         keyboard_path='/dev/null',
         media_path='/dev/null',
@@ -59,16 +68,23 @@ if __name__ == '__main__':
         logger=logging.getLogger(__name__),
     )
 
+    set_spin_budget_us(config_service.timer_spin_us)
+
+    # Sends the delayed releases and hotkey steps of the threaded server.
+    scheduler = Scheduler(logger=logging.getLogger(__name__))
+
     input_service = InputService(
         hid_service=hid_service,
         mouse_service=mouse_hid_service,
         config_service=config_service,
         logger=logging.getLogger(__name__),
+        scheduler=scheduler,
     )
 
     hid_service.keyboard_path = config_service.keyboard_path
     hid_service.media_path = config_service.media_path
     mouse_hid_service.mouse_path = config_service.mouse_path
+    mouse_hid_service.tablet_path = config_service.tablet_path
 
     if config_service.is_debug:
         root_logger.setLevel(logging.DEBUG)
@@ -77,30 +93,109 @@ if __name__ == '__main__':
         root_logger.setLevel(logging.INFO)
         logger.setLevel(logging.INFO)
 
-    input_pb2_grpc.add_InputMethodsServicer_to_server(
-        InputMethodsService(
-            config_service=config_service,
-            input_service=input_service,
-            logger=logging.getLogger(__name__),
-        ),
-        server,
-    )
-
     host = config_service.host
     if config_service.host == '0.0.0.0':
         host = '[::]'
 
     address = f'{host}:{config_service.port}'
-    logger.info(f'Starting server on {address}')
-
-    server.add_insecure_port(address)
-    server.start()
-
-    try:
-        server.wait_for_termination()
-    except KeyboardInterrupt:
-        logger.info('Shutting down server')
-        hid_service.unpress_all_keys()
-        server.stop(0)
-        thread_pool.shutdown()
-        logger.info('Server stopped')
+    logger.info(f'Starting {config_service.server_mode} server on {address}')
+
+    rpc_latency = RpcLatencyStats()
+
+    motion_lane = None
+    if config_service.motion_lane_port:
+        motion_lane = MotionLane(
+            host=host.strip('[]'),
+            port=config_service.motion_lane_port,
+            mouse_service=mouse_hid_service,
+            logger=logging.getLogger(__name__),
+        )
+
+    metrics_exporter = None
+    if config_service.metrics_port:
+        metrics_exporter = MetricsExporter(
+            mouse_service=mouse_hid_service,
+            logger=logging.getLogger(__name__),
+            rpc_latency=rpc_latency,
+        )
+        metrics_exporter.start(host.strip('[]'), config_service.metrics_port)
+
+    if is_aio:
+        server = create_server(
+            config_service=config_service,
+            input_service=input_service,
+            logger=logging.getLogger(__name__),
+            motion_lane=motion_lane,
+            rpc_latency=rpc_latency,
+        )
+        server.add_insecure_port(address)
+        if motion_lane:
+            loop.run_until_complete(motion_lane.start_async(loop))
+        loop.run_until_complete(server.start())
+        if config_service.engineio_port:
+            logger.warning('The Engine.IO endpoint is only served in threaded mode')
+
+        try:
+            loop.run_until_complete(server.wait_for_termination())
+        except KeyboardInterrupt:
+            logger.info('Shutting down server')
+            if motion_lane:
+                motion_lane.close()
+            hid_service.unpress_all_keys()
+            loop.run_until_complete(hid_writers.flush(timeout=1))
+            loop.run_until_complete(server.stop(0))
+            logger.info('Server stopped')
+    else:
+        thread_pool = futures.ThreadPoolExecutor(max_workers=10)
+        # Events from one client run in the order they arrived; different
+        # clients still run in parallel. Latency goes first so the queue wait
+        # it records ends when the call reaches a worker thread.
+        server = grpc.server(
+            thread_pool,
+            interceptors=(
+                rpc_latency.interceptor(),
+                PeerSequencingInterceptor(PeerSequencer()),
+            ),
+        )
+        input_methods = InputMethodsService(
+            config_service=config_service,
+            input_service=input_service,
+            logger=logging.getLogger(__name__),
+            motion_lane=motion_lane,
+            rpc_latency=rpc_latency,
+        )
+        input_pb2_grpc.add_InputMethodsServicer_to_server(input_methods, server)
+        server.add_insecure_port(address)
+        if motion_lane:
+            motion_lane.start()
+        engineio_frontend = None
+        if config_service.engineio_port:
+            engineio_frontend = EngineIoFrontend(
+                input_methods, logging.getLogger(__name__)
+            )
+            engineio_frontend.start(host.strip('[]'), config_service.engineio_port)
+        server.start()
+
+        try:
+            server.wait_for_termination()
+        except KeyboardInterrupt:
+            logger.info('Shutting down server')
+            server.stop(0)
+            thread_pool.shutdown()
+            if motion_lane:
+                motion_lane.close()
+            if engineio_frontend:
+                engineio_frontend.close()
+            input_service.wait_idle(timeout=1)
+            scheduler.close(timeout=1)
+            hid_service.unpress_all_keys()
+            flush_hid_writes(timeout=1)
+            logger.info('Server stopped')
+
+    if metrics_exporter:
+        metrics_exporter.close()
+
+    # ru_maxrss is in KiB on Linux; logged to compare the two server modes.
+    logger.info(
+        'Peak RSS: %d KiB', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    )
@@ -0,0 +1,215 @@
+import logging
+import os
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Callable
+from typing import Optional
+
+from hotkey_parser import hotkey_cache_info
+from input_service import HidMouseService
+from input_service import hid_queue_stats
+from input_service import hid_write_stats
+from latency_stats import RpcLatencyStats
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRIC_PREFIX = 'piremote_'
+
+# (labels, value) pairs of one metric family.
+Samples = list[tuple[dict[str, str], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_family(name: str, kind: str, help_text: str, samples: Samples) -> str:
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    for labels, value in samples:
+        if labels:
+            label_str = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f'{name}{{{label_str}}} {value}')
+        else:
+            lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def resident_memory_bytes() -> Optional[int]:
+    """Current RSS of this process, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm', encoding='ascii') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+class MetricsExporter:
+    """Serves the server's counters in the Prometheus text exposition format.
+
+    Nothing is recorded for this: the hot paths already keep plain integer
+    counters (`HidWriterStats`, `HidEndpointStats`, the mouse service's
+    coalesced events, `RpcLatencyStats.calls`, the hotkey cache), and a scrape
+    only reads them.
+    """
+
+    _logger: logging.Logger
+    _mouse_service: HidMouseService
+    _rpc_latency: Optional[RpcLatencyStats]
+
+    def __init__(
+        self,
+        mouse_service: HidMouseService,
+        logger: logging.Logger,
+        rpc_latency: Optional[RpcLatencyStats] = None,
+    ):
+        self._mouse_service = mouse_service
+        self._logger = logger
+        self._rpc_latency = rpc_latency
+        self._httpd: Optional[_MetricsServer] = None
+        self.port = 0
+
+    def render(self) -> str:
+        families = []
+
+        if self._rpc_latency is not None:
+            families.append(_format_family(
+                METRIC_PREFIX + 'rpc_calls_total',
+                'counter',
+                'Finished unary calls by method and status code.',
+                [
+                    ({'method': method, 'code': code}, count)
+                    for (method, code), count in sorted(
+                        self._rpc_latency.calls.snapshot().items()
+                    )
+                ],
+            ))
+
+        queues = hid_queue_stats()
+        endpoints = hid_write_stats()
+        families.append(_format_family(
+            METRIC_PREFIX + 'hid_reports_written_total',
+            'counter',
+            'Reports written to each HID endpoint.',
+            [({'endpoint': str(path)}, s.written) for path, s in queues.items()],
+        ))
+        families.append(_format_family(
+            METRIC_PREFIX + 'hid_reports_dropped_total',
+            'counter',
+            'Reports discarded because the queue was full or they were late.',
+            [
+                sample
+                for path, s in queues.items()
+                for sample in (
+                    ({'endpoint': str(path), 'reason': 'overflow'}, s.dropped),
+                    ({'endpoint': str(path), 'reason': 'late'}, s.late_dropped),
+                )
+            ],
+        ))
+        families.append(_format_family(
+            METRIC_PREFIX + 'hid_reports_merged_total',
+            'counter',
+            'Reports folded into one already queued.',
+            [({'endpoint': str(path)}, s.merged) for path, s in queues.items()],
+        ))
+        families.append(_format_family(
+            METRIC_PREFIX + 'hid_queue_depth',
+            'gauge',
+            'Reports waiting to be written.',
+            [({'endpoint': str(path)}, s.depth) for path, s in queues.items()],
+        ))
+        families.append(_format_family(
+            METRIC_PREFIX + 'hid_queue_max_depth',
+            'gauge',
+            'Most reports ever waiting at once.',
+            [({'endpoint': str(path)}, s.max_depth) for path, s in queues.items()],
+        ))
+        families.append(_format_family(
+            METRIC_PREFIX + 'hid_write_failures_total',
+            'counter',
+            'Writes the host did not take in time or that failed outright.',
+            [({'endpoint': str(path)}, s.failures) for path, s in endpoints.items()],
+        ))
+        families.append(_format_family(
+            METRIC_PREFIX + 'hid_write_busy_total',
+            'counter',
+            'Writes without a deadline that had to wait for the host to read.',
+            [({'endpoint': str(path)}, s.busy) for path, s in endpoints.items()],
+        ))
+        families.append(_format_family(
+            METRIC_PREFIX + 'mouse_coalesced_events_total',
+            'counter',
+            'Mouse events merged into a report that was still pending.',
+            [({}, self._mouse_service.coalesced_events)],
+        ))
+
+        hotkey_cache = hotkey_cache_info()
+        families.append(_format_family(
+            METRIC_PREFIX + 'hotkey_cache_hits_total',
+            'counter',
+            'Hotkeys sent from an already compiled program.',
+            [({}, hotkey_cache.hits)],
+        ))
+        families.append(_format_family(
+            METRIC_PREFIX + 'hotkey_cache_misses_total',
+            'counter',
+            'Hotkeys that had to be parsed and compiled.',
+            [({}, hotkey_cache.misses)],
+        ))
+
+        rss = resident_memory_bytes()
+        if rss is not None:
+            families.append(_format_family(
+                'process_resident_memory_bytes',
+                'gauge',
+                'Resident memory size in bytes.',
+                [({}, rss)],
+            ))
+
+        return ''.join(families)
+
+    def start(self, host: str, port: int):
+        """Serves `/metrics` on `host`:`port` from a thread of its own."""
+        server_class = _MetricsServer6 if ':' in host else _MetricsServer
+        self._httpd = server_class((host, port), _MetricsHandler)
+        self._httpd.render = self.render
+        self.port = self._httpd.server_port
+        threading.Thread(
+            target=self._httpd.serve_forever, name='metrics', daemon=True
+        ).start()
+        self._logger.info('Metrics endpoint listening on port %d', self.port)
+
+    def close(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+
+class _MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+    render: Callable[[], str]
+
+
+class _MetricsServer6(_MetricsServer):
+    address_family = socket.AF_INET6
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server: _MetricsServer
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        body = self.server.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        # Scrapers would log every few seconds.
+        pass
@@ -0,0 +1,71 @@
+import logging
+import os
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from typing import Any
+from typing import cast
+
+import grpc
+
+from input_service import _write_to_hid
+from input_service import flush_hid_writes
+from latency_stats import RpcLatencyStats
+from metrics import CONTENT_TYPE
+from metrics import MetricsExporter
+
+
+class MouseService:
+    coalesced_events = 7
+
+
+class MetricsExporterTest(unittest.TestCase):
+    def setUp(self):
+        self.rpc_latency = RpcLatencyStats()
+        self.exporter = MetricsExporter(
+            cast(Any, MouseService()),
+            logging.getLogger(__name__),
+            rpc_latency=self.rpc_latency,
+        )
+
+    def test_render_reports_rpc_and_hid_counters(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.unlink, path)
+        _write_to_hid(path, b'\x00\x01')
+        _write_to_hid(path, b'\x00\x02')
+        self.assertTrue(flush_hid_writes(timeout=5))
+        self.rpc_latency.calls.record('MoveMouse', grpc.StatusCode.OK)
+        self.rpc_latency.calls.record('PressKey', grpc.StatusCode.INVALID_ARGUMENT)
+
+        lines = self.exporter.render().splitlines()
+
+        self.assertIn('# TYPE piremote_rpc_calls_total counter', lines)
+        self.assertIn('piremote_rpc_calls_total{method="MoveMouse",code="OK"} 1', lines)
+        self.assertIn(
+            'piremote_rpc_calls_total{method="PressKey",code="INVALID_ARGUMENT"} 1',
+            lines,
+        )
+        self.assertIn(f'piremote_hid_reports_written_total{{endpoint="{path}"}} 2', lines)
+        self.assertIn(f'piremote_hid_queue_depth{{endpoint="{path}"}} 0', lines)
+        self.assertIn(f'piremote_hid_write_failures_total{{endpoint="{path}"}} 0', lines)
+        self.assertIn(f'piremote_hid_write_busy_total{{endpoint="{path}"}} 0', lines)
+        self.assertIn('piremote_mouse_coalesced_events_total 7', lines)
+
+    def test_serves_metrics_over_http(self):
+        self.exporter.start('127.0.0.1', 0)
+        self.addCleanup(self.exporter.close)
+        base = f'http://127.0.0.1:{self.exporter.port}'
+
+        with urllib.request.urlopen(f'{base}/metrics', timeout=5) as response:
+            self.assertEqual(response.headers['Content-Type'], CONTENT_TYPE)
+            self.assertIn(b'piremote_mouse_coalesced_events_total 7', response.read())
+
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            urllib.request.urlopen(f'{base}/', timeout=5)
+        self.assertEqual(raised.exception.code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import asyncio
+import collections
+import logging
+import secrets
+import socket
+import struct
+import threading
+from typing import Optional
+
+from input_service import HidMouseService
+
+# token, seq, x, y, vertical wheel, horizontal wheel
+MOTION_DATAGRAM = struct.Struct('<8sIhhbb')
+TOKEN_SIZE = 8
+
+# Sessions kept at once. Clients reconnect from a new port, so the oldest
+# session is dropped when another one is opened rather than on disconnect.
+MAX_SESSIONS = 16
+
+_SEQ_MODULUS = 1 << 32
+
+
+class MotionSession:
+    __slots__ = ('peer', 'last_seq')
+
+    def __init__(self, peer: str):
+        self.peer = peer
+        self.last_seq: Optional[int] = None
+
+    def accept(self, seq: int) -> bool:
+        """Whether `seq` is newer than the last accepted sequence number.
+
+        Sequence numbers wrap around, so anything up to half the range ahead
+        counts as newer. The first datagram of a session is always accepted,
+        whatever number the client started counting from.
+        """
+        if self.last_seq is None:
+            self.last_seq = seq
+            return True
+
+        ahead = (seq - self.last_seq) % _SEQ_MODULUS
+        if ahead == 0 or ahead >= _SEQ_MODULUS // 2:
+            return False
+        self.last_seq = seq
+        return True
+
+
+class MotionLane:
+    """UDP listener for the mouse motion and scroll of negotiated sessions.
+
+    Motion is the one kind of input where a late event is worth less than a
+    lost one. Over gRPC a single lost packet holds back every later movement
+    until TCP has retransmitted it; here each datagram stands on its own and
+    ones that arrive out of order are dropped.
+
+    Sessions are opened over gRPC (see `open_session`), which hands the client
+    the token that has to prefix each datagram.
+    """
+
+    _logger: logging.Logger
+    _mouse_service: HidMouseService
+    _sessions: collections.OrderedDict[bytes, MotionSession]
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        mouse_service: HidMouseService,
+        logger: logging.Logger,
+    ):
+        self._address = (host, port)
+        self._mouse_service = mouse_service
+        self._logger = logger
+        self._sessions = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._socket: Optional[socket.socket] = None
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._closed = False
+        self.port = port
+        self.received = 0
+        self.dropped = 0
+
+    def open_session(self, peer: str) -> bytes:
+        """Opens a session for `peer` and returns its token."""
+        token = secrets.token_bytes(TOKEN_SIZE)
+        with self._lock:
+            self._sessions[token] = MotionSession(peer)
+            while len(self._sessions) > MAX_SESSIONS:
+                _, evicted = self._sessions.popitem(last=False)
+                self._logger.info('Closed motion session of %s', evicted.peer)
+        self._logger.info('Opened motion session for %s', peer)
+        return token
+
+    def handle_datagram(self, data: bytes):
+        self.received += 1
+        if len(data) != MOTION_DATAGRAM.size:
+            self.dropped += 1
+            return
+
+        token, seq, x, y, wheel, hwheel = MOTION_DATAGRAM.unpack(data)
+        with self._lock:
+            session = self._sessions.get(token)
+            accepted = session is not None and session.accept(seq)
+        if not accepted:
+            self.dropped += 1
+            return
+
+        self._mouse_service.send_movement(x, y)
+        self._mouse_service.send_scroll(wheel, hwheel)
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(
+            socket.AF_INET6 if ':' in self._address[0] else socket.AF_INET,
+            socket.SOCK_DGRAM,
+        )
+        sock.bind(self._address)
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def start(self):
+        """Starts receiving datagrams on a thread of its own."""
+        self._socket = self._bind()
+        threading.Thread(target=self._serve, name='motion-lane', daemon=True).start()
+        self._logger.info('Motion lane listening on UDP port %d', self.port)
+
+    def _serve(self):
+        sock = self._socket
+        while True:
+            try:
+                data = sock.recv(64)
+            except OSError:
+                data = b''
+            if self._closed:
+                return
+            try:
+                self.handle_datagram(data)
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception('Failed to handle motion datagram')
+
+    async def start_async(self, loop: asyncio.AbstractEventLoop):
+        """Starts receiving datagrams on `loop` instead of a thread."""
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _MotionLaneProtocol(self), sock=self._bind()
+        )
+        self._logger.info('Motion lane listening on UDP port %d', self.port)
+
+    def close(self):
+        self._closed = True
+        if self._transport is not None:
+            self._transport.close()
+        if self._socket is not None:
+            try:
+                # Wakes up the blocked recv(), even though it fails with
+                # ENOTCONN on an unconnected socket.
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+
+
+class _MotionLaneProtocol(asyncio.DatagramProtocol):
+    def __init__(self, lane: MotionLane):
+        self._lane = lane
+
+    def datagram_received(self, data, addr):
+        self._lane.handle_datagram(data)
@@ -0,0 +1,87 @@
+import logging
+import socket
+import time
+import unittest
+from typing import Any
+from typing import cast
+
+from motion_lane import MOTION_DATAGRAM
+from motion_lane import MotionLane
+from motion_lane import MotionSession
+
+
+class MouseService:
+    def __init__(self):
+        self.events = []
+
+    def send_movement(self, x, y):
+        self.events.append(('move', x, y))
+
+    def send_scroll(self, vertical, horizontal):
+        self.events.append(('scroll', vertical, horizontal))
+
+
+class MotionSessionTest(unittest.TestCase):
+    def test_only_newer_sequence_numbers_are_accepted(self):
+        session = MotionSession('peer')
+
+        self.assertTrue(session.accept(1))
+        self.assertTrue(session.accept(3))
+        self.assertFalse(session.accept(2))
+        self.assertFalse(session.accept(3))
+
+    def test_first_datagram_is_accepted_whatever_its_number(self):
+        for first in (0, 0x80000000, 0xFFFFFFFF):
+            session = MotionSession('peer')
+
+            self.assertTrue(session.accept(first))
+            self.assertFalse(session.accept(first))
+
+    def test_sequence_numbers_wrap_around(self):
+        session = MotionSession('peer')
+        session.last_seq = 0xFFFFFFFF
+
+        self.assertTrue(session.accept(0))
+        self.assertFalse(session.accept(0xFFFFFFFF))
+
+
+class MotionLaneTest(unittest.TestCase):
+    def setUp(self):
+        self.mouse = MouseService()
+        self.lane = MotionLane(
+            '127.0.0.1', 0, cast(Any, self.mouse), logging.getLogger(__name__)
+        )
+        self.token = self.lane.open_session('peer')
+
+    def test_datagram_moves_and_scrolls(self):
+        self.lane.handle_datagram(MOTION_DATAGRAM.pack(self.token, 1, 5, -3, 1, 0))
+
+        self.assertEqual(self.mouse.events, [('move', 5, -3), ('scroll', 1, 0)])
+
+    def test_stale_and_unknown_datagrams_are_dropped(self):
+        self.lane.handle_datagram(MOTION_DATAGRAM.pack(self.token, 2, 1, 1, 0, 0))
+        self.lane.handle_datagram(MOTION_DATAGRAM.pack(self.token, 1, 1, 1, 0, 0))
+        self.lane.handle_datagram(MOTION_DATAGRAM.pack(b'\0' * 8, 3, 1, 1, 0, 0))
+        self.lane.handle_datagram(b'short')
+
+        self.assertEqual(len(self.mouse.events), 2)
+        self.assertEqual(self.lane.dropped, 3)
+
+    def test_datagrams_are_received_over_udp(self):
+        self.lane.start()
+        self.addCleanup(self.lane.close)
+
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(
+                MOTION_DATAGRAM.pack(self.token, 1, 7, 0, 0, 0),
+                ('127.0.0.1', self.lane.port),
+            )
+            deadline = time.monotonic() + 1
+            while not self.mouse.events and time.monotonic() < deadline:
+                time.sleep(0.001)
+
+        self.assertEqual(self.mouse.events[0], ('move', 7, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
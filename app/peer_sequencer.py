@@ -0,0 +1,164 @@
+import heapq
+import threading
+import time
+from typing import Callable
+from typing import TypeVar
+
+import grpc
+
+T = TypeVar('T')
+
+# Unary RPCs whose effects depend on the order they are processed in.
+SEQUENCED_METHODS = frozenset(
+    f'/InputMethods/{name}'
+    for name in (
+        'PressKey',
+        'PressHotkey',
+        'PressMouseKey',
+        'MoveMouse',
+        'MoveMouseAbsolute',
+        'SendEvents',
+    )
+)
+
+# How long a call waits for calls that arrived before it to reach a worker
+# thread while no other call does. Only runs out if one of them was rejected
+# or cancelled before its handler ran.
+REGISTRATION_TIMEOUT_S = 0.1
+
+
+class PeerSequencer:
+    """Runs calls from the same peer one at a time, in the order they arrived.
+
+    Each call takes a ticket when it arrives (see
+    `PeerSequencingInterceptor`) and hands its handler to `run` once a worker
+    thread picks it up. Worker threads can start in any order, so `run` first
+    waits for every earlier ticket to show up and tell which peer it belongs
+    to, then for the earlier calls of its own peer to finish. Calls of
+    different peers never wait on each other's handlers.
+    """
+
+    _next_ticket: int
+    _low: int
+    _seen: set[int]
+    _pending: dict[str, list[int]]
+    _busy: set[str]
+
+    def __init__(self, registration_timeout: float = REGISTRATION_TIMEOUT_S):
+        self._registration_timeout = registration_timeout
+        self._cond = threading.Condition(threading.Lock())
+        self._next_ticket = 0
+        # Every ticket below `_low` has been registered or given up on;
+        # `_seen` holds the registered tickets above it.
+        self._low = 0
+        self._seen = set()
+        self._registered = 0
+        self._pending = {}
+        self._busy = set()
+        self.abandoned = 0
+
+    def ticket(self) -> int:
+        """Takes the next ticket. Must be called in arrival order."""
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            return ticket
+
+    def _advance(self):
+        seen = self._seen
+        low = self._low
+        while low in seen:
+            seen.remove(low)
+            low += 1
+        if low != self._low:
+            self._low = low
+            self._cond.notify_all()
+
+    def _register(self, ticket: int):
+        self._registered += 1
+        self._cond.notify_all()
+        if ticket >= self._low:
+            self._seen.add(ticket)
+            self._advance()
+
+    def _wait_for_earlier_tickets(self, ticket: int):
+        # The timeout restarts whenever another call registers: on a busy
+        # host worker threads can take a while to get scheduled, but a
+        # missing ticket stops registrations once every worker waits on it.
+        registered = self._registered
+        deadline = time.monotonic() + self._registration_timeout
+        while self._low < ticket:
+            if self._registered != registered:
+                registered = self._registered
+                deadline = time.monotonic() + self._registration_timeout
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Give up on the tickets that never turned up. Should one
+                # still register, it is ordered against whatever is pending
+                # for its peer at that point.
+                self.abandoned += sum(
+                    1 for t in range(self._low, ticket) if t not in self._seen
+                )
+                self._seen = {t for t in self._seen if t >= ticket}
+                self._low = ticket
+                self._advance()
+                return
+            self._cond.wait(remaining)
+
+    def run(self, peer: str, ticket: int, fn: Callable[[], T]) -> T:
+        """Runs `fn` once every earlier call from `peer` has completed."""
+        cond = self._cond
+        with cond:
+            self._register(ticket)
+            pending = self._pending.setdefault(peer, [])
+            heapq.heappush(pending, ticket)
+
+            self._wait_for_earlier_tickets(ticket)
+            cond.wait_for(lambda: peer not in self._busy and pending[0] == ticket)
+            heapq.heappop(pending)
+            self._busy.add(peer)
+
+        try:
+            return fn()
+        finally:
+            with cond:
+                self._busy.discard(peer)
+                if not pending:
+                    del self._pending[peer]
+                cond.notify_all()
+
+
+class PeerSequencingInterceptor(grpc.ServerInterceptor):
+    """Routes the unary `methods` through a `PeerSequencer`.
+
+    gRPC calls interceptors on the thread that accepts calls, before handing
+    them to the worker pool, so this is where the arrival order is known.
+    """
+
+    def __init__(
+        self, sequencer: PeerSequencer, methods: frozenset[str] = SEQUENCED_METHODS
+    ):
+        self._sequencer = sequencer
+        self._methods = methods
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if (
+            handler is None
+            or handler.unary_unary is None
+            or handler_call_details.method not in self._methods
+        ):
+            return handler
+
+        sequencer = self._sequencer
+        ticket = sequencer.ticket()
+        behavior = handler.unary_unary
+
+        def sequenced(request, context):
+            return sequencer.run(context.peer(), ticket, lambda: behavior(request, context))
+
+        return grpc.unary_unary_rpc_method_handler(
+            sequenced,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
@@ -0,0 +1,137 @@
+import logging
+import os
+import string
+import struct
+import tempfile
+import threading
+import unittest
+from concurrent import futures
+from typing import Any
+from typing import cast
+
+import grpc
+
+import input_pb2
+import input_pb2_grpc
+import input_service
+from input_service import HidKeyboardService
+from input_service import InputService
+from key import Key
+from key_utils import key_to_keycode
+from peer_sequencer import PeerSequencer
+from peer_sequencer import PeerSequencingInterceptor
+from server import InputMethodsService
+
+
+class PeerSequencerTest(unittest.TestCase):
+    def _start(self, sequencer, peer, ticket, fn):
+        thread = threading.Thread(target=sequencer.run, args=(peer, ticket, fn))
+        thread.start()
+        self.addCleanup(thread.join)
+        return thread
+
+    def test_calls_of_one_peer_run_in_ticket_order(self):
+        sequencer = PeerSequencer(registration_timeout=1)
+        tickets = [sequencer.ticket() for _ in range(20)]
+        ran = []
+
+        # Start the handlers in reverse, as the worker pool might.
+        threads = [
+            self._start(sequencer, 'a', t, lambda t=t: ran.append(t))
+            for t in reversed(tickets)
+        ]
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(ran, tickets)
+
+    def test_peers_do_not_wait_for_each_other(self):
+        sequencer = PeerSequencer(registration_timeout=1)
+        slow, fast = sequencer.ticket(), sequencer.ticket()
+        release = threading.Event()
+        done = threading.Event()
+
+        self._start(sequencer, 'a', slow, release.wait)
+        self._start(sequencer, 'b', fast, done.set)
+
+        self.assertTrue(done.wait(timeout=1))
+        release.set()
+
+    def test_tickets_that_never_run_are_skipped(self):
+        sequencer = PeerSequencer(registration_timeout=0.01)
+        sequencer.ticket()  # Rejected before its handler ran.
+        ticket = sequencer.ticket()
+
+        self.assertEqual(sequencer.run('a', ticket, lambda: 'ok'), 'ok')
+        self.assertEqual(sequencer.abandoned, 1)
+
+
+class Config:
+    key_press_interval = 0
+
+
+class SequencedPressKeyStressTest(unittest.TestCase):
+    """Fires a burst of concurrent PressKey calls from one client."""
+
+    CALLS = 200
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.keyboard_path = os.path.join(tmp.name, 'hidg0')
+        keyboard = HidKeyboardService(
+            self.keyboard_path,
+            os.path.join(tmp.name, 'hidg2'),
+            logging.getLogger(__name__),
+        )
+        service = InputService(
+            keyboard, cast(Any, None), cast(Any, Config()), logging.getLogger(__name__)
+        )
+
+        self.server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=10),
+            interceptors=(PeerSequencingInterceptor(PeerSequencer()),),
+        )
+        input_pb2_grpc.add_InputMethodsServicer_to_server(
+            InputMethodsService(
+                config_service=cast(Any, Config()),
+                input_service=service,
+                logger=logging.getLogger(__name__),
+            ),
+            self.server,
+        )
+        port = self.server.add_insecure_port('127.0.0.1:0')
+        self.server.start()
+        self.addCleanup(self.server.stop, None)
+
+        self.channel = grpc.insecure_channel(f'127.0.0.1:{port}')
+        self.addCleanup(self.channel.close)
+        grpc.channel_ready_future(self.channel).result(timeout=5)
+
+    def test_reports_follow_call_order(self):
+        stub = input_pb2_grpc.InputMethodsStub(self.channel)
+        letters = string.ascii_uppercase
+        keys = [Key[f'KEY_{letters[i % 26]}'] for i in range(self.CALLS // 2)]
+
+        calls = []
+        for key in keys:
+            for action in (input_pb2.DOWN, input_pb2.UP):
+                calls.append(
+                    stub.PressKey.future(input_pb2.Key(id=key.value, type=action))
+                )
+        for call in calls:
+            call.result(timeout=10)
+        input_service.flush_hid_writes(timeout=5)
+
+        with open(self.keyboard_path, 'rb') as f:
+            reports = [r[2:] for r in struct.iter_unpack('<BB6B', f.read())]
+        expected = []
+        for key in keys:
+            expected.append((key_to_keycode(key), 0, 0, 0, 0, 0))
+            expected.append((0, 0, 0, 0, 0, 0))
+        # The first report is the release InputService sends on start-up.
+        self.assertEqual(reports[1:], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
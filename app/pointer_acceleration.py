@@ -0,0 +1,105 @@
+import math
+import time
+from typing import Optional
+
+# Pointer velocity, in input units per millisecond, up to which motion is never
+# scaled. Slow, precise movements behave the same with any acceleration.
+PRECISION_VELOCITY = 0.5
+
+# The lookup table covers velocities from 0 to LUT_SIZE / LUT_RESOLUTION units
+# per millisecond; anything faster uses the last entry.
+LUT_RESOLUTION = 32
+LUT_SIZE = 256
+
+GAIN_MIN = 0.25
+GAIN_MAX = 4.0
+
+# Events further apart than this start a new movement rather than being used
+# to measure velocity. The lower bound keeps events that arrive in a burst
+# from looking impossibly fast.
+_MAX_INTERVAL_NS = 100_000_000
+_MIN_INTERVAL_NS = 1_000_000
+
+
+def build_gain_table(acceleration: float) -> tuple[float, ...]:
+    """Samples the acceleration curve for every velocity bucket.
+
+    Above `PRECISION_VELOCITY` the gain follows `(v / PRECISION_VELOCITY) **
+    (acceleration - 1)`, so 1.0 is a flat curve, larger values speed up fast
+    movements and smaller ones slow them down.
+    """
+    exponent = acceleration - 1
+    table = []
+    for i in range(LUT_SIZE):
+        # Middle of the bucket, so the table does not systematically under- or
+        # overestimate the gain.
+        velocity = (i + 0.5) / LUT_RESOLUTION
+        if velocity <= PRECISION_VELOCITY:
+            table.append(1.0)
+        else:
+            gain = (velocity / PRECISION_VELOCITY) ** exponent
+            table.append(max(GAIN_MIN, min(GAIN_MAX, gain)))
+    return tuple(table)
+
+
+class PointerAcceleration:
+    """Scales relative pointer motion by how fast the pointer is moving.
+
+    Velocity is measured from the time between consecutive movements, and the
+    gain for it is read from a table built for the current acceleration. The
+    table is only rebuilt when the acceleration changes, so the cost per
+    movement does not depend on the curve.
+
+    Not thread-safe; callers serialize access.
+    """
+
+    _acceleration: float
+    _table: tuple[float, ...]
+    _last_ns: Optional[int]
+    _velocity: float
+
+    def __init__(self, acceleration: float = 1.0):
+        self._acceleration = acceleration
+        self._table = build_gain_table(acceleration)
+        self._last_ns = None
+        self._velocity = 0.0
+        self.rebuilds = 0
+
+    @property
+    def acceleration(self) -> float:
+        return self._acceleration
+
+    def configure(self, acceleration: float):
+        """Switches to the curve for `acceleration` if it changed."""
+        if acceleration != self._acceleration:
+            self._table = build_gain_table(acceleration)
+            self._acceleration = acceleration
+            self.rebuilds += 1
+
+    def gain(
+        self, delta_x: float, delta_y: float, timestamp_ns: Optional[int] = None
+    ) -> float:
+        """Returns the factor to scale a movement of (delta_x, delta_y) by.
+
+        Args:
+            delta_x: Horizontal movement, in input units.
+            delta_y: Vertical movement, in input units.
+            timestamp_ns: `time.monotonic_ns()` at which the movement happened.
+                Defaults to now.
+        """
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+
+        last_ns, self._last_ns = self._last_ns, timestamp_ns
+        interval_ns = _MAX_INTERVAL_NS if last_ns is None else timestamp_ns - last_ns
+        if interval_ns >= _MAX_INTERVAL_NS:
+            # First movement after a pause: no velocity to go by yet.
+            self._velocity = 0.0
+            return self._table[0]
+
+        interval_ns = max(interval_ns, _MIN_INTERVAL_NS)
+        velocity = math.hypot(delta_x, delta_y) * 1_000_000 / interval_ns
+        # Average with the previous sample to smooth out jittery event timing.
+        self._velocity = velocity = (velocity + self._velocity) / 2
+
+        return self._table[min(int(velocity * LUT_RESOLUTION), LUT_SIZE - 1)]
@@ -0,0 +1,52 @@
+import unittest
+
+from pointer_acceleration import GAIN_MAX
+from pointer_acceleration import PointerAcceleration
+from pointer_acceleration import build_gain_table
+
+_MS = 1_000_000
+
+
+class PointerAccelerationTest(unittest.TestCase):
+    def _gains(self, acceleration, delta, interval_ms=10, events=5):
+        accel = PointerAcceleration(acceleration)
+        return [accel.gain(delta, 0, i * interval_ms * _MS) for i in range(events)]
+
+    def test_default_acceleration_is_flat(self):
+        self.assertEqual(set(build_gain_table(1.0)), {1.0})
+        self.assertEqual(set(self._gains(1.0, 200)), {1.0})
+
+    def test_slow_movements_are_never_scaled(self):
+        self.assertEqual(set(self._gains(2.0, 2)), {1.0})
+        self.assertEqual(set(self._gains(0.0, 2)), {1.0})
+
+    def test_fast_movements_are_scaled_by_the_curve(self):
+        # 20 units every 10ms is 2 units/ms, four times the precision velocity.
+        *_, fast = self._gains(2.0, 20, events=20)
+        *_, damped = self._gains(0.5, 20, events=20)
+
+        self.assertAlmostEqual(fast, 4.0, delta=0.1)
+        self.assertAlmostEqual(damped, 0.5, delta=0.05)
+
+    def test_gain_is_capped(self):
+        *_, gain = self._gains(2.0, 10_000)
+        self.assertEqual(gain, GAIN_MAX)
+
+    def test_first_movement_after_a_pause_is_not_accelerated(self):
+        accel = PointerAcceleration(2.0)
+        accel.gain(50, 0, 0)
+        self.assertGreater(accel.gain(50, 0, 10 * _MS), 1.0)
+        self.assertEqual(accel.gain(50, 0, 500 * _MS), 1.0)
+
+    def test_table_is_only_rebuilt_when_acceleration_changes(self):
+        accel = PointerAcceleration(1.0)
+        accel.configure(1.0)
+        accel.configure(1.5)
+        accel.configure(1.5)
+
+        self.assertEqual(accel.rebuilds, 1)
+        self.assertEqual(accel.acceleration, 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
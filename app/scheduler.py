@@ -0,0 +1,215 @@
+import asyncio
+import collections
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+
+from timing import spin_ns
+from timing import spin_until_ns
+
+# Steps of an input action: a generator that sends reports and yields how many
+# seconds to wait before its next step.
+Steps = Iterator[float]
+
+
+class ScheduledCall:
+    __slots__ = ('when_ns', 'fn', 'cancelled')
+
+    def __init__(self, when_ns: int, fn: Callable[[], None]):
+        self.when_ns = when_ns
+        self.fn = fn
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    """Runs delayed callbacks from a single thread.
+
+    Callbacks are kept in a heap ordered by deadline; ones due at the same
+    time run in the order they were scheduled. They must be short, as they
+    delay everything scheduled after them. The thread is started by the first
+    `call_later`.
+    """
+
+    _logger: logging.Logger
+    _heap: list[tuple[int, int, ScheduledCall]]
+
+    def __init__(self, logger: logging.Logger):
+        self._logger = logger
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition(threading.Lock())
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def call_later(self, delay: float, fn: Callable[[], None]) -> ScheduledCall:
+        """Runs `fn` on the scheduler thread `delay` seconds from now."""
+        call = ScheduledCall(time.monotonic_ns() + int(delay * 1e9), fn)
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='scheduler', daemon=True
+                )
+                self._thread.start()
+            heapq.heappush(self._heap, (call.when_ns, next(self._counter), call))
+            if self._heap[0][2] is call:
+                self._cond.notify()
+        return call
+
+    def _run(self):
+        cond = self._cond
+        heap = self._heap
+
+        while True:
+            with cond:
+                while True:
+                    if self._closed:
+                        return
+                    if heap:
+                        # Wake up early and spin the rest of the way, as the
+                        # wait can oversleep by several milliseconds.
+                        timeout_ns = heap[0][0] - time.monotonic_ns() - spin_ns()
+                        if timeout_ns <= 0:
+                            break
+                        cond.wait(timeout_ns / 1e9)
+                    else:
+                        cond.wait()
+                when_ns = heap[0][0]
+                call = heapq.heappop(heap)[2] if when_ns <= time.monotonic_ns() else None
+
+            if call is None:
+                spin_until_ns(when_ns)
+                continue
+            if call.cancelled:
+                continue
+            try:
+                call.fn()
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception('Scheduled call failed')
+
+    def close(self, timeout: Optional[float] = None):
+        """Stops the scheduler thread. Calls that are not due yet never run."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+class Lane:
+    """Runs the steps of input actions one action after another.
+
+    The first step of an action runs in the submitting thread if the lane is
+    idle, so the caller only returns after the first report was queued, and
+    an exception it raises reaches the caller. Later steps run on the
+    scheduler thread, where failures are only logged. Actions submitted while
+    another one is still waiting are queued behind it, so reports on a lane
+    always come out in submission order.
+    """
+
+    name: str
+    _logger: logging.Logger
+    _scheduler: Scheduler
+    _queue: collections.deque[Steps]
+
+    def __init__(self, name: str, scheduler: Scheduler, logger: logging.Logger):
+        self.name = name
+        self._scheduler = scheduler
+        self._logger = logger
+        self._queue = collections.deque()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._running = False
+
+    def submit(self, steps: Steps):
+        with self._lock:
+            self._queue.append(steps)
+            if self._running:
+                return
+            self._running = True
+
+        try:
+            delay = next(steps)
+        except StopIteration:
+            delay = None
+        except Exception:
+            self._next_action()
+            raise
+
+        if delay is None:
+            self._next_action()
+        else:
+            self._scheduler.call_later(delay, self._advance)
+
+    def _next_action(self):
+        with self._lock:
+            self._queue.popleft()
+        self._advance()
+
+    def _advance(self):
+        queue = self._queue
+        while True:
+            with self._lock:
+                if not queue:
+                    self._running = False
+                    self._idle.notify_all()
+                    return
+                steps = queue[0]
+
+            try:
+                delay = next(steps)
+            except StopIteration:
+                delay = None
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception('Input action on %s lane failed', self.name)
+                delay = None
+
+            if delay is None:
+                with self._lock:
+                    queue.popleft()
+                continue
+
+            self._scheduler.call_later(delay, self._advance)
+            return
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every submitted action has finished.
+
+        Returns:
+            False if `timeout` expired first.
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._running, timeout)
+
+
+class AsyncLane:
+    """`Lane` for asyncio callers.
+
+    `run` waits for the actions submitted before it, then steps through the
+    action on the event loop and returns once it has finished. Unlike `Lane`,
+    a failing action raises in the caller.
+    """
+
+    name: str
+
+    def __init__(self, name: str):
+        self.name = name
+        # Waiters acquire it in the order they started waiting.
+        self._lock = asyncio.Lock()
+
+    async def run(self, steps: Steps):
+        async with self._lock:
+            try:
+                for delay in steps:
+                    await asyncio.sleep(delay)
+            finally:
+                # Lets the action clean up if the caller was cancelled.
+                steps.close()
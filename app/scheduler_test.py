@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import threading
+import unittest
+
+from scheduler import AsyncLane
+from scheduler import Lane
+from scheduler import Scheduler
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = Scheduler(logging.getLogger(__name__))
+        self.addCleanup(self.scheduler.close, 1)
+
+    def test_calls_run_in_deadline_order(self):
+        ran = []
+        done = threading.Event()
+
+        self.scheduler.call_later(0.03, lambda: (ran.append('late'), done.set()))
+        self.scheduler.call_later(0.01, lambda: ran.append('early'))
+        self.scheduler.call_later(0.01, lambda: ran.append('early, second'))
+
+        self.assertTrue(done.wait(timeout=1))
+        self.assertEqual(ran, ['early', 'early, second', 'late'])
+
+    def test_cancelled_calls_do_not_run(self):
+        ran = []
+        done = threading.Event()
+
+        self.scheduler.call_later(0.01, lambda: ran.append('cancelled')).cancel()
+        self.scheduler.call_later(0.02, done.set)
+
+        self.assertTrue(done.wait(timeout=1))
+        self.assertEqual(ran, [])
+
+    def test_failing_call_does_not_stop_the_thread(self):
+        done = threading.Event()
+
+        self.scheduler.call_later(0, lambda: 1 / 0)
+        self.scheduler.call_later(0, done.set)
+
+        self.assertTrue(done.wait(timeout=1))
+
+
+class LaneTest(unittest.TestCase):
+    def setUp(self):
+        scheduler = Scheduler(logging.getLogger(__name__))
+        self.addCleanup(scheduler.close, 1)
+        self.lane = Lane('test', scheduler, logging.getLogger(__name__))
+        self.sent = []
+
+    def _press(self, name, hold=0.02):
+        self.sent.append(f'{name} down')
+        yield hold
+        self.sent.append(f'{name} up')
+
+    def test_submit_returns_after_the_first_step(self):
+        self.lane.submit(self._press('a', hold=10))
+
+        self.assertEqual(self.sent, ['a down'])
+
+    def test_actions_run_one_after_another(self):
+        self.lane.submit(self._press('a'))
+        self.lane.submit(self._press('b'))
+
+        self.assertTrue(self.lane.wait_idle(timeout=1))
+        self.assertEqual(self.sent, ['a down', 'a up', 'b down', 'b up'])
+
+    def test_failing_action_does_not_block_the_lane(self):
+        def failing():
+            yield 0
+            raise ValueError('failed')
+
+        self.lane.submit(failing())
+        self.lane.submit(self._press('a'))
+
+        self.assertTrue(self.lane.wait_idle(timeout=1))
+        self.assertEqual(self.sent, ['a down', 'a up'])
+
+    def test_first_step_failure_reaches_the_caller(self):
+        def failing():
+            raise ValueError('failed')
+            yield 0  # pylint: disable=unreachable
+
+        with self.assertRaises(ValueError):
+            self.lane.submit(failing())
+        self.lane.submit(self._press('a'))
+
+        self.assertTrue(self.lane.wait_idle(timeout=1))
+        self.assertEqual(self.sent, ['a down', 'a up'])
+
+
+class AsyncLaneTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.lane = AsyncLane('test')
+        self.sent = []
+
+    def _press(self, name, hold=0.02):
+        self.sent.append(f'{name} down')
+        yield hold
+        self.sent.append(f'{name} up')
+
+    async def test_actions_run_one_after_another(self):
+        await asyncio.gather(
+            self.lane.run(self._press('a')), self.lane.run(self._press('b'))
+        )
+
+        self.assertEqual(self.sent, ['a down', 'a up', 'b down', 'b up'])
+
+    async def test_failing_action_does_not_block_the_lane(self):
+        def failing():
+            yield 0
+            raise ValueError('failed')
+
+        with self.assertRaises(ValueError):
+            await self.lane.run(failing())
+        await self.lane.run(self._press('a'))
+
+        self.assertEqual(self.sent, ['a down', 'a up'])
+
+
+if __name__ == '__main__':
+    unittest.main()
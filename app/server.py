@@ -1,5 +1,10 @@
 import logging
+import queue
+import threading
 from concurrent import futures
+from typing import Iterator
+from typing import Optional
+from typing import Union
 
 import grpc
 
@@ -7,19 +12,31 @@ import input_pb2
 import input_pb2_grpc
 from button import Button
 from config_service import ConfigService
-from hotkey_parser import parse_hotkey
+from hotkey_parser import compile_hotkey
 from input_service import InputService
+from input_service import hid_latency
+from input_stream import InputStreamSession
+from input_stream import replay_batch
+from input_stream import validate_batch
 from key import ButtonActionType
 from key import HotkeyOptions
 from key import Key
 from key import KeyActionType
 from key import KeyOptions
+from latency_stats import BUCKET_BOUNDS_US
+from latency_stats import RpcLatencyStats
+from latency_stats import histograms_to_pb
+from motion_lane import MotionLane
+from text_to_hid import UnsupportedCharacterError
+from text_to_hid import encode_typing
 
 
 class InputMethodsService(input_pb2_grpc.InputMethodsServicer):
     _logger: logging.Logger
     config_svc: ConfigService
     input_svc: InputService
+    motion_lane: Optional[MotionLane]
+    rpc_latency: Optional[RpcLatencyStats]
     thread_pool: futures.ThreadPoolExecutor
 
     def __init__(
@@ -27,10 +44,14 @@ class InputMethodsService(input_pb2_grpc.InputMethodsServicer):
         config_service: ConfigService,
         input_service: InputService,
         logger: logging.Logger,
+        motion_lane: Optional[MotionLane] = None,
+        rpc_latency: Optional[RpcLatencyStats] = None,
     ):
         self._logger = logger
         self.config_svc = config_service
         self.input_svc = input_service
+        self.motion_lane = motion_lane
+        self.rpc_latency = rpc_latency
         self.thread_pool = futures.ThreadPoolExecutor(max_workers=10)
 
     def PressKey(
@@ -64,9 +85,9 @@ class InputMethodsService(input_pb2_grpc.InputMethodsServicer):
             f'Processing hotkey: {hotkey_str} with action {request_type.name}'
         )
 
-        hotkey_steps = parse_hotkey(hotkey_str)
-        
-        self.input_svc.press_hotkey(hotkey_steps, request_type, options)
+        hotkey = compile_hotkey(hotkey_str)
+
+        self.input_svc.press_hotkey(hotkey, request_type, options)
 
         return input_pb2.Response(message='Ok')
 
@@ -91,9 +112,127 @@ class InputMethodsService(input_pb2_grpc.InputMethodsServicer):
 
         return input_pb2.Response(message='Ok')
 
+    def MoveMouseAbsolute(
+        self,
+        request: input_pb2.MouseMoveAbsolute,
+        context: grpc.ServicerContext,
+    ) -> input_pb2.Response:
+        x = max(0.0, min(1.0, request.x))
+        y = max(0.0, min(1.0, request.y))
+        self.input_svc.move_mouse_absolute(x, y)
+
+        return input_pb2.Response(message='Ok')
+
     def Ping(self, _, __) -> input_pb2.Response:
         return input_pb2.Response(message='Ok')
 
+    def dispatch_event(
+        self,
+        event: Union[input_pb2.InputEvent, input_pb2.TimedInputEvent],
+        context: Optional[grpc.ServicerContext],
+    ):
+        """Handles the event set on `event` like the matching unary call."""
+        kind = event.WhichOneof('event')
+        if kind == 'key':
+            self.PressKey(event.key, context)
+        elif kind == 'hotkey':
+            self.PressHotkey(event.hotkey, context)
+        elif kind == 'mouse_key':
+            self.PressMouseKey(event.mouse_key, context)
+        elif kind == 'mouse_move':
+            self.MoveMouse(event.mouse_move, context)
+        elif kind == 'mouse_move_absolute':
+            self.MoveMouseAbsolute(event.mouse_move_absolute, context)
+        else:
+            raise ValueError('Input event has no event set')
+
+    def InputStream(
+        self,
+        request_iterator: Iterator[input_pb2.InputEvent],
+        context: grpc.ServicerContext,
+    ) -> Iterator[input_pb2.InputAck]:
+        session = InputStreamSession(
+            lambda event: self.dispatch_event(event, context), self._logger
+        )
+        context.add_callback(session.close)
+
+        threading.Thread(
+            target=session.consume,
+            args=(request_iterator,),
+            name=f'input-stream:{context.peer()}',
+            daemon=True,
+        ).start()
+
+        yield from session.acks()
+
+    def SendEvents(
+        self,
+        request: input_pb2.EventBatch,
+        context: grpc.ServicerContext,
+    ) -> input_pb2.Response:
+        try:
+            validate_batch(request.events)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        replay_batch(
+            request.events, lambda event: self.dispatch_event(event, context)
+        )
+
+        return input_pb2.Response(message='Ok')
+
+    def OpenMotionLane(
+        self,
+        request: input_pb2.Empty,
+        context: grpc.ServicerContext,
+    ) -> input_pb2.MotionLaneSession:
+        if self.motion_lane is None:
+            context.abort(
+                grpc.StatusCode.FAILED_PRECONDITION, 'The UDP motion lane is disabled'
+            )
+
+        return input_pb2.MotionLaneSession(
+            port=self.motion_lane.port,
+            token=self.motion_lane.open_session(context.peer()),
+        )
+
+    def TypeText(
+        self,
+        request: input_pb2.TypeTextRequest,
+        context: grpc.ServicerContext,
+    ) -> Iterator[input_pb2.TypeTextProgress]:
+        total = len(request.text)
+        try:
+            script = encode_typing(request.text, request.layout, request.rollover)
+        except UnsupportedCharacterError as e:
+            yield input_pb2.TypeTextProgress(
+                typed=0, total=total, first_unsupported=e.index
+            )
+            return
+
+        self._logger.info('Typing %d characters (%s)', total, request.layout or 'en-US')
+        interval_ms = request.interval_ms or self.config_svc.key_press_interval
+        progress = queue.SimpleQueue()
+
+        def report(typed: int, done: bool) -> bool:
+            progress.put((typed, done))
+            return context.is_active()
+
+        # Stops waiting for the typist once the client has gone.
+        context.add_callback(lambda: progress.put((0, True)))
+        self.input_svc.type_text(script, interval_ms / 1000, report)
+
+        while True:
+            typed, done = progress.get()
+            if done:
+                break
+            yield input_pb2.TypeTextProgress(typed=typed, total=total)
+
+        if typed < total and context.is_active():
+            context.abort(
+                grpc.StatusCode.INTERNAL, f'Typing stopped after {typed} characters'
+            )
+
     def GetConfig(
         self,
         request: input_pb2.Empty,
@@ -117,3 +256,15 @@ class InputMethodsService(input_pb2_grpc.InputMethodsServicer):
             self.config_svc.set_cursor_acceleration(request.cursor_acceleration)
 
         return self.GetConfig(input_pb2.Empty(), context)
+
+    def GetStats(
+        self,
+        request: input_pb2.StatsRequest,
+        context: grpc.ServicerContext,
+    ) -> input_pb2.Stats:
+        rpc = self.rpc_latency.snapshot(request.reset) if self.rpc_latency else {}
+        return input_pb2.Stats(
+            bucket_bounds_us=BUCKET_BOUNDS_US,
+            rpc=histograms_to_pb(rpc),
+            hid=histograms_to_pb(hid_latency(request.reset)),
+        )
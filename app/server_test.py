@@ -0,0 +1,107 @@
+import logging
+import os
+import struct
+import tempfile
+import unittest
+from concurrent import futures
+from typing import Any
+from typing import cast
+
+import grpc
+
+import input_pb2
+import input_pb2_grpc
+import input_service
+from input_service import HidKeyboardService
+from input_service import InputService
+from server import InputMethodsService
+
+
+class Config:
+    key_press_interval = 0
+
+
+class TypeTextTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.keyboard_path = os.path.join(tmp.name, 'hidg0')
+        service = InputService(
+            HidKeyboardService(
+                self.keyboard_path,
+                os.path.join(tmp.name, 'hidg2'),
+                logging.getLogger(__name__),
+            ),
+            cast(Any, None),
+            cast(Any, Config()),
+            logging.getLogger(__name__),
+        )
+
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        input_pb2_grpc.add_InputMethodsServicer_to_server(
+            InputMethodsService(
+                config_service=cast(Any, Config()),
+                input_service=service,
+                logger=logging.getLogger(__name__),
+            ),
+            self.server,
+        )
+        port = self.server.add_insecure_port('127.0.0.1:0')
+        self.server.start()
+        self.addCleanup(self.server.stop, None)
+
+        channel = grpc.insecure_channel(f'127.0.0.1:{port}')
+        self.addCleanup(channel.close)
+        self.stub = input_pb2_grpc.InputMethodsStub(channel)
+
+    def _reports(self):
+        input_service.flush_hid_writes()
+        with open(self.keyboard_path, 'rb') as f:
+            # Skip the release InputService sends on start-up.
+            return [r[:3] for r in struct.iter_unpack('<BB6B', f.read())][1:]
+
+    def test_types_with_the_layout_and_streams_progress(self):
+        progress = [
+            (p.typed, p.total, p.HasField('first_unsupported'))
+            for p in self.stub.TypeText(
+                input_pb2.TypeTextRequest(text='Hy\r', layout='de-DE', interval_ms=1),
+                timeout=5,
+            )
+        ]
+
+        self.assertEqual(progress, [(1, 3, False), (2, 3, False), (3, 3, False)])
+        shift, key_h, key_z = 0x02, 0x0B, 0x1D  # y sits on the Z key in de-DE
+        self.assertEqual(
+            self._reports(),
+            [(shift, 0, key_h), (0, 0, 0), (0, 0, key_z), (0, 0, 0)],
+        )
+
+    def test_rollover_overlaps_keys_until_one_repeats(self):
+        progress = [
+            p.typed
+            for p in self.stub.TypeText(
+                input_pb2.TypeTextRequest(text='abba', interval_ms=1, rollover=True),
+                timeout=5,
+            )
+        ]
+
+        self.assertEqual(progress, [1, 2, 3, 4])
+        input_service.flush_hid_writes()
+        with open(self.keyboard_path, 'rb') as f:
+            keys = [r[2:4] for r in struct.iter_unpack('<BB6B', f.read())][1:]
+        a, b = 0x04, 0x05
+        self.assertEqual(keys, [(a, 0), (a, b), (0, 0), (b, 0), (b, a), (0, 0)])
+
+    def test_nothing_is_typed_if_a_character_is_unsupported(self):
+        progress = list(
+            self.stub.TypeText(input_pb2.TypeTextRequest(text='ab\x07'), timeout=5)
+        )
+
+        self.assertEqual(len(progress), 1)
+        self.assertEqual(progress[0].first_unsupported, 2)
+        self.assertEqual(progress[0].typed, 0)
+        self.assertEqual(self._reports(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
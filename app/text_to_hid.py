@@ -1,4 +1,8 @@
+import array
+
 from hid import keycodes as hid
+from hid.reports import KEYBOARD_REPORT_RELEASED
+from hid.reports import pack_keyboard_report
 
 
 class Error(Exception):
@@ -6,7 +10,11 @@ class Error(Exception):
 
 
 class UnsupportedCharacterError(Error):
-    pass
+
+    def __init__(self, message, index=None):
+        super().__init__(message)
+        # Position of the character in the text passed to encode.
+        self.index = index
 
 
 # Mappings of characters to codes that are shared among different keyboard
@@ -369,6 +377,57 @@ _DE_CHAR_TO_HID_MAP = _COMMON_CHAR_TO_HID_MAP | {
 }
 
 
+_LANGUAGE_MAPS = {
+    'en-GB': _GB_CHAR_TO_HID_MAP,
+    'en-US': _US_CHAR_TO_HID_MAP,
+    'de-DE': _DE_CHAR_TO_HID_MAP,
+}
+
+# Codepoints below this are looked up in an array, the rest in a dict. Covers
+# ASCII and Latin-1, which is all but a handful of the characters the layouts
+# know.
+_TABLE_SIZE = 0x100
+
+# Packed table values: (modifier << 8) | keycode. No key has keycode 0, so 0
+# marks unsupported characters and _IGNORED the ones mapped to None.
+_UNSUPPORTED = 0
+_IGNORED = 0xFFFF
+
+# Key slots of a boot keyboard report.
+_ROLLOVER_KEYS = 6
+
+
+class _LayoutTable:
+    """A character map compiled for encode."""
+
+    __slots__ = ('table', 'fallback', 'reports')
+
+    def __init__(self, char_map):
+        self.table = array.array('H', bytes(2 * _TABLE_SIZE))
+        self.fallback = {}
+        # Key-down report of each packed value.
+        self.reports = {_IGNORED: None}
+
+        for char, keystroke in char_map.items():
+            if keystroke is None:
+                packed = _IGNORED
+            else:
+                packed = keystroke.modifier << 8 | keystroke.keycode
+                self.reports[packed] = pack_keyboard_report(
+                    keystroke.modifier, (keystroke.keycode, 0, 0, 0, 0, 0))
+
+            if ord(char) < _TABLE_SIZE:
+                self.table[ord(char)] = packed
+            else:
+                self.fallback[ord(char)] = packed
+
+
+_LAYOUT_TABLES = {
+    language: _LayoutTable(char_map)
+    for language, char_map in _LANGUAGE_MAPS.items()
+}
+
+
 def convert(char, language):
     """Converts a language character into a HID Keystroke object.
 
@@ -382,15 +441,8 @@ def convert(char, language):
     Raises:
         UnsupportedCharacterError: If the character is not supported.
     """
-    try:
-        language_map = {
-            'en-GB': _GB_CHAR_TO_HID_MAP,
-            'en-US': _US_CHAR_TO_HID_MAP,
-            'de-DE': _DE_CHAR_TO_HID_MAP,
-        }[language]
-    except KeyError:
-        # Default to en-US if no other language matches.
-        language_map = _US_CHAR_TO_HID_MAP
+    # Default to en-US if no other language matches.
+    language_map = _LANGUAGE_MAPS.get(language, _US_CHAR_TO_HID_MAP)
 
     try:
         hid_keystroke = language_map[char]
@@ -398,3 +450,111 @@ def convert(char, language):
         raise UnsupportedCharacterError(f'Unsupported character {char}') from e
 
     return hid_keystroke
+
+
+def _pack(text, language):
+    """Returns the layout table and the packed value of each character."""
+    layout = _LAYOUT_TABLES.get(language, _LAYOUT_TABLES['en-US'])
+    table, fallback = layout.table, layout.fallback
+
+    packed_values = []
+    for index, char in enumerate(text):
+        code = ord(char)
+        packed = (table[code] if code < _TABLE_SIZE else
+                  fallback.get(code, _UNSUPPORTED))
+        if packed == _UNSUPPORTED:
+            raise UnsupportedCharacterError(
+                f'Unsupported character {char!r} at index {index}', index)
+        packed_values.append(packed)
+    return layout, packed_values
+
+
+def encode(text, language):
+    """Converts a string into the key-down reports of its characters.
+
+    Each character is typed by its key-down report followed by a release
+    report. The reports are shared between calls and must not be modified.
+
+    Args:
+        text: The string to convert.
+        language: An IETF language tag as a string.
+
+    Returns:
+        A list with the key-down report, or None for characters that are
+        ignored, per character of text.
+
+    Raises:
+        UnsupportedCharacterError: If a character is not supported. Its index
+            is the position of the first such character.
+    """
+    layout, packed_values = _pack(text, language)
+    reports = layout.reports
+    return [reports[packed] for packed in packed_values]
+
+
+def _pack_keys(modifier, keys):
+    return pack_keyboard_report(modifier,
+                                tuple(keys) + (0,) * (_ROLLOVER_KEYS - len(keys)))
+
+
+def encode_typing(text, language, rollover=False):
+    """Converts a string into the sequence of reports that types it.
+
+    The reports are meant to be sent one report interval apart. Without
+    rollover every character takes two reports: its key-down report and a
+    release. With rollover, the keys of consecutive characters overlap in the
+    6 key slots, so most characters take one report. A release is only
+    inserted before a key that is already held, or before a character that
+    needs a different modifier. This means shift stays held across a run of
+    shifted characters. Not every target copes with keys overlapping like
+    this.
+
+    Args:
+        text: The string to convert.
+        language: An IETF language tag as a string.
+        rollover: Whether to overlap consecutive keys.
+
+    Returns:
+        A list of (report, typed) tuples. typed is the number of characters
+        of text that are typed once the report was sent. The last report
+        releases every key, and its typed is the length of text.
+
+    Raises:
+        UnsupportedCharacterError: If a character is not supported. Its index
+            is the position of the first such character.
+    """
+    layout, packed_values = _pack(text, language)
+    reports = layout.reports
+
+    script = []
+    held = []
+    modifier = 0
+    typed = 0
+    for packed in packed_values:
+        typed += 1
+        if packed == _IGNORED:
+            continue
+
+        if not rollover:
+            script.append((reports[packed], typed))
+            script.append((KEYBOARD_REPORT_RELEASED, typed))
+            continue
+
+        char_modifier, keycode = packed >> 8, packed & 0xFF
+        if held and (char_modifier != modifier or keycode in held):
+            script.append((_pack_keys(modifier, ()), typed - 1))
+            held = []
+        modifier = char_modifier
+        if len(held) == _ROLLOVER_KEYS:
+            # The oldest key is released in the report that presses the new
+            # one.
+            held.pop(0)
+        held.append(keycode)
+        script.append((_pack_keys(modifier, held), typed))
+
+    if held or (text and not script):
+        script.append((KEYBOARD_REPORT_RELEASED, typed))
+    elif script:
+        # Ignored characters at the end.
+        script[-1] = (script[-1][0], typed)
+    return script
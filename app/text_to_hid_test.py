@@ -43,3 +43,80 @@ class ConvertTextToHidTest(unittest.TestCase):
 
     def test_ignored_character(self):
         self.assertEqual(None, text_to_hid.convert('\r', 'en-US'))
+
+    def test_encode(self):
+        self.assertEqual(
+            [
+                bytes([hid.MODIFIER_LEFT_SHIFT, 0, hid.KEYCODE_H, 0, 0, 0, 0, 0]),
+                bytes([0, 0, hid.KEYCODE_I, 0, 0, 0, 0, 0]),
+                None,
+                bytes([hid.MODIFIER_ALT_GR, 0, hid.KEYCODE_E, 0, 0, 0, 0, 0]),
+            ],
+            text_to_hid.encode('Hi\r€', 'de-DE'),
+        )
+
+    def test_encode_matches_convert(self):
+        for language in ('en-US', 'en-GB', 'de-DE'):
+            for char in map(chr, range(0x3000)):
+                try:
+                    keystroke = text_to_hid.convert(char, language)
+                except text_to_hid.UnsupportedCharacterError:
+                    with self.assertRaises(text_to_hid.UnsupportedCharacterError):
+                        text_to_hid.encode(char, language)
+                    continue
+
+                [report] = text_to_hid.encode(char, language)
+                if keystroke is None:
+                    self.assertIsNone(report)
+                else:
+                    self.assertEqual(
+                        (keystroke.modifier, keystroke.keycode),
+                        (report[0], report[2]),
+                    )
+
+    def test_encode_reports_first_unsupported_character(self):
+        with self.assertRaises(text_to_hid.UnsupportedCharacterError) as raised:
+            text_to_hid.encode('ok\a\a', 'en-US')
+        self.assertEqual(2, raised.exception.index)
+
+    def test_encode_typing_releases_every_character(self):
+        a = bytes([0, 0, hid.KEYCODE_A, 0, 0, 0, 0, 0])
+        released = bytes(8)
+        self.assertEqual(
+            [(a, 1), (released, 1), (a, 2), (released, 3)],
+            text_to_hid.encode_typing('aa\r', 'en-US'),
+        )
+
+    def test_encode_typing_with_rollover(self):
+        shift = hid.MODIFIER_LEFT_SHIFT
+
+        def report(modifier, *keys):
+            return bytes([modifier, 0, *keys] + [0] * (6 - len(keys)))
+
+        self.assertEqual(
+            [
+                (report(shift, hid.KEYCODE_A), 1),
+                (report(shift, hid.KEYCODE_A, hid.KEYCODE_B), 2),
+                (report(shift), 2),  # modifier change
+                (report(0, hid.KEYCODE_C), 3),
+                (report(0), 3),  # repeated key
+                (report(0, hid.KEYCODE_C), 4),
+                (report(0), 4),
+            ],
+            text_to_hid.encode_typing('ABcc', 'en-US', rollover=True),
+        )
+
+    def test_encode_typing_rollover_reuses_the_oldest_slot(self):
+        script = text_to_hid.encode_typing('abcdefg', 'en-US', rollover=True)
+
+        self.assertEqual(8, len(script))
+        self.assertEqual(
+            bytes([0, 0, hid.KEYCODE_B, hid.KEYCODE_C, hid.KEYCODE_D,
+                   hid.KEYCODE_E, hid.KEYCODE_F, hid.KEYCODE_G]),
+            script[6][0],
+        )
+
+    def test_encode_typing_only_ignored_characters(self):
+        self.assertEqual([(bytes(8), 1)],
+                         text_to_hid.encode_typing('\r', 'en-US'))
+        self.assertEqual([], text_to_hid.encode_typing('', 'en-US'))
@@ -0,0 +1,46 @@
+import time
+
+# How long before a deadline waits stop sleeping and spin instead. This is the
+# most CPU time a single wait burns; it should cover the usual oversleep of
+# `time.sleep` on the host.
+DEFAULT_SPIN_US = 1000
+
+_spin_ns = DEFAULT_SPIN_US * 1000
+
+
+def set_spin_budget_us(spin_us: int):
+    """Sets how many microseconds each wait may spin before its deadline."""
+    global _spin_ns
+    if spin_us < 0:
+        raise ValueError('Spin budget must not be negative')
+    _spin_ns = spin_us * 1000
+
+
+def spin_ns() -> int:
+    return _spin_ns
+
+
+def spin_until_ns(deadline_ns: int):
+    """Spins until `time.monotonic_ns()` reaches `deadline_ns`.
+
+    Each round yields the GIL, so other threads keep running while it spins.
+    """
+    while time.monotonic_ns() < deadline_ns:
+        time.sleep(0)
+
+
+def sleep_until_ns(deadline_ns: int):
+    """Sleeps until `time.monotonic_ns()` reaches `deadline_ns`.
+
+    Sleeps until the spin budget before the deadline, then spins for the rest,
+    so the oversleep of `time.sleep` does not delay the wake-up.
+    """
+    remaining_ns = deadline_ns - time.monotonic_ns() - _spin_ns
+    if remaining_ns > 0:
+        time.sleep(remaining_ns / 1e9)
+    spin_until_ns(deadline_ns)
+
+
+def precise_sleep(seconds: float):
+    """`time.sleep` that wakes up within a few microseconds of the delay."""
+    sleep_until_ns(time.monotonic_ns() + int(seconds * 1e9))
@@ -0,0 +1,33 @@
+import time
+import unittest
+
+import timing
+
+
+class TimingTest(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(timing.set_spin_budget_us, timing.spin_ns() // 1000)
+
+    def test_sleep_until_ns_does_not_wake_up_early(self):
+        for spin_us in (0, 1000):
+            timing.set_spin_budget_us(spin_us)
+            deadline_ns = time.monotonic_ns() + 2_000_000
+
+            timing.sleep_until_ns(deadline_ns)
+
+            self.assertGreaterEqual(time.monotonic_ns(), deadline_ns)
+
+    def test_deadline_in_the_past_returns_right_away(self):
+        start = time.monotonic()
+
+        timing.sleep_until_ns(time.monotonic_ns() - 1_000_000)
+
+        self.assertLess(time.monotonic() - start, 0.01)
+
+    def test_negative_spin_budget_is_rejected(self):
+        with self.assertRaises(ValueError):
+            timing.set_spin_budget_us(-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Per-event round-trip latency of the gRPC and Engine.IO front ends.
+
+Both front ends run in this process on top of one `InputService` writing to
+`--path`. "grpc" times unary MoveMouse calls. "engineio" times a MouseMove
+InputEvent sent over a WebSocket until its InputAck arrives; the front end
+acks every event for this, where it normally batches acks.
+
+Run it on the Pi itself to include the cost of its CPU; both clients connect
+over loopback, so network latency is left out.
+
+Example:
+    PYTHONPATH=.:app python3 benchmarks/frontend_latency_benchmark.py --events 2000
+"""
+
+import argparse
+import logging
+import time
+from concurrent import futures
+from typing import Any
+from typing import Callable
+from typing import cast
+
+import grpc
+import simple_websocket
+
+import input_pb2
+import input_pb2_grpc
+from eio_server import EngineIoFrontend
+from input_service import HidKeyboardService
+from input_service import HidMouseService
+from input_service import InputService
+from server import InputMethodsService
+
+
+class Config:
+    cursor_speed = 1.0
+    cursor_acceleration = 1.0
+    key_press_interval = 33
+    hid_write_deadline_ms = 20
+    mouse_late_report_policy = 'drop'
+    mouse_report_profile = 'rel8'
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def measure(send_event: Callable[[int], None], events: int) -> tuple[float, float]:
+    """Returns the p50 and p99 round trip of `send_event`, in us."""
+    for seq in range(1, 51):
+        send_event(seq)
+
+    latencies = []
+    for seq in range(51, events + 51):
+        start_ns = time.perf_counter_ns()
+        send_event(seq)
+        latencies.append((time.perf_counter_ns() - start_ns) / 1000)
+
+    latencies.sort()
+    return _percentile(latencies, 0.5), _percentile(latencies, 0.99)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--path', default='/dev/null', help='HID endpoint to write to')
+    parser.add_argument('--events', type=int, default=1000)
+    args = parser.parse_args()
+
+    logger = logging.getLogger(__name__)
+    config = cast(Any, Config())
+    input_service = InputService(
+        HidKeyboardService(args.path, args.path, logger),
+        HidMouseService(config, args.path, logger),
+        config,
+        logger,
+    )
+    input_methods = InputMethodsService(config, input_service, logger)
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    input_pb2_grpc.add_InputMethodsServicer_to_server(input_methods, server)
+    grpc_port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    channel = grpc.insecure_channel(f'127.0.0.1:{grpc_port}')
+    stub = input_pb2_grpc.InputMethodsStub(channel)
+
+    frontend = EngineIoFrontend(input_methods, logger, ack_every=1)
+    frontend.start('127.0.0.1', 0)
+    ws = simple_websocket.Client.connect(
+        f'ws://127.0.0.1:{frontend.port}/engine.io/?EIO=4&transport=websocket'
+    )
+    ws.receive(timeout=5)  # Engine.IO open packet
+
+    def send_grpc(seq: int):
+        stub.MoveMouse(input_pb2.MouseMove(x=1, y=0))
+
+    def send_engineio(seq: int):
+        event = input_pb2.InputEvent(seq=seq, mouse_move=input_pb2.MouseMove(x=1, y=0))
+        ws.send(event.SerializeToString())
+        while True:
+            message = ws.receive(timeout=5)
+            if isinstance(message, bytes):
+                break
+            if message == '2':
+                ws.send('3')  # Engine.IO ping
+
+    try:
+        print(f'{"front end":>9} {"p50 us":>8} {"p99 us":>8}')
+        for name, send_event in (('grpc', send_grpc), ('engineio', send_engineio)):
+            p50, p99 = measure(send_event, args.events)
+            print(f'{name:>9} {p50:8.1f} {p99:8.1f}')
+    finally:
+        ws.close()
+        frontend.close()
+        channel.close()
+        server.stop(None)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Per-report CPU cost of the mouse write path, before and after the writer.
+
+"before" replays what `send_mouse_event` used to do for every report: hand the
+write to the `execute` thread pool, wait up to 5ms for it, and open, write and
+close the endpoint under a global lock. "after" queues the report on a
+`HidWriter` backed by the persistent handle registry.
+
+CPU time is process time across all threads, so thread handoffs are included.
+
+Example:
+    PYTHONPATH=app python3 benchmarks/hid_write_benchmark.py --reports 20000
+"""
+
+import argparse
+import logging
+import multiprocessing
+import time
+
+import execute
+from hid_handles import HidHandleRegistry
+from hid_writer import HidWriter
+
+REPORT = bytes((0, 3, 0xFD, 0, 0))
+
+_legacy_lock = multiprocessing.Lock()
+
+
+def _legacy_write(hid_path: str, buffer: bytes):
+    with _legacy_lock:
+        with open(hid_path, 'ab+') as hid_handle:
+            hid_handle.write(bytearray(buffer))
+
+
+def bench_before(hid_path: str, reports: int) -> float:
+    execute.with_timeout_t(_legacy_write, args=(hid_path, REPORT), timeout_in_seconds=1)
+
+    start = time.process_time()
+    for _ in range(reports):
+        try:
+            execute.with_timeout_t(
+                _legacy_write, args=(hid_path, REPORT), timeout_in_seconds=0.005
+            )
+        except TimeoutError:
+            pass
+    execute.t_pool.shutdown(wait=True)
+    return time.process_time() - start
+
+
+def bench_after(hid_path: str, reports: int) -> float:
+    logger = logging.getLogger(__name__)
+    handles = HidHandleRegistry(logger)
+    writer = HidWriter(hid_path, handles, logger)
+    writer.submit(REPORT)
+    writer.flush()
+
+    start = time.process_time()
+    for _ in range(reports):
+        writer.submit(REPORT)
+    writer.flush()
+    elapsed = time.process_time() - start
+
+    writer.close()
+    handles.close()
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--path', default='/dev/null', help='HID endpoint to write to')
+    parser.add_argument('--reports', type=int, default=10000)
+    args = parser.parse_args()
+
+    after = bench_after(args.path, args.reports)
+    before = bench_before(args.path, args.reports)
+
+    for name, elapsed in (('before', before), ('after', after)):
+        print(f'{name:>6}: {elapsed / args.reports * 1e6:8.1f} us CPU/report')
+    print(f'speedup: {before / after:.1f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
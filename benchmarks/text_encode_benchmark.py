@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Time to turn a paste into keyboard reports, per character and in bulk.
+
+"convert" calls `text_to_hid.convert` for every character and packs the
+report from the returned Keystroke. "encode" is `text_to_hid.encode`, which
+looks characters up in the tables compiled at import.
+
+It also prints how many reports `text_to_hid.encode_typing` needs per
+character with and without rollover. Typing speed is bound by that number
+times the report interval.
+
+Example:
+    PYTHONPATH=.:app python3 benchmarks/text_encode_benchmark.py --size 10000
+"""
+
+import argparse
+import string
+import time
+
+import text_to_hid
+from hid.reports import pack_keyboard_report
+
+
+def _convert(text: str, layout: str) -> list:
+    reports = []
+    for char in text:
+        keystroke = text_to_hid.convert(char, layout)
+        reports.append(
+            None
+            if keystroke is None
+            else pack_keyboard_report(
+                keystroke.modifier, (keystroke.keycode, 0, 0, 0, 0, 0)
+            )
+        )
+    return reports
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=10_000, help='characters')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--layout', default='en-US')
+    args = parser.parse_args()
+
+    alphabet = string.ascii_letters + string.digits + ' .,;:!?\n'
+    text = (alphabet * (args.size // len(alphabet) + 1))[: args.size]
+
+    print(f'{"method":>8} {"ms":>8} {"ns/char":>8}')
+    for name, encode in (('convert', _convert), ('encode', text_to_hid.encode)):
+        start_ns = time.perf_counter_ns()
+        for _ in range(args.rounds):
+            encode(text, args.layout)
+        elapsed_ns = (time.perf_counter_ns() - start_ns) / args.rounds
+        print(f'{name:>8} {elapsed_ns / 1e6:8.2f} {elapsed_ns / args.size:8.0f}')
+
+    print(f'\n{"rollover":>8} {"reports/char":>12}')
+    for rollover in (False, True):
+        script = text_to_hid.encode_typing(text, args.layout, rollover)
+        print(f'{str(rollover):>8} {len(script) / args.size:12.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""How far waits land from the requested delay, with and without spinning.
+
+"sleep" is `time.sleep(delay)`. "precise" is `timing.precise_sleep`, which
+sleeps until the spin budget before the deadline and spins for the rest.
+Deviation is how much later than requested each wait returned; CPU is how
+long the waiting thread ran per wait. `--load` starts busy threads competing
+for the interpreter, roughly what a server handling input looks like.
+
+Example:
+    PYTHONPATH=app python3 benchmarks/timer_jitter_benchmark.py --spin-us 1000
+"""
+
+import argparse
+import threading
+import time
+from typing import Callable
+
+import timing
+
+DELAYS_MS = (1, 5, 16, 33)
+
+
+def _busy(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+        time.sleep(0.001)
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def measure(
+    sleep: Callable[[float], None], delay_s: float, samples: int
+) -> tuple[float, float, float]:
+    """Returns the p50 and p99 deviation and the CPU time per wait, in us."""
+    deviations = []
+    cpu_start = time.thread_time()
+    for _ in range(samples):
+        start_ns = time.monotonic_ns()
+        sleep(delay_s)
+        deviations.append((time.monotonic_ns() - start_ns) / 1000 - delay_s * 1e6)
+    cpu_us = (time.thread_time() - cpu_start) / samples * 1e6
+
+    deviations.sort()
+    return _percentile(deviations, 0.5), _percentile(deviations, 0.99), cpu_us
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=200)
+    parser.add_argument('--spin-us', type=int, default=timing.DEFAULT_SPIN_US)
+    parser.add_argument('--load', type=int, default=0, help='busy threads to run')
+    args = parser.parse_args()
+
+    timing.set_spin_budget_us(args.spin_us)
+    stop = threading.Event()
+    for _ in range(args.load):
+        threading.Thread(target=_busy, args=(stop,), daemon=True).start()
+
+    print(f'{"delay":>6} {"wait":>8} {"p50 us":>8} {"p99 us":>8} {"cpu us":>8}')
+    try:
+        for delay_ms in DELAYS_MS:
+            for name, sleep in (('sleep', time.sleep), ('precise', timing.precise_sleep)):
+                p50, p99, cpu = measure(sleep, delay_ms / 1000, args.samples)
+                print(f'{delay_ms:>4}ms {name:>8} {p50:8.1f} {p99:8.1f} {cpu:8.1f}')
+    finally:
+        stop.set()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -105,10 +105,19 @@ if [[ -f "${USB_KEYBOARD_FUNCTIONS_DIR}/no_out_endpoint" ]]; then
 fi
 
 # Mouse
+# 'rel8' is the classic 8-bit relative mouse, 'rel16' widens X/Y to 16 bits so a
+# single report can carry a fast flick on high-DPI targets. Must match
+# `mouse_report_profile` as seen by the Python service.
+MOUSE_REPORT_PROFILE="$(read_config_value mouse_report_profile rel8)"
+readonly MOUSE_REPORT_PROFILE
 mkdir -p "$USB_MOUSE_FUNCTIONS_DIR"
 echo 0 > "${USB_MOUSE_FUNCTIONS_DIR}/protocol"
 echo 0 > "${USB_MOUSE_FUNCTIONS_DIR}/subclass"
-echo 5 > "${USB_MOUSE_FUNCTIONS_DIR}/report_length"
+if [[ "${MOUSE_REPORT_PROFILE}" == "rel16" ]]; then
+  echo 7 > "${USB_MOUSE_FUNCTIONS_DIR}/report_length"
+else
+  echo 5 > "${USB_MOUSE_FUNCTIONS_DIR}/report_length"
+fi
 # Write the report descriptor
 D=$(mktemp)
 {
@@ -128,9 +137,15 @@ echo -ne \\x81\\x02      #   INPUT (Data,Var,Abs)
 echo -ne \\x05\\x01      #   USAGE_PAGE (Generic Desktop)
 echo -ne \\x09\\x30      #   USAGE (X)
 echo -ne \\x09\\x31      #   USAGE (Y)
+if [[ "${MOUSE_REPORT_PROFILE}" == "rel16" ]]; then
+echo -ne \\x16\\x01\\x80  #   LOGICAL_MINIMUM (-32767)
+echo -ne \\x26\\xFF\\x7F  #   LOGICAL_MAXIMUM (32767)
+echo -ne \\x75\\x10      #   REPORT_SIZE (16)
+else
 echo -ne \\x15\\x81      #   LOGICAL_MINIMUM (-127)
 echo -ne \\x25\\x7F      #   LOGICAL_MAXIMUM (127)
 echo -ne \\x75\\x08      #   REPORT_SIZE (8)
+fi
 echo -ne \\x95\\x02      #   REPORT_COUNT (2)
 echo -ne \\x81\\x06      #   INPUT (Data,Var,Abs)
                          #   vertical wheel
@@ -174,6 +189,42 @@ echo -ne \\xC0            # End Collection
 } >> "$D"
 cp "$D" "${USB_CONSUMER_FUNCTIONS_DIR}/report_desc"
 
+# Absolute pointer (tablet)
+mkdir -p "$USB_TABLET_FUNCTIONS_DIR"
+echo 0 > "${USB_TABLET_FUNCTIONS_DIR}/protocol"
+echo 0 > "${USB_TABLET_FUNCTIONS_DIR}/subclass"
+echo 5 > "${USB_TABLET_FUNCTIONS_DIR}/report_length"
+# Write the report descriptor
+D=$(mktemp)
+{
+echo -ne \\x05\\x01      # USAGE_PAGE (Generic Desktop)
+echo -ne \\x09\\x02      # USAGE (Mouse)
+echo -ne \\xA1\\x01      # COLLECTION (Application)
+echo -ne \\x09\\x01      #   USAGE (Pointer)
+echo -ne \\xA1\\x00      #   COLLECTION (Physical)
+                         #     8-buttons
+echo -ne \\x05\\x09      #     USAGE_PAGE (Button)
+echo -ne \\x19\\x01      #     USAGE_MINIMUM (Button 1)
+echo -ne \\x29\\x08      #     USAGE_MAXIMUM (Button 8)
+echo -ne \\x15\\x00      #     LOGICAL_MINIMUM (0)
+echo -ne \\x25\\x01      #     LOGICAL_MAXIMUM (1)
+echo -ne \\x95\\x08      #     REPORT_COUNT (8)
+echo -ne \\x75\\x01      #     REPORT_SIZE (1)
+echo -ne \\x81\\x02      #     INPUT (Data,Var,Abs)
+                         #     x,y absolute coordinates
+echo -ne \\x05\\x01      #     USAGE_PAGE (Generic Desktop)
+echo -ne \\x09\\x30      #     USAGE (X)
+echo -ne \\x09\\x31      #     USAGE (Y)
+echo -ne \\x15\\x00      #     LOGICAL_MINIMUM (0)
+echo -ne \\x26\\xFF\\x7F  #     LOGICAL_MAXIMUM (32767)
+echo -ne \\x75\\x10      #     REPORT_SIZE (16)
+echo -ne \\x95\\x02      #     REPORT_COUNT (2)
+echo -ne \\x81\\x02      #     INPUT (Data,Var,Abs)
+echo -ne \\xC0           #   END_COLLECTION
+echo -ne \\xC0           # END_COLLECTION
+} >> "$D"
+cp "$D" "${USB_TABLET_FUNCTIONS_DIR}/report_desc"
+
 mkdir -p "${USB_CONFIG_DIR}"
 echo 250 > "${USB_CONFIG_DIR}/MaxPower"
 
@@ -184,5 +235,6 @@ echo "Config ${USB_CONFIG_INDEX}: ECM network" > "${CONFIGS_STRINGS_DIR}/configu
 ln -s "${USB_KEYBOARD_FUNCTIONS_DIR}" "${USB_CONFIG_DIR}/"
 ln -s "${USB_MOUSE_FUNCTIONS_DIR}" "${USB_CONFIG_DIR}/"
 ln -s "${USB_CONSUMER_FUNCTIONS_DIR}" "${USB_CONFIG_DIR}/"
+ln -s "${USB_TABLET_FUNCTIONS_DIR}" "${USB_CONFIG_DIR}/"
 
 usb_gadget_activate
@@ -18,6 +18,8 @@ export USB_MOUSE_FUNCTIONS_DIR="functions/hid.mouse"
 readonly USB_MOUSE_FUNCTIONS_DIR
 export USB_CONSUMER_FUNCTIONS_DIR="functions/hid.consumer"
 readonly USB_CONSUMER_FUNCTIONS_DIR
+export USB_TABLET_FUNCTIONS_DIR="functions/hid.tablet"
+readonly USB_TABLET_FUNCTIONS_DIR
 
 export USB_CONFIG_INDEX=1
 readonly USB_CONFIG_INDEX
@@ -28,11 +30,31 @@ readonly USB_ALL_CONFIGS_DIR
 export USB_ALL_FUNCTIONS_DIR="functions/*"
 readonly USB_ALL_FUNCTIONS_DIR
 
+# pi-remote's configuration file, shared with the Python service.
+PI_REMOTE_CONFIG="${PI_REMOTE_CONFIG:-$(dirname "${BASH_SOURCE[0]}")/../../remotecontrol.cfg}"
+export PI_REMOTE_CONFIG
+readonly PI_REMOTE_CONFIG
+
+# Prints the value of a `key = 'value'` entry in the config, or $2 if unset.
+function read_config_value {
+  local key="$1"
+  local default="$2"
+  local value=""
+  if [[ -f "${PI_REMOTE_CONFIG}" ]]; then
+    value="$(sed -n -E \
+      "s/^${key}[[:space:]]*=[[:space:]]*['\"]?([^'\"]*)['\"]?[[:space:]]*$/\1/p" \
+      "${PI_REMOTE_CONFIG}" | tail -n 1)"
+  fi
+  echo "${value:-${default}}"
+}
+export -f read_config_value
+
 function usb_gadget_activate {
   ls /sys/class/udc > "${USB_DEVICE_PATH}/UDC"
   chmod 777 /dev/hidg0
   chmod 777 /dev/hidg1
   chmod 777 /dev/hidg2
+  chmod 777 /dev/hidg3
 }
 export -f usb_gadget_activate
 
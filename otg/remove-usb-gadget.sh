@@ -62,3 +62,4 @@ rmdir "${USB_DEVICE_DIR}"
 rm -f /dev/hidg0
 rm -f /dev/hidg1
 rm -f /dev/hidg2
+rm -f /dev/hidg3